@@ -0,0 +1,4 @@
+"""Benchmarks for rgrep-mcp against deterministic synthetic vaults.
+
+Run ``python -m benchmarks --help`` from the repository root.
+"""
\ No newline at end of file
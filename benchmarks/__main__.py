@@ -0,0 +1,84 @@
+"""Command line entry point: ``python -m benchmarks``."""
+
+import argparse
+import hashlib
+import json
+import os
+import sys
+import tempfile
+import time
+
+from .run import compare_results, load_results, run_benchmarks, save_results
+from .vault import VaultGenerator, VaultSpec, ensure_vault
+
+
+def parse_args(argv=None) -> argparse.Namespace:
+    """Parse benchmark options; vault shape options default to ``VaultSpec``."""
+    defaults = VaultSpec()
+    parser = argparse.ArgumentParser(
+        prog="python -m benchmarks",
+        description="Time every rgrep-mcp tool and RipgrepWrapper method on a synthetic vault.",
+    )
+    parser.add_argument("--notes", type=int, default=defaults.notes, help="Number of notes (1k to 500k)")
+    parser.add_argument("--folders", type=int, default=defaults.folders, help="Number of folders")
+    parser.add_argument("--frontmatter-ratio", type=float, default=defaults.frontmatter_ratio,
+                        help="Fraction of notes with frontmatter")
+    parser.add_argument("--properties", type=int, default=defaults.properties,
+                        help="Frontmatter properties per note")
+    parser.add_argument("--links-per-note", type=float, default=defaults.links_per_note,
+                        help="Average links per note")
+    parser.add_argument("--headings-per-note", type=int, default=defaults.headings_per_note,
+                        help="Headings per note")
+    parser.add_argument("--heading-depth", type=int, default=defaults.heading_depth,
+                        help="Deepest heading level")
+    parser.add_argument("--note-bytes", type=int, default=defaults.note_bytes, help="Approximate note size")
+    parser.add_argument("--seed", type=int, default=defaults.seed, help="Random seed")
+    parser.add_argument("--vault", help="Vault directory (default: a temp directory named after the spec)")
+    parser.add_argument("--repeat", type=int, default=5, help="Warm runs per case")
+    parser.add_argument("--only", help="Only run cases whose name contains this text")
+    parser.add_argument("--output", help="Write results as JSON to this file")
+    parser.add_argument("--compare", help="Compare with results saved by an earlier run")
+    return parser.parse_args(argv)
+
+
+def main(argv=None) -> int:
+    """Generate or reuse the vault, run the benchmarks and report."""
+    args = parse_args(argv)
+    spec = VaultSpec(
+        notes=args.notes,
+        folders=args.folders,
+        frontmatter_ratio=args.frontmatter_ratio,
+        properties=args.properties,
+        links_per_note=args.links_per_note,
+        headings_per_note=args.headings_per_note,
+        heading_depth=args.heading_depth,
+        note_bytes=args.note_bytes,
+        seed=args.seed,
+    )
+    vault = args.vault
+    if vault is None:
+        digest = hashlib.sha1(json.dumps(spec._asdict(), sort_keys=True).encode()).hexdigest()[:8]
+        vault = os.path.join(tempfile.gettempdir(), f"rgrep-mcp-bench-{spec.notes}-{digest}")
+    
+    start = time.perf_counter()
+    generator = VaultGenerator(spec)
+    manifest = ensure_vault(vault, spec)
+    print(f"Vault: {vault} ({manifest['notes']} notes, {manifest['bytes'] / 1e6:.1f} MB, "
+          f"ready in {time.perf_counter() - start:.1f}s)", file=sys.stderr)
+    
+    def progress(name, timing):
+        print(f"  {name:<40} first {timing['first_ms']:>10.2f} ms   median {timing['median_ms']:>10.2f} ms",
+              file=sys.stderr)
+    
+    results = run_benchmarks(vault, manifest, generator, repeat=args.repeat, only=args.only, progress=progress)
+    
+    if args.output:
+        save_results(results, args.output)
+        print(f"Results written to {args.output}", file=sys.stderr)
+    if args.compare:
+        print("\n".join(compare_results(load_results(args.compare), results)))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
\ No newline at end of file
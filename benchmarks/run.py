@@ -0,0 +1,394 @@
+"""Time every MCP tool and RipgrepWrapper method against a synthetic vault."""
+
+import asyncio
+import functools
+import inspect
+import json
+import os
+import platform
+import shutil
+import statistics
+import subprocess
+import tempfile
+import time
+import tracemalloc
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any, Callable, Dict, List, NamedTuple, Optional
+
+from rgrep_mcp import ripgrep, server
+from rgrep_mcp.ripgrep import RipgrepWrapper
+from rgrep_mcp.watcher import ChangeEvent
+
+from .vault import VaultGenerator, note_name, note_path
+
+RESULTS_FORMAT = 1
+
+# Lifecycle helpers that are exercised through the cases that need them
+SKIPPED_METHODS = {
+    "invalidate_caches",
+    "invalidate_link_graph",
+    "invalidate_mtime_index",
+    "invalidate_property_index",
+    "invalidate_tag_index",
+    "invalidate_term_index",
+    "invalidate_trigram_index",
+    "run_in_thread",
+    "run_rg_in_thread",
+    "start_watching",
+    "stop_watching",
+}
+
+
+class BenchmarkCase(NamedTuple):
+    """One timed call.
+    
+    ``call`` receives the wrapper and may return a coroutine, which is run to
+    completion inside the timing. ``setup`` runs untimed before every call,
+    and may also return a coroutine, and ``teardown`` once after the last.
+    """
+    name: str
+    target: str
+    call: Callable[[RipgrepWrapper], Any]
+    setup: Optional[Callable[[RipgrepWrapper], None]] = None
+    teardown: Optional[Callable[[RipgrepWrapper], None]] = None
+
+
+def rg_json_output(vault_path: str, generator: VaultGenerator, matches: int = 100_000) -> bytes:
+    """Return ripgrep ``--json`` output with ``matches`` match messages.
+    
+    Messages follow ripgrep's format: each file's matches are wrapped in
+    ``begin`` and ``end`` messages and the output ends with a summary, whose
+    data comes before its type as in ripgrep's own output.
+    """
+    spec = generator.spec
+    words = generator.words
+    compact = functools.partial(json.dumps, separators=(",", ":"))
+    lines = []
+    per_file = 10
+    for number in range(matches):
+        index = number // per_file
+        path = {"text": os.path.join(vault_path, note_path(spec, index % spec.notes))}
+        if number % per_file == 0:
+            lines.append(compact({"type": "begin", "data": {"path": path}}))
+        text = " ".join(words[(number + k) % len(words)] for k in range(12)) + " [[" + note_name(index) + "]]\n"
+        lines.append(compact({"type": "match", "data": {
+            "path": path,
+            "lines": {"text": text},
+            "line_number": number % per_file * 3 + 5,
+            "absolute_offset": number * 80,
+            "submatches": [{"match": {"text": words[number % len(words)]}, "start": 0, "end": len(words[number % len(words)])}],
+        }}))
+        if number % per_file == per_file - 1 or number == matches - 1:
+            lines.append(compact({"type": "end", "data": {"path": path, "binary_offset": None, "stats": {
+                "elapsed": {"secs": 0, "nanos": 35000, "human": "0.000035s"},
+                "searches": 1, "searches_with_match": 1, "bytes_searched": 2000, "bytes_printed": 4000,
+                "matched_lines": per_file, "matches": per_file,
+            }}}))
+    lines.append(compact({"data": {"elapsed_total": {"human": "0.1s", "nanos": 0, "secs": 0}}, "type": "summary"}))
+    return ("\n".join(lines) + "\n").encode("utf-8")
+
+
+def _with_stdlib_json(call: Callable[[], Any]) -> Any:
+    """Run ``call`` with the standard library JSON decoder, even if a faster one is installed."""
+    loads = ripgrep._json_loads
+    ripgrep._json_loads = ripgrep._stdlib_json_loads
+    try:
+        return call()
+    finally:
+        ripgrep._json_loads = loads
+
+
+def build_cases(vault_path: str, generator: VaultGenerator) -> List[BenchmarkCase]:
+    """Return the cases for a vault written by ``generator``."""
+    spec = generator.spec
+    common = generator.words[0]
+    rare = generator.words[-1]
+    # Related terms an agent would otherwise search one after another
+    related = generator.words[10:18]
+    hub = note_name(0)
+    hub_path = note_path(spec, 0)
+    edited = note_path(spec, min(1, spec.notes - 1))
+    output = rg_json_output(vault_path, generator)
+    
+    def touch(rg: RipgrepWrapper) -> None:
+        os.utime(os.path.join(vault_path, edited))
+    
+    def wrapper_case(name: str, call: Callable[[RipgrepWrapper], Any], setup=None) -> BenchmarkCase:
+        return BenchmarkCase(name, name.split("[")[0], call, setup)
+    
+    def watched(rg: RipgrepWrapper) -> None:
+        # Searches use the trigram index only while the vault is watched
+        rg.start_watching()
+        rg.get_trigram_index()
+    
+    def tool_case(name: str, **kwargs: Any) -> BenchmarkCase:
+        tool = getattr(server, name.split("[")[0])
+        return BenchmarkCase(name, name.split("[")[0], lambda rg: tool(**kwargs))
+    
+    # Inputs computed untimed by a setup, shared with the call it prepares
+    prepared: Dict[str, Any] = {}
+    
+    def unenriched_matches(rg: RipgrepWrapper) -> None:
+        prepared.setdefault("matches", rg.search_content(common, max_results=100, smart_context=False))
+    
+    def snapshotted(rg: RipgrepWrapper) -> None:
+        # Snapshots are only saved while the vault is watched
+        if rg.snapshot_path is None:
+            rg.snapshot_path = Path(tempfile.mkdtemp(prefix="rgrep-mcp-bench-")) / "vault.snapshot"
+            rg.start_watching()
+        if not rg.snapshot_path.exists():
+            rg.save_snapshot()
+    
+    def restarted(rg: RipgrepWrapper) -> None:
+        # As after a restart: the graph is restored from the snapshot, not kept in memory
+        snapshotted(rg)
+        rg.invalidate_link_graph()
+    
+    def drop_snapshot(rg: RipgrepWrapper) -> None:
+        rg.stop_watching()
+        shutil.rmtree(rg.snapshot_path.parent, ignore_errors=True)
+        rg.snapshot_path = None
+    
+    async def first_page(rg: RipgrepWrapper) -> None:
+        if "cursor" not in prepared:
+            prepared["cursor"] = json.loads(await server.rg_search_notes(query=common))["next_cursor"]
+    
+    return [
+        wrapper_case("__init__", lambda rg: RipgrepWrapper(vault_path)),
+        wrapper_case("search_content[common]", lambda rg: rg.search_content(common)),
+        wrapper_case("search_content[rare]", lambda rg: rg.search_content(rare)),
+        wrapper_case("search_content[bm25]", lambda rg: rg.search_content(f"{common}|{rare}", sort="bm25")),
+        wrapper_case("search_content[regex,path]", lambda rg: rg.search_content(f"{common}\\s+{rare}", sort="path")),
+        wrapper_case("search_content_only", lambda rg: rg.search_content_only(common)),
+        wrapper_case("search_frontmatter_only", lambda rg: rg.search_frontmatter_only("active")),
+        wrapper_case("search_async", lambda rg: rg.search_async(common, max_results=50, sort="relevance")),
+        wrapper_case("search_async[broad, 1000 results]", lambda rg: rg.search_async(common, max_results=1000)),
+        wrapper_case("search_content[8 queries, one by one]", lambda rg: [rg.search_content(q) for q in related]),
+        wrapper_case("search_batch[8 queries]", lambda rg: rg.search_batch(related)),
+        wrapper_case("search_batch_async", lambda rg: rg.search_batch_async(related, search_scope="content_only")),
+        wrapper_case(
+            "add_smart_context_async", lambda rg: rg.add_smart_context_async(prepared["matches"]), unenriched_matches
+        ),
+        wrapper_case("find_links", lambda rg: rg.find_links()),
+        wrapper_case("find_links_async", lambda rg: rg.find_links_async(link_type="external_urls", sort="none")),
+        wrapper_case("find_links[title filter]", lambda rg: rg.find_links(title_pattern=f"^{common}", max_results=100)),
+        wrapper_case("_parse_rg_json_output[100k matches]", lambda rg: rg._parse_rg_json_output(output)),
+        wrapper_case(
+            "_parse_rg_json_output[100k matches, json]",
+            lambda rg: _with_stdlib_json(lambda: rg._parse_rg_json_output(output))
+        ),
+        wrapper_case("get_file_frontmatter", lambda rg: rg.get_file_frontmatter(hub_path)),
+        wrapper_case("get_files_by_date_range", lambda rg: rg.get_files_by_date_range("2024-03-01", "2024-03-31", limit=100)),
+        wrapper_case("get_mtime_index[cold]", lambda rg: rg.get_mtime_index(), lambda rg: rg.invalidate_mtime_index()),
+        wrapper_case("get_link_graph[cold]", lambda rg: rg.get_link_graph(), lambda rg: rg.invalidate_link_graph()),
+        wrapper_case("find_backlinks", lambda rg: rg.find_backlinks(hub, max_results=100)),
+        BenchmarkCase("save_snapshot", "save_snapshot", lambda rg: rg.save_snapshot(), snapshotted, drop_snapshot),
+        BenchmarkCase(
+            "load_snapshot[restore link graph]", "load_snapshot",
+            lambda rg: rg.load_snapshot() and rg.get_link_graph(), restarted, drop_snapshot
+        ),
+        wrapper_case("get_term_index[cold]", lambda rg: rg.get_term_index(), lambda rg: rg.invalidate_term_index()),
+        wrapper_case("get_trigram_index[cold]", lambda rg: rg.get_trigram_index(), lambda rg: rg.invalidate_trigram_index()),
+        BenchmarkCase(
+            "search_content[rare, prefiltered]", "search_content",
+            lambda rg: rg.search_content(rare), watched, lambda rg: rg.stop_watching()
+        ),
+        BenchmarkCase(
+            "search_content_only[rare, prefiltered]", "search_content_only",
+            lambda rg: rg.search_content_only(rare), watched, lambda rg: rg.stop_watching()
+        ),
+        wrapper_case("find_orphaned_notes", lambda rg: rg.find_orphaned_notes()),
+        wrapper_case("get_tag_index[cold]", lambda rg: rg.get_tag_index(), lambda rg: rg.invalidate_tag_index()),
+        wrapper_case(
+            "get_property_index[cold]", lambda rg: rg.get_property_index(), lambda rg: rg.invalidate_property_index()
+        ),
+        wrapper_case(
+            "find_notes_by_properties",
+            lambda rg: rg.find_notes_by_properties([
+                {"property": "status", "value": "active"},
+                {"property": "created", "op": "gte", "value": "2024-06-01"},
+            ], max_results=100)
+        ),
+        wrapper_case(
+            "find_notes_by_tags",
+            lambda rg: rg.find_notes_by_tags(any_tags=related[:4], exclude_tags=[common], max_results=100)
+        ),
+        wrapper_case("apply_changes", lambda rg: rg.apply_changes([ChangeEvent("modified", edited)]), touch),
+        wrapper_case("cache_stats", lambda rg: rg.cache_stats()),
+        tool_case("rg_search_notes", query=common),
+        tool_case("rg_search_notes[bm25]", query=common, sort="bm25"),
+        BenchmarkCase(
+            "rg_search_notes[next page]", "rg_search_notes",
+            lambda rg: server.rg_search_notes(query=common, cursor=prepared["cursor"]), first_page
+        ),
+        tool_case("rg_search_notes[frontmatter_only]", query="active", search_scope="frontmatter_only"),
+        tool_case("rg_search_notes_batch", queries=related),
+        tool_case("rg_search_links", link_type="wiki_links"),
+        tool_case("rg_search_backlinks", target_note=hub),
+        tool_case("rg_search_recent_notes", start_date="2024-03-01", end_date="2024-03-31"),
+        tool_case("rg_search_orphaned_notes", max_results=100),
+        tool_case("rg_search_tags", tags=[common]),
+        tool_case("rg_query_properties", where=[{"property": "tags", "op": "contains", "value": common}]),
+        tool_case("rg_server_stats"),
+    ]
+
+
+def uncovered_targets(cases: List[BenchmarkCase]) -> List[str]:
+    """Return public wrapper methods and MCP tools that no case times."""
+    targets = {case.target for case in cases}
+    methods = {
+        name for name, member in inspect.getmembers(RipgrepWrapper)
+        if (name == "__init__" or not name.startswith("_")) and callable(member)
+    }
+    tools = {tool.name for tool in asyncio.run(server.mcp.list_tools())}
+    return sorted((methods | tools) - SKIPPED_METHODS - targets)
+
+
+def _run_case(case: BenchmarkCase, rg: RipgrepWrapper, loop: asyncio.AbstractEventLoop) -> Any:
+    """Call ``case`` once, running a returned coroutine to completion."""
+    result = case.call(rg)
+    if inspect.isawaitable(result):
+        result = loop.run_until_complete(result)
+    if isinstance(result, str) and '"error"' in result[:200] and "error" in json.loads(result):
+        raise RuntimeError(f"{case.name} failed: {json.loads(result)['error']}")
+    return result
+
+
+def _time_case(case: BenchmarkCase, rg: RipgrepWrapper, loop: asyncio.AbstractEventLoop, repeat: int) -> Dict[str, Any]:
+    """Run ``case`` once cold and ``repeat`` more times, returning timings in ms.
+    
+    A final untimed run is traced with ``tracemalloc`` for the peak memory
+    the call allocates, including the result it returns.
+    """
+    def setup() -> None:
+        if case.setup is not None:
+            prepared = case.setup(rg)
+            if inspect.isawaitable(prepared):
+                loop.run_until_complete(prepared)
+    
+    timings = []
+    for _ in range(repeat + 1):
+        setup()
+        start = time.perf_counter()
+        _run_case(case, rg, loop)
+        timings.append((time.perf_counter() - start) * 1000)
+    
+    setup()
+    tracemalloc.start()
+    try:
+        result = _run_case(case, rg, loop)
+        peak = tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+    del result
+    if case.teardown is not None:
+        case.teardown(rg)
+    
+    warm = timings[1:]
+    return {
+        "target": case.target,
+        "first_ms": round(timings[0], 3),
+        "median_ms": round(statistics.median(warm), 3),
+        "min_ms": round(min(warm), 3),
+        "max_ms": round(max(warm), 3),
+        "runs": len(warm),
+        "peak_kib": round(peak / 1024, 1),
+    }
+
+
+def run_benchmarks(
+    vault_path: str,
+    manifest: Dict[str, Any],
+    generator: VaultGenerator,
+    repeat: int = 5,
+    only: Optional[str] = None,
+    progress: Callable[[str, Dict[str, Any]], None] = lambda name, timing: None
+) -> Dict[str, Any]:
+    """Time every case against the vault and return machine-readable results.
+    
+    Args:
+        vault_path: Vault written by ``generator``
+        manifest: Manifest returned when the vault was generated
+        generator: Generator for the vault's spec, used to pick query terms
+        repeat: Warm runs per case, after one cold run
+        only: Optional substring; only cases whose name contains it are run
+        progress: Called with each case name and its timings
+    """
+    rg = RipgrepWrapper(vault_path)
+    # The tools create their own wrapper on first use; share this one instead
+    server._rg = rg
+    
+    loop = asyncio.new_event_loop()
+    results = {}
+    try:
+        for case in build_cases(vault_path, generator):
+            if only and only not in case.name:
+                continue
+            results[case.name] = _time_case(case, rg, loop, max(repeat, 1))
+            progress(case.name, results[case.name])
+    finally:
+        loop.close()
+        server._rg = None
+    
+    return {
+        "format": RESULTS_FORMAT,
+        "created": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+        "package_version": _package_version(),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "ripgrep": _ripgrep_version(rg.rg_command),
+        "json_parser": ripgrep.JSON_PARSER,
+        "vault": manifest,
+        "repeat": repeat,
+        "results": results,
+    }
+
+
+def save_results(results: Dict[str, Any], path: str) -> None:
+    """Write results as JSON."""
+    Path(path).write_text(json.dumps(results, indent=2), encoding="utf-8")
+
+
+def load_results(path: str) -> Dict[str, Any]:
+    """Read results written by ``save_results``."""
+    return json.loads(Path(path).read_text(encoding="utf-8"))
+
+
+def compare_results(baseline: Dict[str, Any], current: Dict[str, Any]) -> List[str]:
+    """Return report lines comparing warm medians and peak memory case by case."""
+    lines = []
+    if baseline["vault"]["spec"] != current["vault"]["spec"]:
+        lines.append("Warning: results were measured on different vault specs")
+    lines.append(
+        f"{'case':<40} {'baseline ms':>12} {'current ms':>12} {'speedup':>8} {'baseline KiB':>13} {'current KiB':>12}"
+    )
+    for name, timing in current["results"].items():
+        before = baseline["results"].get(name)
+        peak = f"{timing['peak_kib']:>12.1f}" if "peak_kib" in timing else f"{'-':>12}"
+        if before is None:
+            lines.append(f"{name:<40} {'-':>12} {timing['median_ms']:>12.2f} {'new':>8} {'-':>13} {peak}")
+            continue
+        speedup = before["median_ms"] / timing["median_ms"] if timing["median_ms"] else float("inf")
+        # Results saved before peak memory was measured have no peak_kib
+        before_peak = f"{before['peak_kib']:>13.1f}" if "peak_kib" in before else f"{'-':>13}"
+        lines.append(
+            f"{name:<40} {before['median_ms']:>12.2f} {timing['median_ms']:>12.2f} {speedup:>7.2f}x {before_peak} {peak}"
+        )
+    return lines
+
+
+def _package_version() -> str:
+    """Return the installed rgrep-mcp version."""
+    try:
+        from importlib.metadata import version
+        return version("rgrep-mcp")
+    except Exception:
+        from rgrep_mcp import __version__
+        return __version__
+
+
+def _ripgrep_version(command: str) -> str:
+    """Return the first line of ``rg --version``."""
+    result = subprocess.run([command, "--version"], capture_output=True, text=True, encoding="utf-8", errors="replace")
+    return result.stdout.splitlines()[0] if result.stdout else "unknown"
\ No newline at end of file
@@ -0,0 +1,225 @@
+"""Deterministic synthetic Obsidian vaults for benchmarks."""
+
+import json
+import os
+import random
+from pathlib import Path
+from typing import Any, Dict, List, NamedTuple
+
+MARKER = ".benchmark-vault.json"
+
+# 2024-01-01 00:00 UTC; note mtimes are spread over the following days
+BASE_TIMESTAMP = 1704067200.0
+
+SYLLABLES = [
+    "ka", "lo", "mi", "ne", "su", "ta", "ri", "po", "ve", "da",
+    "zu", "fe", "go", "hi", "ja", "bo", "cu", "xe", "wa", "yo",
+]
+
+
+class VaultSpec(NamedTuple):
+    """Shape of a synthetic vault.
+    
+    The same spec and seed always produce the same notes, links and mtimes.
+    """
+    notes: int = 1000
+    folders: int = 20
+    frontmatter_ratio: float = 0.7
+    properties: int = 4
+    links_per_note: float = 5.0
+    external_link_ratio: float = 0.1
+    broken_link_ratio: float = 0.05
+    headings_per_note: int = 4
+    heading_depth: int = 3
+    note_bytes: int = 2000
+    vocabulary: int = 2000
+    days: int = 365
+    seed: int = 42
+
+
+def vocabulary(size: int) -> List[str]:
+    """Return ``size`` distinct pseudo-words, most frequent first."""
+    words = []
+    for a in SYLLABLES:
+        for b in SYLLABLES:
+            words.append(a + b)
+            if len(words) == size:
+                return words
+    for a in SYLLABLES:
+        for b in SYLLABLES:
+            for c in SYLLABLES:
+                words.append(a + b + c)
+                if len(words) == size:
+                    return words
+    return words
+
+
+def note_path(spec: VaultSpec, index: int) -> str:
+    """Return the vault-relative path of note ``index``."""
+    folder = index % spec.folders if spec.folders else None
+    name = note_name(index)
+    if folder is None:
+        return f"{name}.md"
+    return os.path.join(f"Area {folder // 10:02d}", f"Topic {folder:03d}", f"{name}.md")
+
+
+def note_name(index: int) -> str:
+    """Return the name of note ``index``."""
+    return f"Note {index:06d}"
+
+
+class VaultGenerator:
+    """Writes the notes described by a ``VaultSpec``."""
+    
+    def __init__(self, spec: VaultSpec):
+        """Prepare the vocabulary and link distribution for ``spec``."""
+        self.spec = spec
+        self.words = vocabulary(spec.vocabulary)
+        # Zipf-like word frequencies: the first words are common, the last rare
+        self._word_weights = list(_cumulative(1.0 / (rank + 1) for rank in range(len(self.words))))
+        # Links favour early notes, so low-numbered notes become hubs
+        self._link_weights = list(_cumulative(1.0 / (rank + 1) ** 0.8 for rank in range(spec.notes)))
+    
+    def write(self, root: Path) -> Dict[str, Any]:
+        """Write every note below ``root`` and return a manifest."""
+        spec = self.spec
+        rng = random.Random(spec.seed)
+        total_bytes = 0
+        created_dirs = set()
+        for index in range(spec.notes):
+            path = root / note_path(spec, index)
+            if path.parent not in created_dirs:
+                path.parent.mkdir(parents=True, exist_ok=True)
+                created_dirs.add(path.parent)
+            data = self.note_text(index, rng).encode("utf-8")
+            with open(path, "wb") as f:
+                f.write(data)
+            ts = BASE_TIMESTAMP + rng.random() * spec.days * 86400
+            os.utime(path, (ts, ts))
+            total_bytes += len(data)
+        
+        manifest = {"spec": spec._asdict(), "notes": spec.notes, "bytes": total_bytes}
+        (root / MARKER).write_text(json.dumps(manifest, indent=2), encoding="utf-8")
+        return manifest
+    
+    def note_text(self, index: int, rng: random.Random) -> str:
+        """Return the markdown of note ``index``."""
+        spec = self.spec
+        parts = []
+        if rng.random() < spec.frontmatter_ratio:
+            parts.append(self._frontmatter(index, rng))
+        parts.append(f"# {note_name(index)}\n\n")
+        
+        links = self._links(index, rng)
+        headings = max(spec.headings_per_note, 1)
+        body_bytes = max(spec.note_bytes - sum(len(p) for p in parts), 0)
+        for section in range(headings):
+            if section:
+                level = 2 + (section - 1) % max(spec.heading_depth - 1, 1)
+                parts.append(f"{'#' * level} {self._sentence(rng, 2, 4)}\n\n")
+            section_links = links[section::headings]
+            parts.append(self._paragraph(rng, body_bytes // headings, section_links))
+        return "".join(parts)
+    
+    def _frontmatter(self, index: int, rng: random.Random) -> str:
+        """Return a frontmatter block with scalars, lists and a nested map."""
+        words = self.words
+        lines = ["---"]
+        lines.append(f"created: 2024-{index % 12 + 1:02d}-{index % 28 + 1:02d}")
+        if self.spec.properties > 1:
+            lines.append(f"status: {rng.choice(('draft', 'active', 'done', 'archived'))}")
+        if self.spec.properties > 2:
+            lines.append("tags:")
+            for word in self._words(rng, rng.randint(1, 4)):
+                lines.append(f"  - {word}")
+        if self.spec.properties > 3:
+            lines.append(f"aliases: [{words[index % len(words)]} {index}]")
+        for extra in range(4, self.spec.properties):
+            lines.append(f"field_{extra}:")
+            lines.append(f"  owner: {self._sentence(rng, 1, 2)}")
+            lines.append(f"  related: \"[[{note_name(self._link_target(rng))}]]\"")
+        lines.append("---\n")
+        return "\n".join(lines) + "\n"
+    
+    def _links(self, index: int, rng: random.Random) -> List[str]:
+        """Return the links note ``index`` makes, in a mix of syntaxes."""
+        spec = self.spec
+        count = int(spec.links_per_note) + (rng.random() < spec.links_per_note % 1)
+        links = []
+        for _ in range(count):
+            roll = rng.random()
+            if roll < spec.external_link_ratio:
+                links.append(f"[{self._sentence(rng, 1, 3)}](https://example.com/{rng.choice(self.words)})")
+                continue
+            if roll < spec.external_link_ratio + spec.broken_link_ratio:
+                links.append(f"[[Missing {rng.randrange(spec.notes * 10)}]]")
+                continue
+            target = self._link_target(rng)
+            style = rng.random()
+            if style < 0.6:
+                links.append(f"[[{note_name(target)}]]")
+            elif style < 0.75:
+                links.append(f"[[{note_name(target)}|{self._sentence(rng, 1, 2)}]]")
+            elif style < 0.85:
+                links.append(f"[[{note_name(target)}#{self._sentence(rng, 1, 2)}]]")
+            else:
+                path = note_path(spec, target).replace(os.sep, "/").replace(" ", "%20")
+                links.append(f"[{note_name(target)}]({path})")
+        return links
+    
+    def _link_target(self, rng: random.Random) -> int:
+        """Pick a note to link to, favouring hubs."""
+        return rng.choices(range(self.spec.notes), cum_weights=self._link_weights)[0]
+    
+    def _words(self, rng: random.Random, count: int) -> List[str]:
+        """Pick ``count`` words with Zipf-like frequencies."""
+        return rng.choices(self.words, cum_weights=self._word_weights, k=count)
+    
+    def _sentence(self, rng: random.Random, low: int, high: int) -> str:
+        """Return between ``low`` and ``high`` words."""
+        return " ".join(self._words(rng, rng.randint(low, high)))
+    
+    def _paragraph(self, rng: random.Random, size: int, links: List[str]) -> str:
+        """Return about ``size`` bytes of text lines with ``links`` spread through it."""
+        lines = []
+        written = 0
+        pending = list(links)
+        while written < size or pending:
+            line = self._sentence(rng, 6, 14)
+            if pending:
+                line = f"{line} {pending.pop()}"
+            lines.append(line)
+            written += len(line) + 1
+        return "\n".join(lines) + "\n\n"
+
+
+def _cumulative(weights) -> List[float]:
+    """Return running totals of ``weights``."""
+    total = 0.0
+    result = []
+    for weight in weights:
+        total += weight
+        result.append(total)
+    return result
+
+
+def ensure_vault(root: str, spec: VaultSpec) -> Dict[str, Any]:
+    """Generate a vault for ``spec`` at ``root`` unless it already holds one.
+    
+    A vault generated earlier is reused when its marker file records the same
+    spec, so large vaults are only written once.
+    
+    Raises:
+        ValueError: If ``root`` holds other files or a vault for a different spec
+    """
+    path = Path(root)
+    marker = path / MARKER
+    if marker.exists():
+        manifest = json.loads(marker.read_text(encoding="utf-8"))
+        if manifest["spec"] == spec._asdict():
+            return manifest
+        raise ValueError(f"{root} holds a benchmark vault for a different spec; remove it or choose another path")
+    if path.exists() and any(path.iterdir()):
+        raise ValueError(f"{root} is not empty and is not a benchmark vault")
+    path.mkdir(parents=True, exist_ok=True)
+    return VaultGenerator(spec).write(path)
\ No newline at end of file
@@ -0,0 +1,96 @@
+"""Result cache for repeated tool calls."""
+
+import sys
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Hashable, NamedTuple, Optional
+
+
+class CachedResult(NamedTuple):
+    """A tool result and the vault generation it was computed for."""
+    value: str
+    generation: int
+    stored_at: float
+    nbytes: int
+
+
+class ResultCache:
+    """LRU cache of tool results keyed by normalized arguments.
+    
+    Every entry records the vault generation it was computed for, and is only
+    served while the generation is unchanged, so an edit to any note makes
+    all earlier results stale. Entries also expire after ``ttl`` seconds and
+    the cache holds at most ``max_entries`` results and ``max_bytes`` of them.
+    """
+    
+    def __init__(self, max_entries: int = 256, max_bytes: int = 16 * 1024 * 1024, ttl: float = 300.0):
+        """Initialize an empty cache with entry, memory and age limits."""
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._entries: "OrderedDict[Hashable, CachedResult]" = OrderedDict()
+        self._bytes = 0
+        self._lock = threading.Lock()
+    
+    def get(self, key: Hashable, generation: int) -> Optional[str]:
+        """Return the result for ``key`` if it was computed for ``generation`` and has not expired."""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                if entry.generation == generation and time.monotonic() - entry.stored_at <= self.ttl:
+                    self._entries.move_to_end(key)
+                    self.hits += 1
+                    return entry.value
+                self._remove(key)
+            self.misses += 1
+            return None
+    
+    def put(self, key: Hashable, value: str, generation: int) -> None:
+        """Store a result computed for ``generation``."""
+        nbytes = sys.getsizeof(value)
+        if nbytes > self.max_bytes:
+            return
+        with self._lock:
+            self._remove(key)
+            self._entries[key] = CachedResult(value, generation, time.monotonic(), nbytes)
+            self._bytes += nbytes
+            while len(self._entries) > self.max_entries or self._bytes > self.max_bytes:
+                _key, evicted = self._entries.popitem(last=False)
+                self._bytes -= evicted.nbytes
+                self.evictions += 1
+    
+    def clear(self) -> None:
+        """Drop every cached result."""
+        with self._lock:
+            self._entries.clear()
+            self._bytes = 0
+    
+    def stats(self) -> Dict[str, Any]:
+        """Return hit, miss and size counters."""
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                'entries': len(self._entries),
+                'bytes': self._bytes,
+                'hits': self.hits,
+                'misses': self.misses,
+                'evictions': self.evictions,
+                'hit_rate': self.hits / lookups if lookups else 0.0,
+            }
+    
+    @property
+    def size_bytes(self) -> int:
+        """Memory held by cached results."""
+        return self._bytes
+    
+    def __len__(self) -> int:
+        return len(self._entries)
+    
+    def _remove(self, key: Hashable) -> None:
+        entry = self._entries.pop(key, None)
+        if entry is not None:
+            self._bytes -= entry.nbytes
\ No newline at end of file
@@ -2,9 +2,40 @@
 
 import json
 import os
+import sys
 from pathlib import Path
 from typing import Optional
 
+# Settings read from the config file, with the type each value is converted to
+_FILE_SETTINGS = (
+    ('link_index_ttl', float),
+    ('note_cache_entries', int),
+    ('note_cache_bytes', int),
+    ('max_output_bytes', int),
+    ('max_concurrent_searches', int),
+    ('mtime_index_ttl', float),
+    ('watch_vault', bool),
+    ('watch_poll_interval', float),
+    ('result_cache_entries', int),
+    ('result_cache_bytes', int),
+    ('result_cache_ttl', float),
+    ('slow_query_ms', float),
+    ('slow_query_entries', int),
+    ('cursor_entries', int),
+    ('cursor_results', int),
+    ('cursor_ttl', float),
+    ('snapshot_interval', float),
+)
+
+
+def _default_snapshot_dir() -> str:
+    """Return the per-user cache directory index snapshots are written to."""
+    if sys.platform == 'win32':
+        base = os.environ.get('LOCALAPPDATA') or os.path.expanduser('~\\AppData\\Local')
+    else:
+        base = os.environ.get('XDG_CACHE_HOME') or os.path.expanduser('~/.cache')
+    return os.path.join(base, 'rgrep-mcp')
+
 
 class Config:
     """Configuration for the rgrep-mcp server."""
@@ -14,6 +45,24 @@ class Config:
         self.vault_path: Optional[str] = None
         self.default_case_sensitive: bool = False
         self.default_result_limit: int = 15
+        self.link_index_ttl: float = 300.0
+        self.note_cache_entries: int = 2048
+        self.note_cache_bytes: int = 64 * 1024 * 1024
+        self.max_output_bytes: int = 32 * 1024 * 1024
+        self.max_concurrent_searches: int = 4
+        self.mtime_index_ttl: float = 60.0
+        self.watch_vault: bool = True
+        self.watch_poll_interval: float = 2.0
+        self.result_cache_entries: int = 256
+        self.result_cache_bytes: int = 16 * 1024 * 1024
+        self.result_cache_ttl: float = 300.0
+        self.slow_query_ms: float = 1000.0
+        self.slow_query_entries: int = 50
+        self.cursor_entries: int = 64
+        self.cursor_results: int = 500
+        self.cursor_ttl: float = 600.0
+        self.snapshot_dir: Optional[str] = _default_snapshot_dir()  # None disables snapshots
+        self.snapshot_interval: float = 300.0
         
         # Try to load from config file
         if config_path and Path(config_path).exists():
@@ -34,6 +83,13 @@ class Config:
             self.vault_path = config_data.get('vault_path')
             self.default_case_sensitive = config_data.get('default_case_sensitive', False)
             self.default_result_limit = config_data.get('default_result_limit', 15)
+            for key, convert in _FILE_SETTINGS:
+                if key in config_data:
+                    try:
+                        setattr(self, key, convert(config_data[key]))
+                    except (ValueError, TypeError):
+                        pass  # Keep the default
+            self.snapshot_dir = config_data.get('snapshot_dir', _default_snapshot_dir()) or None
         except (json.JSONDecodeError, FileNotFoundError):
             pass  # Use defaults
     
@@ -63,6 +119,109 @@ class Config:
                 self.default_result_limit = int(result_limit)
             except ValueError:
                 pass
+        
+        if link_index_ttl := os.getenv('RGREP_MCP_LINK_INDEX_TTL'):
+            try:
+                self.link_index_ttl = float(link_index_ttl)
+            except ValueError:
+                pass
+        
+        if note_cache_entries := os.getenv('RGREP_MCP_NOTE_CACHE_ENTRIES'):
+            try:
+                self.note_cache_entries = int(note_cache_entries)
+            except ValueError:
+                pass
+        
+        if note_cache_bytes := os.getenv('RGREP_MCP_NOTE_CACHE_BYTES'):
+            try:
+                self.note_cache_bytes = int(note_cache_bytes)
+            except ValueError:
+                pass
+        
+        if max_output_bytes := os.getenv('RGREP_MCP_MAX_OUTPUT_BYTES'):
+            try:
+                self.max_output_bytes = int(max_output_bytes)
+            except ValueError:
+                pass
+        
+        if max_concurrent_searches := os.getenv('RGREP_MCP_MAX_CONCURRENT_SEARCHES'):
+            try:
+                self.max_concurrent_searches = int(max_concurrent_searches)
+            except ValueError:
+                pass
+        
+        if mtime_index_ttl := os.getenv('RGREP_MCP_MTIME_INDEX_TTL'):
+            try:
+                self.mtime_index_ttl = float(mtime_index_ttl)
+            except ValueError:
+                pass
+        
+        if watch_vault := os.getenv('RGREP_MCP_WATCH_VAULT'):
+            self.watch_vault = watch_vault.lower() in ('true', '1', 'yes')
+        
+        if watch_poll_interval := os.getenv('RGREP_MCP_WATCH_POLL_INTERVAL'):
+            try:
+                self.watch_poll_interval = float(watch_poll_interval)
+            except ValueError:
+                pass
+        
+        if result_cache_entries := os.getenv('RGREP_MCP_RESULT_CACHE_ENTRIES'):
+            try:
+                self.result_cache_entries = int(result_cache_entries)
+            except ValueError:
+                pass
+        
+        if result_cache_bytes := os.getenv('RGREP_MCP_RESULT_CACHE_BYTES'):
+            try:
+                self.result_cache_bytes = int(result_cache_bytes)
+            except ValueError:
+                pass
+        
+        if result_cache_ttl := os.getenv('RGREP_MCP_RESULT_CACHE_TTL'):
+            try:
+                self.result_cache_ttl = float(result_cache_ttl)
+            except ValueError:
+                pass
+        
+        if slow_query_ms := os.getenv('RGREP_MCP_SLOW_QUERY_MS'):
+            try:
+                self.slow_query_ms = float(slow_query_ms)
+            except ValueError:
+                pass
+        
+        if slow_query_entries := os.getenv('RGREP_MCP_SLOW_QUERY_ENTRIES'):
+            try:
+                self.slow_query_entries = int(slow_query_entries)
+            except ValueError:
+                pass
+        
+        if cursor_entries := os.getenv('RGREP_MCP_CURSOR_ENTRIES'):
+            try:
+                self.cursor_entries = int(cursor_entries)
+            except ValueError:
+                pass
+        
+        if cursor_results := os.getenv('RGREP_MCP_CURSOR_RESULTS'):
+            try:
+                self.cursor_results = int(cursor_results)
+            except ValueError:
+                pass
+        
+        if cursor_ttl := os.getenv('RGREP_MCP_CURSOR_TTL'):
+            try:
+                self.cursor_ttl = float(cursor_ttl)
+            except ValueError:
+                pass
+        
+        # Set but empty disables snapshots
+        if (snapshot_dir := os.getenv('RGREP_MCP_SNAPSHOT_DIR')) is not None:
+            self.snapshot_dir = snapshot_dir or None
+        
+        if snapshot_interval := os.getenv('RGREP_MCP_SNAPSHOT_INTERVAL'):
+            try:
+                self.snapshot_interval = float(snapshot_interval)
+            except ValueError:
+                pass
     
     def validate(self) -> None:
         """Validate configuration and raise ValueError if invalid."""
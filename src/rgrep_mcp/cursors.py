@@ -0,0 +1,181 @@
+"""Server-side result sets behind paginated tool results."""
+
+import secrets
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Hashable, List, NamedTuple, Optional
+
+
+class ResultSet(NamedTuple):
+    """The ordered results of one search and how to present a page of them."""
+    tool: str
+    results: List[Any]
+    page_size: int
+    render: Callable[..., Any]  # Called with a page of results and the cursor of the next page
+    key: Optional[Hashable]
+    generation: int
+    used_at: float
+    truncated: bool  # More results were found than the store keeps
+    more: Optional[Callable[..., Any]]  # Called with the results served so far for the rest, until it is in
+
+
+class Page(NamedTuple):
+    """One page of a result set."""
+    results: List[Any]
+    next_cursor: Optional[str]
+    render: Callable[..., Any]
+    truncated: bool = False  # The last page of a set cut at ``max_results``
+    # Set instead of a page when only the first page was searched for; ``results``
+    # are then the results served before the requested page
+    more: Optional[Callable[..., Any]] = None
+
+
+class CursorStore:
+    """Result sets of searches with more results than fit on one page.
+    
+    A search keeps up to ``max_results`` results here, already ordered, and
+    hands out a cursor naming the set and an offset, so each further page is
+    a slice and ripgrep is not run again. Pages show the vault as it was when
+    the search ran. The last page of a set cut at ``max_results`` is marked
+    truncated. At most ``max_entries`` sets are held, least recently paged
+    first out, and a set expires ``ttl`` seconds after its last page.
+    
+    A search can also keep just its first page and one more result, with a
+    ``more`` callback that searches for the rest when the second page is
+    asked for; see ``complete``.
+    """
+    
+    def __init__(self, max_entries: int = 64, max_results: int = 500, ttl: float = 600.0):
+        """Initialize an empty store with entry, size and age limits."""
+        self.max_entries = max_entries
+        self.max_results = max_results
+        self.ttl = ttl
+        self.pages = 0
+        self.expired = 0
+        self.evictions = 0
+        self._sets: "OrderedDict[str, ResultSet]" = OrderedDict()
+        self._keys: Dict[Hashable, str] = {}  # Search arguments -> set, to answer repeated searches
+        self._lock = threading.Lock()
+    
+    def open(
+        self,
+        tool: str,
+        results: List[Any],
+        page_size: int,
+        render: Callable[..., Any],
+        key: Optional[Hashable] = None,
+        generation: int = 0,
+        more: Optional[Callable[..., Any]] = None
+    ) -> Page:
+        """Return the first page of ``results``, keeping the rest if there is more than one page.
+        
+        ``key`` identifies the search so ``find`` can serve it again while the
+        vault generation is unchanged. With ``more``, ``results`` need only
+        one result past the first page.
+        """
+        truncated = len(results) > self.max_results
+        results = results[:self.max_results]
+        if len(results) <= page_size or self.max_entries < 1:
+            return Page(results[:page_size], None, render)
+        set_id = secrets.token_urlsafe(9)
+        with self._lock:
+            # Sets are kept in order of use, so expired ones are at the front
+            while self._sets and self._live(next(iter(self._sets))) is None:
+                pass
+            self._sets[set_id] = ResultSet(
+                tool, results, page_size, render, key, generation, time.monotonic(), truncated, more
+            )
+            if key is not None:
+                self._keys[key] = set_id
+            while len(self._sets) > self.max_entries:
+                evicted_id, evicted = self._sets.popitem(last=False)
+                self._forget_key(evicted_id, evicted)
+                self.evictions += 1
+        return Page(results[:page_size], f'{set_id}.{page_size}', render)
+    
+    def find(self, key: Hashable, generation: int) -> Optional[Page]:
+        """Return the first page of the set opened for ``key`` in ``generation``, if it is still held."""
+        with self._lock:
+            set_id = self._keys.get(key)
+            if set_id is None:
+                return None
+            entry = self._live(set_id)
+            if entry is None or entry.generation != generation:
+                return None
+            self.pages += 1
+            return self._slice(set_id, entry, 0)
+    
+    def page(self, cursor: str, tool: str) -> Optional[Page]:
+        """Return the page ``cursor`` points to, or None if it is malformed, expired or from another tool."""
+        set_id, _, offset = cursor.partition('.')
+        if not offset.isdigit():
+            return None
+        with self._lock:
+            entry = self._live(set_id)
+            if entry is None or entry.tool != tool:
+                return None
+            self.pages += 1
+            return self._slice(set_id, entry, int(offset))
+    
+    def complete(self, cursor: str, tool: str, rest: List[Any]) -> Optional[Page]:
+        """Add the results ``more`` found after those served so far, and return the page ``cursor`` points to."""
+        set_id, _, offset = cursor.partition('.')
+        if not offset.isdigit():
+            return None
+        with self._lock:
+            entry = self._live(set_id)
+            if entry is None or entry.tool != tool:
+                return None
+            if entry.more is not None:
+                results = entry.results[:int(offset)] + rest
+                entry = entry._replace(
+                    results=results[:self.max_results], truncated=len(results) > self.max_results, more=None
+                )
+            return self._slice(set_id, entry, int(offset))
+    
+    def clear(self) -> None:
+        """Drop every result set; their cursors stop working."""
+        with self._lock:
+            self._sets.clear()
+            self._keys.clear()
+    
+    def stats(self) -> Dict[str, Any]:
+        """Return size and page counters."""
+        with self._lock:
+            return {
+                'result_sets': len(self._sets),
+                'results': sum(len(entry.results) for entry in self._sets.values()),
+                'pages': self.pages,
+                'expired': self.expired,
+                'evictions': self.evictions,
+            }
+    
+    def __len__(self) -> int:
+        return len(self._sets)
+    
+    def _live(self, set_id: str) -> Optional[ResultSet]:
+        """Return a set if it has not expired, dropping it otherwise. Called with the lock held."""
+        entry = self._sets.get(set_id)
+        if entry is not None and time.monotonic() - entry.used_at > self.ttl:
+            del self._sets[set_id]
+            self._forget_key(set_id, entry)
+            self.expired += 1
+            return None
+        return entry
+    
+    def _slice(self, set_id: str, entry: ResultSet, offset: int) -> Page:
+        """Return the page at ``offset`` and mark the set used. Called with the lock held."""
+        self._sets[set_id] = entry._replace(used_at=time.monotonic())
+        self._sets.move_to_end(set_id)
+        end = offset + entry.page_size
+        if entry.more is not None and end >= len(entry.results):
+            # Past the first page of a set whose rest has not been searched for
+            return Page(entry.results[:offset], None, entry.render, more=entry.more)
+        next_cursor = f'{set_id}.{end}' if end < len(entry.results) else None
+        return Page(entry.results[offset:end], next_cursor, entry.render, entry.truncated and next_cursor is None)
+    
+    def _forget_key(self, set_id: str, entry: ResultSet) -> None:
+        """Drop the search arguments pointing to a removed set. Called with the lock held."""
+        if entry.key is not None and self._keys.get(entry.key) == set_id:
+            del self._keys[entry.key]
\ No newline at end of file
@@ -0,0 +1,206 @@
+"""Per-note frontmatter boundaries for scope-restricted searches."""
+
+import bisect
+import os
+import threading
+from pathlib import Path
+from typing import Dict, Iterable, List, NamedTuple, Optional, Pattern, Tuple
+
+
+class FrontmatterEntry(NamedTuple):
+    """Frontmatter boundary of one note version."""
+    mtime_ns: int
+    size: int
+    end_line: Optional[int]  # Line of the closing '---', None without frontmatter
+    block: bytes  # Lines 1..end_line, empty without frontmatter
+
+
+def read_frontmatter(path: Path, chunk_size: int = 4096) -> Tuple[Optional[int], bytes]:
+    """Read a note only up to the end of its frontmatter.
+    
+    Returns the line number of the closing '---' and the raw bytes of the
+    frontmatter block, or (None, b'') when the note has no frontmatter. Uses
+    the same rules as ``ParsedNote``: the first line starts with '---' and the
+    block ends at the next line that is exactly '---'.
+    """
+    data = b''
+    line_start = 0
+    line_num = 0
+    with open(path, 'rb') as f:
+        while True:
+            newline = data.find(b'\n', line_start)
+            if newline < 0:
+                chunk = f.read(chunk_size)
+                if chunk:
+                    data += chunk
+                    continue
+                if line_start >= len(data):
+                    return None, b''
+                newline = len(data)  # Last line without a line break
+            
+            line_num += 1
+            line = data[line_start:newline].strip()
+            if line_num == 1:
+                if not line.startswith(b'---'):
+                    return None, b''
+            elif line == b'---':
+                block = data[:newline + 1]
+                if not block.endswith(b'\n'):
+                    block += b'\n'
+                return line_num, block
+            line_start = newline + 1
+
+
+def parse_list_property(lines: Iterable[str], key_re: Pattern[str]) -> List[str]:
+    """Return the values of a list property in a note's frontmatter, given the note's first lines.
+    
+    ``key_re`` matches the property's key line and captures the rest of the
+    line. The value may be an inline list, a block list or a single value,
+    with or without quotes. Reading stops at the end of the frontmatter.
+    """
+    values: List[str] = []
+    in_list = False
+    for index, line in enumerate(lines):
+        stripped = line.strip()
+        if index == 0:
+            if not stripped.startswith('---'):
+                break
+            continue
+        if stripped == '---':
+            break
+        if in_list:
+            if stripped.startswith('-'):
+                values.append(_unquote_scalar(stripped[1:]))
+                continue
+            if not stripped:
+                continue
+            in_list = False
+        found = key_re.match(line)
+        if found is None:
+            continue
+        value = found.group(1).strip()
+        if not value:
+            in_list = True
+        elif value.startswith('['):
+            values.extend(_unquote_scalar(item) for item in value.strip('[]').split(','))
+        else:
+            values.append(_unquote_scalar(value))
+    return [value for value in values if value]
+
+
+def _unquote_scalar(value: str) -> str:
+    """Strip whitespace and matching YAML quotes from a scalar."""
+    value = value.strip()
+    if len(value) >= 2 and value[0] == value[-1] and value[0] in '"\'':
+        return value[1:-1].strip()
+    return value
+
+
+class FrontmatterBlocks:
+    """Frontmatter blocks of several notes concatenated for one ripgrep run.
+    
+    ripgrep reads ``data`` on stdin, so only frontmatter bytes are searched;
+    ``locate`` maps a line of the combined input back to its note.
+    """
+    
+    def __init__(self, blocks: Iterable[Tuple[str, bytes]]):
+        """Concatenate (relative path, block) pairs."""
+        self.files: List[str] = []
+        self._first_lines: List[int] = []
+        parts = []
+        lines = 0
+        for rel_path, block in blocks:
+            self.files.append(rel_path)
+            self._first_lines.append(lines + 1)
+            parts.append(block)
+            lines += block.count(b'\n')
+        self.data = b''.join(parts)
+    
+    def locate(self, line_number: int) -> Tuple[str, int]:
+        """Return the note and its own line number for a line of ``data``."""
+        index = bisect.bisect_right(self._first_lines, line_number) - 1
+        return self.files[index], line_number - self._first_lines[index] + 1
+    
+    def __len__(self) -> int:
+        return len(self.files)
+
+
+class FrontmatterTable:
+    """Frontmatter line ranges of vault notes, keyed by (path, mtime_ns, size).
+    
+    Only the head of a note is read to find its frontmatter, and an entry is
+    reused while the note's mtime and size are unchanged.
+    """
+    
+    def __init__(self, vault_path: Path):
+        """Initialize an empty table for a vault."""
+        self.vault_path = vault_path
+        self.reads = 0
+        self._entries: Dict[str, FrontmatterEntry] = {}
+        self._lock = threading.Lock()
+    
+    def get(self, rel_path: str) -> Optional[FrontmatterEntry]:
+        """Return the current entry for a note, re-reading its head if it changed."""
+        path = self.vault_path / rel_path
+        try:
+            stat = os.stat(path)
+        except OSError:
+            self.discard(rel_path)
+            return None
+        
+        entry = self._entries.get(rel_path)
+        if entry is not None and entry.mtime_ns == stat.st_mtime_ns and entry.size == stat.st_size:
+            return entry
+        
+        try:
+            end_line, block = read_frontmatter(path)
+        except OSError:
+            return None
+        self.reads += 1
+        entry = FrontmatterEntry(stat.st_mtime_ns, stat.st_size, end_line, block)
+        with self._lock:
+            self._entries[rel_path] = entry
+        return entry
+    
+    def end_line(self, rel_path: str) -> Optional[int]:
+        """Return the closing '---' line of a note's frontmatter, or None."""
+        entry = self.get(rel_path)
+        return entry.end_line if entry is not None else None
+    
+    def blocks(self, rel_paths: Iterable[str]) -> FrontmatterBlocks:
+        """Collect the frontmatter blocks of the given notes, skipping notes without one."""
+        found = []
+        for rel_path in rel_paths:
+            entry = self.get(rel_path)
+            if entry is not None and entry.end_line is not None:
+                found.append((rel_path, entry.block))
+        return FrontmatterBlocks(found)
+    
+    def entries(self) -> Dict[str, Tuple[int, int, Optional[int], bytes]]:
+        """Return every entry as a plain tuple, for ``load`` to seed another table."""
+        with self._lock:
+            return {rel_path: tuple(entry) for rel_path, entry in self._entries.items()}
+    
+    def load(self, entries: Dict[str, Tuple[int, int, Optional[int], bytes]]) -> None:
+        """Seed the table with saved entries, keeping entries it already has.
+        
+        Saved entries are checked against the note's mtime and size on use
+        like any other.
+        """
+        with self._lock:
+            for rel_path, values in entries.items():
+                if rel_path not in self._entries:
+                    self._entries[rel_path] = FrontmatterEntry(*values)
+    
+    def discard(self, rel_path: str) -> None:
+        """Drop a note from the table."""
+        with self._lock:
+            self._entries.pop(rel_path, None)
+    
+    def clear(self) -> None:
+        """Drop every entry."""
+        with self._lock:
+            self._entries.clear()
+    
+    def __len__(self) -> int:
+        return len(self._entries)
\ No newline at end of file
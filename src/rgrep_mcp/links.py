@@ -0,0 +1,367 @@
+"""Link graph index for Obsidian vaults."""
+
+import functools
+import posixpath
+import re
+import time
+from typing import Any, Dict, Iterable, List, NamedTuple, Optional, Set, Tuple
+from urllib.parse import unquote
+
+from .frontmatter import parse_list_property
+
+
+EXTERNAL_URL_RE = re.compile(r'https?://[^\s\)\"\']+')
+
+# Every link on a line in one pass: wiki links, split by the pattern into target,
+# heading, block and alias; markdown links; and bare external URLs. Each
+# alternative starts with a literal, so the scanner skips ahead to the next '['
+# or 'h'. The '!' before an embed is checked separately
+LINK_TOKEN_RE = re.compile(
+    r'\[\[(?P<wiki>(?=[^\]])(?P<target>[^\]|#^]*)(?:#(?P<heading>[^\]|^]*))?'
+    r'(?:\^(?P<block>[^\]|]*))?(?:\|(?P<alias>[^\]]*))?)\]\]'
+    r'|\[(?P<title>[^\]]*)\]\((?P<url>[^)]+)\)'
+    r'|(?P<external>https?://[^\s\)\"\']+)'
+)
+
+# Frontmatter key listing other names a note can be linked by
+ALIAS_KEY_RE = re.compile(r'(?:aliases|alias)\s*:(.*)$')
+
+
+class LinkToken(NamedTuple):
+    """One link on a line, as found by ``tokenize_links``."""
+    kind: str  # 'wiki_link', 'markdown_link' or 'external_url'
+    title: str  # Wiki link as written, markdown link text, or the URL
+    url: str  # Wiki link as written, markdown link URL, or the URL
+    target: str  # Note or file linked to, without heading, block or alias; '' if not in the vault
+    heading: str = ''
+    block: str = ''
+    alias: str = ''
+    embed: bool = False
+
+
+class LinkOccurrence(NamedTuple):
+    """A single link from one note to another."""
+    source: str
+    line_number: int
+    text: str
+    target: str  # Link target as written, e.g. "Projects/Alpha" or "Beta.md"
+
+
+def note_key(path: str) -> str:
+    """Normalize a relative note path for case-insensitive lookups."""
+    return path.replace('\\', '/').lower()
+
+
+def tokenize_links(text: str) -> List[LinkToken]:
+    """Return every link on a line of text, in the order they appear.
+    
+    The URL of a markdown link to a web page is also returned as an external
+    URL, right after the markdown link.
+    """
+    tokens: List[LinkToken] = []
+    if '[' not in text and '://' not in text:
+        return tokens
+    
+    embeds = None
+    if '!' in text:
+        # findall gives no positions, so embeds are told apart in a second pass
+        embeds = [
+            match.start() > 0 and text[match.start() - 1] == '!' for match in LINK_TOKEN_RE.finditer(text)
+        ]
+    
+    for index, groups in enumerate(LINK_TOKEN_RE.findall(text)):
+        wiki, target, heading, block, alias, title, url, external = groups
+        embed = embeds is not None and embeds[index]
+        if wiki:
+            tokens.append(LinkToken('wiki_link', wiki, wiki, target.strip(), heading, block, alias, embed))
+        elif external:
+            tokens.append(LinkToken('external_url', external, external, ''))
+        else:
+            target, heading = _markdown_target(url)
+            tokens.append(LinkToken('markdown_link', title, url, target, heading, '', '', embed))
+            web = EXTERNAL_URL_RE.match(url.strip()) if '://' in url else None
+            if web:
+                tokens.append(LinkToken('external_url', web.group(), web.group(), ''))
+    return tokens
+
+
+def _markdown_target(url: str) -> Tuple[str, str]:
+    """Return the path and heading a markdown link points at, or empty strings for web and mail links."""
+    address = url.strip().split(' ')[0]
+    if '://' in address or address.startswith('mailto:'):
+        return '', ''
+    path, _, heading = address.partition('#')
+    if '%' in address:
+        path, heading = unquote(path), unquote(heading)
+    return path, heading
+
+
+def extract_note_targets(text: str) -> List[str]:
+    """Extract link targets that may point at vault notes from a line of text.
+    
+    Same targets as ``tokenize_links``, read straight from the scanner's groups
+    since building the link graph needs nothing else.
+    """
+    targets = []
+    if '[' not in text:
+        return targets
+    
+    for wiki, target, _heading, _block, _alias, _title, url, _external in LINK_TOKEN_RE.findall(text):
+        if wiki:
+            target = target.strip()
+        elif url:
+            target = _markdown_target(url)[0]
+        else:
+            continue
+        if target:
+            targets.append(target)
+    return targets
+
+
+def parse_aliases(lines: Iterable[str]) -> List[str]:
+    """Return the aliases in a note's frontmatter, given the note's first lines."""
+    return parse_list_property(lines, ALIAS_KEY_RE)
+
+
+def target_name(target: str) -> str:
+    """Return the lowercase file name, without .md, that a link target can resolve to."""
+    name = posixpath.basename(target.replace('\\', '/')).lower()
+    return name[:-3] if name.endswith('.md') else name
+
+
+class LinkGraph:
+    """In-memory forward and backward link index over every note in a vault.
+    
+    ``forward`` maps a note to the notes it links to and ``backward`` maps a note
+    to every link pointing at it, so backlink queries are dictionary lookups.
+    
+    Links resolve the way Obsidian resolves them: by path, then by file name
+    (the note closest to the vault root wins), then by the end of a partial
+    path, then by a frontmatter alias. Every step is a lookup in an index
+    keyed by path, file name or alias.
+    
+    The graph keeps each note's link lines, so ``update_note`` and
+    ``remove_note`` re-resolve only the links a change can affect.
+    """
+    
+    def __init__(self, notes: Iterable[str]):
+        """Initialize an empty graph over relative note paths, ordered newest first."""
+        self.notes: List[str] = list(notes)
+        self._recency = {note: rank for rank, note in enumerate(self.notes)}
+        self._next_rank = -1  # Updated notes rank ahead of every note seen so far
+        self.forward: Dict[str, Set[str]] = {}
+        self.backward: Dict[str, List[LinkOccurrence]] = {}
+        self.linking_notes: Set[str] = set()  # Notes with any outgoing link, external ones included
+        self.aliases: Dict[str, List[str]] = {}  # Frontmatter aliases per note
+        self.built_at = time.monotonic()
+        
+        # Link lines per note, and the notes linking to each target file name
+        self._lines: Dict[str, List[Tuple[int, str]]] = {}
+        self._sources_by_name: Dict[str, Set[str]] = {}
+        
+        self._notes_by_path = {note_key(note): note for note in self.notes}
+        self._notes_by_name: Dict[str, List[str]] = {}
+        for key, note in zip(self._notes_by_path, self.notes):
+            name = posixpath.splitext(posixpath.basename(key))[0]
+            self._notes_by_name.setdefault(name, []).append(note)
+        for paths in self._notes_by_name.values():
+            if len(paths) > 1:
+                self._sort_same_name(paths)
+        self._notes_by_alias: Dict[str, List[str]] = {}
+    
+    @staticmethod
+    def _sort_same_name(paths: List[str]) -> None:
+        # Obsidian prefers the note closest to the vault root
+        paths.sort(key=lambda p: (note_key(p).count('/'), p))
+    
+    def add_line(self, source: str, line_number: int, text: str) -> None:
+        """Index every link found on one line of a note."""
+        self.linking_notes.add(source)
+        self._lines.setdefault(source, []).append((line_number, text))
+        for target in extract_note_targets(text):
+            self._sources_by_name.setdefault(target_name(target), set()).add(source)
+            resolved = self.resolve(target, source)
+            if resolved is None:
+                continue
+            self.forward.setdefault(source, set()).add(resolved)
+            self.backward.setdefault(resolved, []).append(
+                LinkOccurrence(source, line_number, text, target)
+            )
+    
+    def resolve(self, target: str, source: str = '') -> Optional[str]:
+        """Resolve a link target to the relative path of an existing note."""
+        target = target.replace('\\', '/')
+        if not target.lower().endswith('.md'):
+            target += '.md'  # Attachments get a suffix no note has, so they never resolve
+        
+        # Relative to the linking note, then relative to the vault root
+        source_dir = posixpath.dirname(source.replace('\\', '/'))
+        candidates = (posixpath.join(source_dir, target), target.lstrip('/')) if source_dir else (target.lstrip('/'),)
+        for candidate in candidates:
+            if '/.' in '/' + candidate:  # Only ./ and ../ segments need normalizing
+                candidate = posixpath.normpath(candidate)
+            note = self._notes_by_path.get(note_key(candidate))
+            if note:
+                return note
+        
+        # Bare note names resolve by file name anywhere in the vault
+        if '/' not in target:
+            matches = self._notes_by_name.get(target[:-3].lower())
+            if matches:
+                return matches[0]
+            matches = self._notes_by_alias.get(target[:-3].lower())
+            return matches[0] if matches else None
+        
+        # Partial paths resolve to a note whose path ends with them
+        suffix = '/' + note_key(posixpath.normpath(target.lstrip('/')))
+        for note in self._notes_by_name.get(target_name(target), ()):
+            if ('/' + note_key(note)).endswith(suffix):
+                return note
+        return None
+    
+    def backlinks(self, note: str) -> List[LinkOccurrence]:
+        """Return links pointing at ``note`` from other notes, newest source first."""
+        occurrences = [link for link in self.backward.get(note, []) if link.source != note]
+        occurrences.sort(key=lambda link: (self._recency.get(link.source, 0), link.line_number))
+        return occurrences
+    
+    def has_incoming(self, note: str) -> bool:
+        """Check whether any other note links to ``note``."""
+        return any(link.source != note for link in self.backward.get(note, []))
+    
+    def orphans(self) -> Set[str]:
+        """Return notes with no outgoing links and no incoming links from other notes."""
+        return {
+            note for note in self.notes
+            if note not in self.linking_notes and not self.has_incoming(note)
+        }
+    
+    def age(self) -> float:
+        """Seconds since the graph was built."""
+        return time.monotonic() - self.built_at
+    
+    def state(self) -> Dict[str, Any]:
+        """Return the graph as plain containers, for ``from_state`` to restore without resolving links."""
+        return {
+            'notes': self.notes,
+            'recency': self._recency,
+            'next_rank': self._next_rank,
+            'forward': self.forward,
+            'backward': {note: [tuple(link) for link in links] for note, links in self.backward.items()},
+            'linking_notes': self.linking_notes,
+            'aliases': self.aliases,
+            'lines': self._lines,
+            'sources_by_name': self._sources_by_name,
+            'notes_by_path': self._notes_by_path,
+            'notes_by_name': self._notes_by_name,
+            'notes_by_alias': self._notes_by_alias,
+        }
+    
+    @classmethod
+    def from_state(cls, state: Dict[str, Any]) -> 'LinkGraph':
+        """Rebuild a graph from the containers ``state`` returned."""
+        graph = cls.__new__(cls)
+        occurrence = functools.partial(tuple.__new__, LinkOccurrence)
+        graph.notes = state['notes']
+        graph._recency = state['recency']
+        graph._next_rank = state['next_rank']
+        graph.forward = state['forward']
+        graph.backward = {note: list(map(occurrence, links)) for note, links in state['backward'].items()}
+        graph.linking_notes = state['linking_notes']
+        graph.aliases = state['aliases']
+        graph.built_at = time.monotonic()
+        graph._lines = state['lines']
+        graph._sources_by_name = state['sources_by_name']
+        graph._notes_by_path = state['notes_by_path']
+        graph._notes_by_name = state['notes_by_name']
+        graph._notes_by_alias = state['notes_by_alias']
+        return graph
+    
+    def set_aliases(self, note: str, aliases: Iterable[str]) -> None:
+        """Record the frontmatter aliases of ``note`` and re-resolve links they affect."""
+        self._reindex(self._replace_aliases(note, aliases))
+    
+    def update_note(self, note: str, lines: Iterable[str]) -> None:
+        """Re-index a created or edited note from its current lines."""
+        lines = list(lines)
+        if note_key(note) not in self._notes_by_path:
+            self._add_note(note)
+        self._clear_source(note)
+        self._recency[note] = self._next_rank
+        self._next_rank -= 1
+        self.set_aliases(note, parse_aliases(lines))
+        for line_number, text in enumerate(lines, 1):
+            if LINK_TOKEN_RE.search(text):
+                self.add_line(note, line_number, text.strip())
+    
+    def remove_note(self, note: str) -> None:
+        """Drop a deleted note and re-resolve links that pointed at it."""
+        key = note_key(note)
+        note = self._notes_by_path.pop(key, None)
+        if note is None:
+            return
+        self._clear_source(note)
+        self.notes.remove(note)
+        self._recency.pop(note, None)
+        name = posixpath.splitext(posixpath.basename(key))[0]
+        same_name = self._notes_by_name.get(name, [])
+        if note in same_name:
+            same_name.remove(note)
+        if not same_name:
+            self._notes_by_name.pop(name, None)
+        
+        affected = {link.source for link in self.backward.pop(note, [])}
+        affected |= self._sources_by_name.get(name, set())
+        affected |= self._replace_aliases(note, ())
+        self._reindex(affected)
+    
+    def _add_note(self, note: str) -> None:
+        """Add a new note and re-resolve links that may now point at it."""
+        key = note_key(note)
+        self.notes.append(note)
+        self._notes_by_path[key] = note
+        name = posixpath.splitext(posixpath.basename(key))[0]
+        same_name = self._notes_by_name.setdefault(name, [])
+        same_name.append(note)
+        self._sort_same_name(same_name)
+        self._reindex(self._sources_by_name.get(name, set()))
+    
+    def _replace_aliases(self, note: str, aliases: Iterable[str]) -> Set[str]:
+        """Swap the aliases of ``note``, returning the sources whose links may change."""
+        aliases = [alias for alias in aliases if '/' not in alias]
+        old = {alias.lower() for alias in self.aliases.pop(note, [])}
+        new = {alias.lower() for alias in aliases}
+        if aliases:
+            self.aliases[note] = aliases
+        for name in old - new:
+            same_alias = self._notes_by_alias.get(name, [])
+            if note in same_alias:
+                same_alias.remove(note)
+            if not same_alias:
+                self._notes_by_alias.pop(name, None)
+        for name in new - old:
+            same_alias = self._notes_by_alias.setdefault(name, [])
+            same_alias.append(note)
+            self._sort_same_name(same_alias)
+        
+        affected: Set[str] = set()
+        for name in old ^ new:
+            affected |= self._sources_by_name.get(name, set())
+        return affected
+    
+    def _clear_source(self, source: str) -> List[Tuple[int, str]]:
+        """Remove every link from ``source``, returning its link lines."""
+        for target in self.forward.pop(source, ()):
+            remaining = [link for link in self.backward.get(target, []) if link.source != source]
+            if remaining:
+                self.backward[target] = remaining
+            else:
+                self.backward.pop(target, None)
+        self.linking_notes.discard(source)
+        return self._lines.pop(source, [])
+    
+    def _reindex(self, sources: Iterable[str]) -> None:
+        """Resolve the stored link lines of ``sources`` again."""
+        for source in list(sources):
+            for line_number, text in self._clear_source(source):
+                self.add_line(source, line_number, text)
\ No newline at end of file
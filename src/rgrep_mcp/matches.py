@@ -0,0 +1,81 @@
+"""Compact records for the lines ripgrep matches."""
+
+from typing import Any, Dict, Iterator, Optional
+
+
+class Match:
+    """One line ripgrep matched in a note.
+    
+    Searches can stream tens of thousands of matches, so a match is a slotted
+    record rather than a dict. It flows through parsing, filtering, ordering
+    and smart context without being copied, and becomes a dict only when a
+    result is formatted. Item access (``match['file']``, ``match.get('text')``,
+    ``'smart_context' in match``) keeps working for callers written against
+    the dicts searches used to return.
+    """
+    
+    __slots__ = ('file', 'line_number', 'text', 'match_start', 'match_end', 'smart_context')
+    
+    # Keys of ``to_dict``; 'smart_context' is only present once it is set
+    KEYS = ('file', 'line_number', 'text', 'match_start', 'match_end', 'smart_context')
+    
+    def __init__(
+        self,
+        file: str,
+        line_number: int,
+        text: str,
+        match_start: int = 0,
+        match_end: int = 0,
+        smart_context: Optional[str] = None
+    ):
+        """Create a match; ``match_start`` and ``match_end`` are byte offsets into ``text``."""
+        self.file = file
+        self.line_number = line_number
+        self.text = text
+        self.match_start = match_start
+        self.match_end = match_end
+        self.smart_context = smart_context
+    
+    def with_span(self, match_start: int, match_end: int) -> 'Match':
+        """Return a copy pointing at another part of the same line."""
+        return Match(self.file, self.line_number, self.text, match_start, match_end, self.smart_context)
+    
+    def to_dict(self) -> Dict[str, Any]:
+        """Return the match as a dict, for JSON output."""
+        return {key: getattr(self, key) for key in self}
+    
+    def __iter__(self) -> Iterator[str]:
+        """Iterate over the keys the match has, like a dict."""
+        for key in self.KEYS:
+            if key != 'smart_context' or self.smart_context is not None:
+                yield key
+    
+    def keys(self) -> Iterator[str]:
+        """Return the keys the match has, like a dict."""
+        return iter(self)
+    
+    def __getitem__(self, key: str) -> Any:
+        if key not in self:
+            raise KeyError(key)
+        return getattr(self, key)
+    
+    def get(self, key: str, default: Any = None) -> Any:
+        """Return the value for ``key``, or ``default`` if the match has no such key."""
+        return getattr(self, key) if key in self else default
+    
+    def __contains__(self, key: object) -> bool:
+        if key == 'smart_context':
+            return self.smart_context is not None
+        return key in self.KEYS
+    
+    def __eq__(self, other: object) -> bool:
+        if isinstance(other, Match):
+            return self.to_dict() == other.to_dict()
+        if isinstance(other, dict):
+            return self.to_dict() == other
+        return NotImplemented
+    
+    __hash__ = None  # Mutable, like the dicts it replaces
+    
+    def __repr__(self) -> str:
+        return f"Match({self.to_dict()!r})"
\ No newline at end of file
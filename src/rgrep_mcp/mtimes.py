@@ -0,0 +1,112 @@
+"""In-memory index of note modification times."""
+
+import bisect
+import os
+import threading
+import time
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Tuple
+
+
+class MtimeIndex:
+    """Vault notes kept sorted by modification time.
+    
+    Date-range queries are a bisect into the sorted list followed by a walk
+    from the newest end, so returning the top results does not touch the disk
+    or sort the vault. ``update`` and ``remove`` keep the index current as
+    individual notes change. Hidden notes, whose names start with a dot, are
+    never indexed.
+    """
+    
+    def __init__(self):
+        """Initialize an empty index."""
+        self._mtimes: Dict[str, float] = {}
+        self._order: List[Tuple[float, str]] = []  # Ascending (mtime, relative path)
+        self._lock = threading.Lock()
+        self._built_at = time.monotonic()
+    
+    @classmethod
+    def scan(cls, vault_path: Path, notes: Iterable[str]) -> 'MtimeIndex':
+        """Build an index of the listed notes, given by path relative to the vault."""
+        index = cls()
+        root = str(vault_path)
+        entries = []
+        for rel_path in notes:
+            if _is_hidden(rel_path):
+                continue
+            try:
+                entries.append((os.stat(os.path.join(root, rel_path)).st_mtime, rel_path))
+            except OSError:
+                continue
+        entries.sort()
+        index._order = entries
+        index._mtimes = {rel_path: mtime for mtime, rel_path in entries}
+        return index
+    
+    def update(self, rel_path: str, mtime: float) -> None:
+        """Add a note or move it to its new modification time."""
+        if _is_hidden(rel_path):
+            return
+        with self._lock:
+            self._discard(rel_path)
+            self._mtimes[rel_path] = mtime
+            bisect.insort(self._order, (mtime, rel_path))
+    
+    def remove(self, rel_path: str) -> None:
+        """Drop a deleted note."""
+        with self._lock:
+            self._discard(rel_path)
+    
+    def mtime(self, rel_path: str) -> Optional[float]:
+        """Return a note's indexed modification time, or None if it is not indexed."""
+        return self._mtimes.get(rel_path)
+    
+    def mtimes(self) -> Dict[str, float]:
+        """Return a copy of every indexed note's modification time."""
+        with self._lock:
+            return dict(self._mtimes)
+    
+    def newest(
+        self,
+        start: Optional[float] = None,
+        end: Optional[float] = None,
+        prefix: str = '',
+        limit: Optional[int] = None
+    ) -> List[Tuple[str, float]]:
+        """Return (relative path, mtime) of notes modified in [start, end), newest first.
+        
+        Only paths starting with ``prefix`` are included, and at most ``limit``
+        of them are returned.
+        """
+        with self._lock:
+            lo = 0 if start is None else bisect.bisect_left(self._order, (start,))
+            hi = len(self._order) if end is None else bisect.bisect_left(self._order, (end,))
+            found = []
+            for i in range(hi - 1, lo - 1, -1):
+                mtime, rel_path = self._order[i]
+                if rel_path.startswith(prefix):
+                    found.append((rel_path, mtime))
+                    if limit is not None and len(found) >= limit:
+                        break
+            return found
+    
+    def age(self) -> float:
+        """Seconds since the index was built."""
+        return time.monotonic() - self._built_at
+    
+    def __len__(self) -> int:
+        return len(self._mtimes)
+    
+    def __contains__(self, rel_path: str) -> bool:
+        return rel_path in self._mtimes
+    
+    def _discard(self, rel_path: str) -> None:
+        old = self._mtimes.pop(rel_path, None)
+        if old is not None:
+            i = bisect.bisect_left(self._order, (old, rel_path))
+            if i < len(self._order) and self._order[i] == (old, rel_path):
+                del self._order[i]
+
+
+def _is_hidden(rel_path: str) -> bool:
+    return os.path.basename(rel_path).startswith('.')
\ No newline at end of file
@@ -0,0 +1,239 @@
+"""Parsed-note cache and per-note outlines used for smart context."""
+
+import bisect
+import os
+import threading
+from collections import OrderedDict
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+
+class NoteOutline:
+    """Where a note's frontmatter ends, its headings and the property of each frontmatter line.
+    
+    Enough to give a match its smart context without the note's text.
+    """
+    
+    def __init__(self, frontmatter_end: Optional[int], headings: List[Tuple[int, str]], property_context: Dict[int, str]):
+        """Initialize an outline from saved parts."""
+        self.frontmatter_end = frontmatter_end
+        self.headings = headings
+        self._heading_lines = [line_num for line_num, _ in headings]
+        self._property_context = property_context
+    
+    def state(self) -> Tuple[Optional[int], List[Tuple[int, str]], Dict[int, str]]:
+        """Return the outline as plain values, for ``NoteOutline(*state)``."""
+        return self.frontmatter_end, self.headings, self._property_context
+    
+    def is_in_frontmatter(self, line_num: int) -> bool:
+        """Check if a line number falls inside the frontmatter block."""
+        return self.frontmatter_end is not None and 1 <= line_num <= self.frontmatter_end
+    
+    def heading_for_line(self, line_num: int) -> Optional[str]:
+        """Return the nearest heading at or above a line number."""
+        index = bisect.bisect_right(self._heading_lines, line_num) - 1
+        if index < 0:
+            return None
+        return self.headings[index][1]
+    
+    def property_for_line(self, line_num: int) -> Optional[str]:
+        """Return the frontmatter property a line belongs to.
+        
+        A ``key: value`` line is its own property; list items, continuation
+        lines and nested headers belong to the nearest less indented key above.
+        """
+        return self._property_context.get(line_num)
+
+
+class ParsedNote(NoteOutline):
+    """A note split into lines with its outline: frontmatter properties and headings."""
+    
+    # Rough per-line cost of the str objects and list slots on top of the text itself
+    LINE_OVERHEAD_BYTES = 64
+    
+    def __init__(self, text: str):
+        """Parse note text into lines, line offsets, frontmatter end, properties and headings."""
+        self.lines: List[str] = text.split('\n')
+        
+        # Character offset where each line starts (index 0 is line 1)
+        self.line_offsets: List[int] = []
+        offset = 0
+        for line in self.lines:
+            self.line_offsets.append(offset)
+            offset += len(line) + 1
+        
+        # Line number of the closing '---', or None when there is no frontmatter
+        self.frontmatter_end: Optional[int] = None
+        if self.lines and self.lines[0].strip().startswith('---'):
+            for i, line in enumerate(self.lines[1:], 1):
+                if line.strip() == '---':
+                    self.frontmatter_end = i + 1
+                    break
+        
+        # (line number, heading text) for every line that starts with '#'
+        self.headings: List[Tuple[int, str]] = []
+        for i, line in enumerate(self.lines, 1):
+            stripped = line.strip()
+            if stripped.startswith('#'):
+                heading_text = stripped.lstrip('#').strip()
+                if heading_text:
+                    self.headings.append((i, heading_text))
+        self._heading_lines = [line_num for line_num, _ in self.headings]
+        
+        # (line number, dotted key path) for every frontmatter property, nested
+        # keys included, and the property giving each frontmatter line its context
+        self.properties: List[Tuple[int, str]] = []
+        self._property_context: Dict[int, str] = {}
+        if self.frontmatter_end is not None:
+            self._index_properties()
+        
+        self.nbytes = len(text) + self.LINE_OVERHEAD_BYTES * len(self.lines)
+    
+    def _index_properties(self) -> None:
+        """Map frontmatter lines to properties in one pass over the YAML."""
+        # Enclosing key lines as (indent, key), with strictly increasing indents
+        parents: List[Tuple[int, str]] = []
+        for line_num in range(1, self.frontmatter_end + 1):
+            line = self.lines[line_num - 1]
+            stripped = line.strip()
+            if not stripped:
+                continue
+            indent = len(line) - len(line.lstrip())
+            key = line.split(':')[0].strip() if ':' in line else ''
+            
+            if key and not key.startswith('-') and not stripped.endswith(':'):
+                self._property_context[line_num] = key
+            else:
+                for parent_indent, parent_key in reversed(parents):
+                    if parent_indent < indent:
+                        self._property_context[line_num] = parent_key
+                        break
+            
+            if key:
+                while parents and parents[-1][0] >= indent:
+                    parents.pop()
+                path = [k.lstrip('-').strip() for _, k in parents]
+                self.properties.append((line_num, '.'.join(path + [key.lstrip('-').strip()])))
+                parents.append((indent, key))
+
+
+class NoteCache:
+    """LRU cache of parsed notes keyed by (path, mtime_ns, size).
+    
+    A cached note is reused only while the file's mtime and size are unchanged,
+    so repeated queries read from disk only the notes that were edited.
+    
+    Outlines of notes from an earlier run can be loaded too; ``outline``
+    answers from them, under the same mtime and size check, until the note
+    is parsed again. They count against ``max_entries`` and are evicted
+    before cached notes, oldest note first.
+    """
+    
+    def __init__(self, max_entries: int = 2048, max_bytes: int = 64 * 1024 * 1024):
+        """Initialize an empty cache with entry and byte limits."""
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self._entries: "OrderedDict[str, Tuple[int, int, ParsedNote]]" = OrderedDict()
+        self._outlines: "OrderedDict[str, Tuple[int, int, NoteOutline]]" = OrderedDict()  # Oldest note first
+        self._bytes = 0
+        self._lock = threading.Lock()
+    
+    def get(self, path: Path) -> Optional[ParsedNote]:
+        """Return the parsed note at ``path``, reading it only if it changed."""
+        key = str(path)
+        try:
+            stat = os.stat(key)
+        except OSError:
+            self.discard(path)
+            return None
+        
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry[0] == stat.st_mtime_ns and entry[1] == stat.st_size:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return entry[2]
+            self.misses += 1
+        
+        try:
+            with open(key, 'r', encoding='utf-8', errors='replace', newline='') as f:
+                note = ParsedNote(f.read())
+        except OSError:
+            return None
+        
+        with self._lock:
+            self._remove(key)
+            self._outlines.pop(key, None)
+            if note.nbytes <= self.max_bytes:
+                self._entries[key] = (stat.st_mtime_ns, stat.st_size, note)
+                self._bytes += note.nbytes
+                self._evict()
+        return note
+    
+    def outline(self, path: Path) -> Optional[NoteOutline]:
+        """Return the outline of the note at ``path``, from a loaded outline if the note is unchanged."""
+        key = str(path)
+        kept = self._outlines.get(key)
+        if kept is None:
+            return self.get(path)
+        try:
+            stat = os.stat(key)
+        except OSError:
+            self.discard(path)
+            return None
+        if kept[0] == stat.st_mtime_ns and kept[1] == stat.st_size:
+            with self._lock:
+                self.hits += 1
+            return kept[2]
+        return self.get(path)
+    
+    def outlines(self) -> Dict[str, Tuple[int, int, tuple]]:
+        """Return the (mtime_ns, size, outline state) of every cached note and loaded outline."""
+        with self._lock:
+            found = {key: (mtime_ns, size, outline.state()) for key, (mtime_ns, size, outline) in self._outlines.items()}
+            found.update({key: (mtime_ns, size, note.state()) for key, (mtime_ns, size, note) in self._entries.items()})
+        return found
+    
+    def load_outlines(self, outlines: Dict[str, Tuple[int, int, tuple]]) -> None:
+        """Keep outlines ``outlines`` returned, for the newest notes that are not cached."""
+        with self._lock:
+            for key, (mtime_ns, size, state) in sorted(outlines.items(), key=lambda item: item[1][0]):
+                if key not in self._entries:
+                    self._outlines.pop(key, None)
+                    self._outlines[key] = (mtime_ns, size, NoteOutline(*state))
+            self._evict()
+    
+    def discard(self, path: Path) -> None:
+        """Drop a note from the cache."""
+        with self._lock:
+            self._remove(str(path))
+            self._outlines.pop(str(path), None)
+    
+    def clear(self) -> None:
+        """Drop every cached note."""
+        with self._lock:
+            self._entries.clear()
+            self._outlines.clear()
+            self._bytes = 0
+    
+    @property
+    def size_bytes(self) -> int:
+        """Approximate memory held by cached notes."""
+        return self._bytes
+    
+    def __len__(self) -> int:
+        return len(self._entries)
+    
+    def _remove(self, key: str) -> None:
+        entry = self._entries.pop(key, None)
+        if entry is not None:
+            self._bytes -= entry[2].nbytes
+    
+    def _evict(self) -> None:
+        while self._entries and (len(self._entries) > self.max_entries or self._bytes > self.max_bytes):
+            _key, (_mtime, _size, note) = self._entries.popitem(last=False)
+            self._bytes -= note.nbytes
+        while self._outlines and len(self._entries) + len(self._outlines) > self.max_entries:
+            self._outlines.popitem(last=False)
\ No newline at end of file
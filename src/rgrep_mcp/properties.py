@@ -0,0 +1,256 @@
+"""Columnar index of frontmatter properties for structured queries."""
+
+import bisect
+import math
+import time
+from datetime import date, datetime
+from typing import Any, Dict, Hashable, Iterable, List, Optional, Set, Tuple
+
+# Operators accepted in property conditions
+OPERATORS = ('eq', 'contains', 'gt', 'gte', 'lt', 'lte', 'exists', 'missing')
+
+
+def parse_properties(block: bytes) -> Dict[str, Any]:
+    """Parse a frontmatter block, fences included, into a dict of properties.
+    
+    Returns an empty dict for invalid YAML or frontmatter that is not a mapping.
+    """
+    # Imported here so server startup does not pay for the YAML parser
+    import yaml
+    
+    body = '\n'.join(block.decode('utf-8', 'replace').splitlines()[1:-1])
+    try:
+        # The libyaml loader, when PyYAML was built with it, is several times faster
+        data = yaml.load(body, Loader=getattr(yaml, 'CSafeLoader', yaml.SafeLoader))
+    except yaml.YAMLError:
+        return {}
+    return _plain(data) if isinstance(data, dict) else {}
+
+
+def flatten_properties(properties: Dict[str, Any], prefix: str = '') -> Dict[str, Any]:
+    """Return properties keyed by lowercase dotted key paths, nested keys included."""
+    flat = {}
+    for key, value in properties.items():
+        path = prefix + str(key).lower()
+        flat[path] = value
+        if isinstance(value, dict):
+            flat.update(flatten_properties(value, path + '.'))
+    return flat
+
+
+def value_key(value: Any) -> Hashable:
+    """Return the form a scalar is indexed and compared under.
+    
+    Strings compare case-insensitively, numbers by value, and booleans as
+    'true' and 'false', so values read from YAML match values given in JSON.
+    """
+    if isinstance(value, bool):
+        return 'true' if value else 'false'
+    if isinstance(value, (int, float)):
+        return float(value)
+    if value is None:
+        return None
+    return str(value).strip().casefold()
+
+
+def _plain(value: Any) -> Any:
+    """Convert YAML dates to ISO strings so values are JSON-serializable."""
+    if isinstance(value, (date, datetime)):
+        return value.isoformat()
+    if isinstance(value, dict):
+        return {str(key): _plain(item) for key, item in value.items()}
+    if isinstance(value, list):
+        return [_plain(item) for item in value]
+    return value
+
+
+def _scalars(value: Any) -> List[Any]:
+    """Return the scalars a value is indexed under: itself, or each item of a list."""
+    if isinstance(value, list):
+        return [item for item in value if not isinstance(item, (list, dict))]
+    if isinstance(value, dict):
+        return []
+    return [value]
+
+
+def _number(text: str) -> Optional[float]:
+    """Parse a quoted number, or return None; 'nan' and 'inf' stay text, since they cannot be ordered."""
+    try:
+        number = float(text)
+    except ValueError:
+        return None
+    return number if math.isfinite(number) else None
+
+
+def _operand_keys(value: Any) -> List[Hashable]:
+    """Return the indexed forms an operand can match; '3' and 3 match each other."""
+    keys = [value_key(value)]
+    if isinstance(value, str):
+        number = _number(value)
+        if number is not None:
+            keys.append(number)
+    elif isinstance(value, (int, float)) and not isinstance(value, bool):
+        keys.append(str(value))
+    return keys
+
+
+class PropertyIndex:
+    """Frontmatter properties of every note, stored column by column.
+    
+    Each property (nested keys as dotted paths) maps its values to the notes
+    having them, with list items indexed one by one, so equality, containment
+    and existence are dictionary lookups. Range conditions bisect sorted
+    arrays of the values of a property, rebuilt on first use after a change.
+    Notes are re-parsed only when their (mtime, size) version changes.
+    """
+    
+    def __init__(self):
+        """Initialize an empty index."""
+        self._versions: Dict[str, Tuple[int, int]] = {}
+        self._properties: Dict[str, Dict[str, Any]] = {}  # Flattened properties per note
+        self._columns: Dict[str, Dict[Hashable, Set[str]]] = {}  # Property -> value key -> notes
+        self._sorted: Dict[str, Tuple[List[Any], List[str], List[Any], List[str]]] = {}
+        self.built_at = time.monotonic()
+    
+    def version(self, note: str) -> Optional[Tuple[int, int]]:
+        """Return the (mtime_ns, size) of the indexed version of ``note``."""
+        return self._versions.get(note)
+    
+    def set_properties(self, note: str, properties: Dict[str, Any], version: Optional[Tuple[int, int]] = None) -> None:
+        """Replace the properties of ``note`` with a parsed frontmatter mapping."""
+        self.remove(note)
+        if version is not None:
+            self._versions[note] = version
+        flat = flatten_properties(properties)
+        if not flat:
+            return
+        self._properties[note] = flat
+        for key, value in flat.items():
+            column = self._columns.setdefault(key, {})
+            for scalar in _scalars(value) or [None]:
+                column.setdefault(value_key(scalar), set()).add(note)
+            self._sorted.pop(key, None)
+    
+    def remove(self, note: str) -> None:
+        """Drop ``note`` from the index."""
+        self._versions.pop(note, None)
+        flat = self._properties.pop(note, None)
+        if not flat:
+            return
+        for key, value in flat.items():
+            column = self._columns.get(key)
+            if column is None:
+                continue
+            for scalar in _scalars(value) or [None]:
+                notes = column.get(value_key(scalar))
+                if notes is not None:
+                    notes.discard(note)
+                    if not notes:
+                        del column[value_key(scalar)]
+            if not column:
+                del self._columns[key]
+            self._sorted.pop(key, None)
+    
+    def indexed_notes(self) -> Set[str]:
+        """Return every note whose frontmatter has been read, with or without properties."""
+        return set(self._versions)
+    
+    def properties_of(self, note: str) -> Dict[str, Any]:
+        """Return the flattened properties of ``note``."""
+        return self._properties.get(note, {})
+    
+    def notes(self) -> Set[str]:
+        """Return every note with at least one property."""
+        return set(self._properties)
+    
+    def counts(self) -> List[Tuple[str, int]]:
+        """Return (property, notes having it) for every property, most used first."""
+        counts = []
+        for key, column in self._columns.items():
+            counts.append((key, len(set().union(*column.values()))))
+        counts.sort(key=lambda item: (-item[1], item[0]))
+        return counts
+    
+    def select(self, key: str, op: str, value: Any = None) -> Set[str]:
+        """Return the notes whose property ``key`` satisfies ``op`` against ``value``.
+        
+        ``missing`` is not answered here, since it needs the notes without any
+        property; it is the complement of ``exists``.
+        """
+        column = self._columns.get(key.lower(), {})
+        if op == 'exists':
+            return set().union(*column.values())
+        if op == 'eq':
+            return set().union(*(column.get(operand, ()) for operand in _operand_keys(value)))
+        if op == 'contains':
+            found = self.select(key, 'eq', value)
+            needle = value_key(value)
+            if isinstance(needle, str):
+                # Substrings of text values scan the distinct values, not the notes
+                for indexed, notes in column.items():
+                    if isinstance(indexed, str) and needle in indexed:
+                        found |= notes
+            return found
+        if op in ('gt', 'gte', 'lt', 'lte'):
+            return self._range(key.lower(), op, value)
+        raise ValueError(f"Unknown operator '{op}'. Use one of: {', '.join(OPERATORS)}")
+    
+    @property
+    def property_count(self) -> int:
+        """Number of distinct properties, nested keys included."""
+        return len(self._columns)
+    
+    def age(self) -> float:
+        """Seconds since the index was built or last refreshed."""
+        return time.monotonic() - self.built_at
+    
+    def __len__(self) -> int:
+        return len(self._properties)
+    
+    def _range(self, key: str, op: str, value: Any) -> Set[str]:
+        """Bisect the sorted values of a property: numbers for numeric operands, text otherwise."""
+        number_values, number_notes, text_values, text_notes = self._sorted_column(key)
+        bound = value_key(value)
+        if isinstance(value, str) and (number := _number(value)) is not None:
+            bound = number
+        if isinstance(bound, float):
+            if math.isnan(bound):
+                return set()
+            values, notes = number_values, number_notes
+        elif isinstance(bound, str):
+            values, notes = text_values, text_notes
+        else:
+            return set()
+        
+        if op == 'gt':
+            return set(notes[bisect.bisect_right(values, bound):])
+        if op == 'gte':
+            return set(notes[bisect.bisect_left(values, bound):])
+        if op == 'lt':
+            return set(notes[:bisect.bisect_left(values, bound)])
+        return set(notes[:bisect.bisect_right(values, bound)])
+    
+    def _sorted_column(self, key: str) -> Tuple[List[Any], List[str], List[Any], List[str]]:
+        """Return the values of a property sorted, with their notes, numbers and text apart."""
+        cached = self._sorted.get(key)
+        if cached is None:
+            numbers = []
+            texts = []
+            for indexed, notes in self._columns.get(key, {}).items():
+                if isinstance(indexed, float):
+                    # NaN compares false with everything and would break the bisect order
+                    if not math.isnan(indexed):
+                        numbers.extend((indexed, note) for note in notes)
+                elif isinstance(indexed, str):
+                    texts.extend((indexed, note) for note in notes)
+                    # Quoted numbers still compare as numbers
+                    number = _number(indexed)
+                    if number is not None:
+                        numbers.extend((number, note) for note in notes)
+            numbers.sort()
+            texts.sort()
+            cached = self._sorted[key] = (
+                [value for value, _ in numbers], [note for _, note in numbers],
+                [value for value, _ in texts], [note for _, note in texts],
+            )
+        return cached
\ No newline at end of file
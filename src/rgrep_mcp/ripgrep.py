@@ -1,16 +1,87 @@
 """Ripgrep wrapper functions and Obsidian pattern matching."""
 
+import asyncio
+import contextvars
+import functools
+import heapq
+import itertools
 import json
+import marshal
+import operator
 import os
 import re
 import subprocess
 import sys
-from datetime import datetime, date
+import threading
+import time
+from datetime import datetime, date, timedelta
 from pathlib import Path
-from typing import Dict, List, Optional, Union, Any
-import yaml
+from typing import Any, AsyncIterator, Callable, Dict, Iterable, Iterator, List, Optional, Pattern, Tuple, Union
 import platform
+import posixpath
+import queue
 
+from .cache import ResultCache
+from .cursors import CursorStore
+from .frontmatter import FrontmatterBlocks, FrontmatterTable
+from .links import ALIAS_KEY_RE, LINK_TOKEN_RE, LinkGraph, LinkToken, parse_aliases, tokenize_links
+from .matches import Match
+from .mtimes import MtimeIndex
+from .notes import NoteCache
+from .properties import PropertyIndex, parse_properties
+from .snapshot import Snapshot, paused_gc, snapshot_path, write_snapshot
+from .stats import LatencyStats, measure, record_stage, stage
+from .tags import TagIndex, frontmatter_tags, scan_tags
+from .terms import TermIndex, note_terms, query_terms
+from .trigrams import TrigramIndex, query_trigrams
+from .watcher import ChangeEvent, VaultWatcher, start_watcher
+
+try:
+    import orjson
+except ImportError:  # Optional speedup: pip install rgrep-mcp[fast]
+    orjson = None
+
+
+def _stdlib_json_loads(line: bytes) -> Any:
+    """Decode a JSON line with the standard library, which parses str faster than bytes."""
+    return json.loads(line.decode('utf-8'))
+
+
+# Decoder for ripgrep's JSON lines
+JSON_PARSER = 'orjson' if orjson is not None else 'json'
+_json_loads = orjson.loads if orjson is not None else _stdlib_json_loads
+
+# Prefixes of the messages ripgrep writes besides matches, so they are skipped without decoding;
+# the final summary message starts with its data rather than its type
+_RG_SKIPPED_PREFIXES = (b'{"type":"begin"', b'{"type":"end"', b'{"type":"context"', b'{"data":{"elapsed_total"')
+
+# Where a result is, for ordering: search matches are Match records, link results dicts
+_MATCH_POSITION = operator.attrgetter('file', 'line_number')
+_LINK_POSITION = operator.itemgetter('file', 'line_number')
+
+# Searches pass ripgrep the candidate notes from the trigram index instead of the
+# vault path only while the candidates are at most this share of the vault and
+# fit on the command line, which is about 32k characters on Windows
+PREFILTER_MAX_FRACTION = 0.5
+PREFILTER_MAX_COMMAND_CHARS = 24_000 if os.name == 'nt' else 1_000_000
+
+# Async searches hand matches to worker threads, which run scope filters and
+# ordering, in chunks of this many
+FILTER_CHUNK_SIZE = 256
+
+# Regex syntax that means the same to ripgrep and Python's re, so a batch can
+# tell matching queries apart in Python: literals, escaped ASCII punctuation,
+# \d and \t, plain character classes, repetitions, anchors, alternation and
+# groups without flags. POSIX classes, \p{..}, \w and the like differ between
+# the engines, and class set operations or possessive repetitions are valid in
+# only one of them
+_BATCH_SAFE_QUERY_RE = re.compile(r'''(?:
+    \\[!-/:-@\[-`{-~dt]
+  | \[\^?\]?(?:[^\\\[\]&~|-]|\\[!-/:-@\[-`{-~dt]|([|-])(?!\1))*\]
+  | (?:[*+?]|\{\d+(?:,\d*)?\})\??(?![*+?{])
+  | \((?!\?)
+  | [^\\\[{(*+?]
+)*\Z''', re.VERBOSE)
 
 class RipgrepWrapper:
     """Wrapper for ripgrep with Obsidian-specific patterns and functionality."""
@@ -22,14 +93,125 @@ class RipgrepWrapper:
         'frontmatter_links_quoted': r'"?\[\[([^\]]+)\]\]"?',
         'frontmatter_links_in_quotes': r'"([^"]*\[\[[^\]]+\]\][^"]*)"',
         'external_urls': r'https?://[^\s\)\"\']+',
-        'tags': r'#[A-Za-z][A-Za-z0-9/_-]*',
+        'tags': r'(?:^|\s)#[\w/-]+',
         'frontmatter_block': r'^---\n(.*?)\n---',
-        'headers': r'^#{1,6}\s+(.+)'
+        'headers': r'^#{1,6}\s+(.+)',
+        'alias_keys': r'^(?-i:aliases|alias)\s*:',
+        'tag_keys': r'^(?-i:tags|tag)\s*:',
+        'fences': r'^(?:---|\s*```|\s*~~~)'
     }
     
-    def __init__(self, vault_path: str):
+    # Link tokens each ``link_type`` of find_links returns
+    LINK_KINDS = {
+        'all': ('wiki_link', 'markdown_link', 'external_url'),
+        'wiki_links': ('wiki_link',),
+        'markdown_links': ('markdown_link',),
+        'external_urls': ('external_url',),
+    }
+    
+    # Result orders accepted by the search methods' ``sort`` argument
+    SORT_MODES = ('recency', 'none', 'path', 'relevance')
+    
+    # Searches can also rank notes by BM25 score for the words of the query
+    SEARCH_SORT_MODES = SORT_MODES + ('bm25',)
+    
+    # Above this share of notes changed since a snapshot, rebuilding the link
+    # graph with one ripgrep pass beats reparsing the changed notes one by one
+    SNAPSHOT_MAX_CHANGED_SHARE = 0.25
+    
+    def __init__(
+        self,
+        vault_path: str,
+        link_index_ttl: float = 300.0,
+        note_cache_entries: int = 2048,
+        note_cache_bytes: int = 64 * 1024 * 1024,
+        max_output_bytes: int = 32 * 1024 * 1024,
+        max_concurrent_searches: int = 4,
+        mtime_index_ttl: float = 60.0,
+        result_cache_entries: int = 256,
+        result_cache_bytes: int = 16 * 1024 * 1024,
+        result_cache_ttl: float = 300.0,
+        slow_query_ms: float = 1000.0,
+        slow_query_entries: int = 50,
+        cursor_entries: int = 64,
+        cursor_results: int = 500,
+        cursor_ttl: float = 600.0,
+        snapshot_dir: Optional[str] = None
+    ):
         """Initialize with vault path."""
         self.vault_path = Path(vault_path)
+        # ripgrep prints paths joined onto the vault path, so stripping this gives relative paths
+        self._vault_prefix = os.path.join(str(self.vault_path), '')
+        
+        # Link graph is built on first use and rebuilt after link_index_ttl seconds
+        self.link_index_ttl = link_index_ttl
+        self._link_graph: Optional[LinkGraph] = None
+        self._link_graph_lock = threading.Lock()
+        
+        # Tag index is built on first use and, like the link graph, rebuilt after link_index_ttl seconds
+        self._tag_index: Optional[TagIndex] = None
+        self._tag_index_lock = threading.Lock()
+        
+        # Parsed frontmatter properties; after mtime_index_ttl seconds changed notes are re-parsed
+        self._property_index: Optional[PropertyIndex] = None
+        self._property_index_lock = threading.Lock()
+        
+        # Term statistics for sort='bm25', built on first use and rebuilt after link_index_ttl seconds
+        self._term_index: Optional[TermIndex] = None
+        self._term_index_lock = threading.Lock()
+        
+        # Trigrams of note contents narrowing searches to candidate notes. Only used while
+        # the vault is watched, since an index missing an edit could hide a match. The
+        # build lock is held for a whole build, the index lock only to swap or update one
+        self._trigram_index: Optional[TrigramIndex] = None
+        self._trigram_index_building: Optional[TrigramIndex] = None
+        self._trigram_index_lock = threading.Lock()
+        self._trigram_build_lock = threading.Lock()
+        
+        # Notes sorted by mtime, rescanned after mtime_index_ttl seconds
+        self.mtime_index_ttl = mtime_index_ttl
+        self._mtime_index: Optional[MtimeIndex] = None
+        self._mtime_index_lock = threading.Lock()
+        
+        # Parsed notes for smart context
+        self.note_cache = NoteCache(max_entries=note_cache_entries, max_bytes=note_cache_bytes)
+        
+        # Frontmatter line ranges that restrict content_only and frontmatter_only searches
+        self.frontmatter = FrontmatterTable(self.vault_path)
+        
+        # Ceiling on ripgrep output read by a single search
+        self.max_output_bytes = max_output_bytes
+        
+        # Change feed keeping the structures above current; TTL rebuilds stop while it runs
+        self._watcher: Optional[VaultWatcher] = None
+        
+        # Tool results for repeated calls, valid for one vault generation. The
+        # generation advances after every batch of changes is applied
+        self.result_cache = ResultCache(
+            max_entries=result_cache_entries, max_bytes=result_cache_bytes, ttl=result_cache_ttl
+        )
+        self.generation = 0
+        
+        # Ordered results of searches too large for one page, paged through with cursors
+        self.cursors = CursorStore(max_entries=cursor_entries, max_results=cursor_results, ttl=cursor_ttl)
+        
+        # On-disk copy of the link graph, mtimes, frontmatter entries and outlines in
+        # snapshot_dir, so a restart reparses only notes changed since it was saved.
+        # An opened snapshot is held until the link graph is restored from it
+        self.snapshot_path: Optional[Path] = snapshot_path(snapshot_dir, vault_path) if snapshot_dir else None
+        self._snapshot: Optional[Snapshot] = None
+        self._snapshot_save_lock = threading.Lock()
+        self.snapshot_stats: Dict[str, Any] = {'loaded': False, 'restored_notes': 0, 'reparsed_notes': 0, 'saves': 0, 'bytes': 0}
+        
+        # Held while a batch of changes is applied, so a snapshot never sees one half applied
+        self._changes_lock = threading.Lock()
+        
+        # Latency per tool and pipeline stage, recorded by the server around each tool call
+        self.stats = LatencyStats(slow_query_ms=slow_query_ms, slow_query_entries=slow_query_entries)
+        
+        # Async tools share a per-event-loop semaphore limiting concurrent ripgrep processes
+        self.max_concurrent_searches = max(1, max_concurrent_searches)
+        self._rg_semaphore: Optional[Tuple[asyncio.AbstractEventLoop, asyncio.Semaphore]] = None
         
         # Check if ripgrep is available
         rg_commands = ['rg', 'rg.exe']
@@ -54,12 +236,12 @@ class RipgrepWrapper:
     def _convert_path_for_rg(self, path: str) -> str:
         """Convert path format for ripgrep based on OS and ripgrep version."""
         # If we're on WSL and using rg.exe (Windows ripgrep), convert WSL paths to Windows paths
-        if (platform.system() == "Linux" and 
-            ("Microsoft" in platform.release() or "microsoft" in platform.release() or "WSL" in platform.release()) and 
+        if (platform.system() == "Linux" and
+            ("Microsoft" in platform.release() or "microsoft" in platform.release() or "WSL" in platform.release()) and
             self.rg_command and self.rg_command.endswith('.exe')):
             try:
                 # Use wslpath to convert WSL path to Windows path
-                result = subprocess.run(['wslpath', '-w', path], 
+                result = subprocess.run(['wslpath', '-w', path],
                                       capture_output=True, text=True, encoding='utf-8', errors='replace', check=True)
                 return result.stdout.strip()
             except (subprocess.CalledProcessError, FileNotFoundError):
@@ -69,15 +251,22 @@ class RipgrepWrapper:
     
     def _build_rg_command(
         self,
-        pattern: str,
+        pattern: Union[str, List[str]],
         case_sensitive: bool = False,
         folder: Optional[str] = None,
         file_types: Optional[List[str]] = None,
-        max_count: int = 15,
+        max_count: Optional[int] = 15,
         context_lines: int = 1,
-        json_output: bool = True
+        json_output: bool = True,
+        sort_by_modified: bool = False,
+        paths: Optional[List[str]] = None
     ) -> List[str]:
-        """Build ripgrep command with specified options."""
+        """Build ripgrep command with specified options.
+        
+        A list of patterns is passed as repeated ``-e`` options, so ripgrep
+        matches lines satisfying any of them in one pass. ``paths`` are
+        vault-relative notes searched instead of the vault or ``folder``.
+        """
         cmd = [self.rg_command]
         
         # Basic options
@@ -89,7 +278,8 @@ class RipgrepWrapper:
         
         # Note: --context with --json can cause issues, and --max-count is per-file
         # For better compatibility, use simpler parameters
-        cmd.extend(['--max-count', str(max_count)])
+        if max_count is not None:
+            cmd.extend(['--max-count', str(max_count)])
         
         # File type filtering
         if file_types:
@@ -103,12 +293,23 @@ class RipgrepWrapper:
         cmd.extend(['--glob', '!.obsidian/**'])
         
         # Sort by modification time (newest first)
-        cmd.extend(['--sortr', 'modified'])
+        # Sorting forces ripgrep to run single-threaded, so searches order results
+        # in Python instead (see _take_results)
+        if sort_by_modified:
+            cmd.extend(['--sortr', 'modified'])
         
         # Add pattern
-        cmd.append(pattern)
+        if isinstance(pattern, list):
+            for single_pattern in pattern:
+                cmd.extend(['-e', single_pattern])
+        else:
+            cmd.append(pattern)
         
         # Add search path
+        if paths is not None:
+            # Without candidates ripgrep reads the empty stdin, not the working directory
+            cmd.extend([self._vault_prefix + path for path in paths] or ['-'])
+            return cmd
         search_path = self.vault_path
         if folder:
             search_path = self.vault_path / folder
@@ -116,122 +317,370 @@ class RipgrepWrapper:
         
         return cmd
     
-    def _parse_rg_json_output(self, output: str) -> List[Dict[str, Any]]:
+    def _parse_rg_json_output(self, output: Union[str, bytes]) -> List[Match]:
         """Parse ripgrep JSON output into structured results."""
         results = []
         
         if not output:
             return results
         
-        for line in output.strip().split('\n'):
-            if not line:
-                continue
+        if isinstance(output, str):
+            output = output.encode('utf-8')
+        
+        for line in output.splitlines():
+            match = self._parse_rg_json_line(line)
+            if match is not None:
+                results.append(match)
+        
+        return results
+    
+    def _parse_rg_json_line(self, line: Union[str, bytes]) -> Optional[Match]:
+        """Parse one line of ripgrep JSON output, returning None for non-match messages.
+        
+        Lines are parsed as bytes. ``begin``, ``end``, ``context`` and
+        ``summary`` messages are rejected by their prefix without decoding.
+        """
+        if isinstance(line, str):
+            line = line.encode('utf-8')
+        
+        if not line or line.startswith(_RG_SKIPPED_PREFIXES):
+            return None
+        
+        try:
+            data = _json_loads(line)
+            if data['type'] != 'match':
+                return None
+            match_data = data['data']
+            submatches = match_data['submatches']
+            # Paths and lines that are not valid UTF-8 come as base64 'bytes' instead of 'text'
+            file_path = match_data['path'].get('text', '')
             
-            try:
-                data = json.loads(line)
-                if data.get('type') == 'match':
-                    match_data = data.get('data', {})
-                    file_path = match_data.get('path', {}).get('text', '')
-                    # Convert absolute path back to relative path
+            return Match(
+                file_path[len(self._vault_prefix):] if file_path.startswith(self._vault_prefix)
+                else self._relative_path(file_path),
+                match_data['line_number'],
+                match_data['lines'].get('text') or '',
+                submatches[0]['start'] if submatches else 0,
+                submatches[0]['end'] if submatches else 0,
+            )
+        except (ValueError, KeyError, TypeError, AttributeError):
+            return None
+    
+    def _relative_path(self, file_path: str) -> str:
+        """Convert a path printed by ripgrep back to a vault-relative path."""
+        # Strip the vault prefix as a string rather than parsing every path with pathlib
+        if file_path.startswith(self._vault_prefix):
+            return file_path[len(self._vault_prefix):]
+        try:
+            if file_path.startswith(str(self.vault_path)):
+                return str(Path(file_path).relative_to(self.vault_path))
+            # Handle Windows paths in WSL
+            vault_path_win = self._convert_path_for_rg(str(self.vault_path)).replace('\\', '/')
+            file_path_normalized = file_path.replace('\\', '/')
+            if vault_path_win and file_path_normalized.startswith(vault_path_win):
+                return file_path_normalized[len(vault_path_win):].lstrip('/')
+        except ValueError:
+            pass
+        return Path(file_path).name
+    
+    def _list_notes(self, folder: Optional[str] = None, strict: bool = False) -> List[str]:
+        """List the vault-relative paths of the notes a search would cover.
+        
+        With ``strict``, an OSError is raised instead of returning no notes when ripgrep cannot run.
+        """
+        search_path = self.vault_path
+        if folder:
+            search_path = self.vault_path / folder
+        cmd = [
+            self.rg_command, '--files', '--glob', '*.md', '--glob', '!.obsidian/**',
+            self._convert_path_for_rg(str(search_path))
+        ]
+        try:
+            with stage('ripgrep'):
+                result = subprocess.run(cmd, capture_output=True, text=True, encoding='utf-8', errors='replace')
+        except (OSError, subprocess.SubprocessError) as e:
+            if strict:
+                raise OSError(f"Could not list notes with ripgrep: {e}") from e
+            return []
+        return [self._relative_path(line) for line in result.stdout.splitlines() if line]
+    
+    @staticmethod
+    def _locate_match(match: Match, blocks: FrontmatterBlocks) -> Match:
+        """Point a match in concatenated frontmatter blocks back at its note."""
+        match.file, match.line_number = blocks.locate(match.line_number)
+        return match
+    
+    def _stream_rg_matches(
+        self,
+        cmd: List[str],
+        max_output_bytes: Optional[int] = None,
+        blocks: Optional[FrontmatterBlocks] = None
+    ) -> Iterator[Match]:
+        """Run ripgrep and yield parsed matches as its JSON output arrives.
+        
+        Closing the generator early stops the ripgrep process, so callers can
+        stop reading as soon as they have enough results. Output past
+        ``max_output_bytes`` is never read. With ``blocks``, ripgrep searches
+        the frontmatter blocks on stdin instead of files.
+        
+        Time spent waiting for ripgrep and parsing its JSON is recorded as the
+        'ripgrep' and 'parse' stages, excluding the time the caller holds a match.
+        """
+        started = time.perf_counter()
+        try:
+            process = subprocess.Popen(
+                cmd,
+                stdin=subprocess.PIPE if blocks is not None else subprocess.DEVNULL,
+                stdout=subprocess.PIPE,
+                stderr=subprocess.DEVNULL
+            )
+        except (OSError, subprocess.SubprocessError):
+            return
+        
+        if blocks is not None:
+            # Feed stdin from a thread so a full stdout pipe cannot deadlock the write
+            def feed() -> None:
+                try:
+                    process.stdin.write(blocks.data)
+                    process.stdin.close()
+                except OSError:
+                    pass
+            threading.Thread(target=feed, daemon=True).start()
+        
+        bytes_read = 0
+        waited = parsed = 0.0
+        try:
+            for raw_line in process.stdout:
+                line_read = time.perf_counter()
+                waited += line_read - started
+                bytes_read += len(raw_line)
+                if max_output_bytes is not None and bytes_read > max_output_bytes:
+                    print(
+                        f"ripgrep output exceeded {max_output_bytes} bytes, returning partial results",
+                        file=sys.stderr
+                    )
+                    break
+                match = self._parse_rg_json_line(raw_line)
+                if match is not None and blocks is not None:
+                    match = self._locate_match(match, blocks)
+                started = time.perf_counter()
+                parsed += started - line_read
+                if match is not None:
+                    # Recorded before the caller resumes, inside whatever stage it has open
+                    record_stage('ripgrep', waited)
+                    record_stage('parse', parsed)
+                    waited = parsed = 0.0
+                    yield match
+                    started = time.perf_counter()
+        finally:
+            finishing = time.perf_counter()
+            if process.poll() is None:
+                process.kill()
+            process.stdout.close()
+            process.wait()
+            record_stage('ripgrep', waited + time.perf_counter() - finishing)
+            record_stage('parse', parsed)
+    
+    def _collect_matches(
+        self,
+        cmd: List[str],
+        max_results: int,
+        keep: Optional[Callable[[Match], bool]] = None,
+        sort: str = 'recency',
+        blocks: Optional[FrontmatterBlocks] = None,
+        query: Optional[str] = None
+    ) -> List[Match]:
+        """Stream ripgrep matches and take the top ``max_results`` that pass ``keep``.
+        
+        With ``sort='none'`` ripgrep is stopped as soon as enough matches are in;
+        other orders need every match but only hold the current top results.
+        ``query`` supplies the words ``sort='bm25'`` scores notes for.
+        """
+        stream = self._stream_rg_matches(cmd, max_output_bytes=self.max_output_bytes, blocks=blocks)
+        try:
+            matches = stream if keep is None else filter(keep, stream)
+            return self._take_results(matches, max_results, sort, query=query)
+        finally:
+            stream.close()
+    
+    def _take_results(
+        self,
+        items: Iterable[Any],
+        max_results: int,
+        sort: str = 'recency',
+        position: Callable[[Any], Tuple[str, int]] = _MATCH_POSITION,
+        query: Optional[str] = None
+    ) -> List[Any]:
+        """Take the first ``max_results`` items in the requested order.
+        
+        Items are produced by ripgrep in any order; ``position`` returns an
+        item's file and line number. Matches within a file keep their line order.
+        """
+        # Items may stream from ripgrep; its time is recorded as its own stage
+        with stage('order'):
+            return self._order_results(items, max_results, sort, position, query)
+    
+    def _order_results(
+        self,
+        items: Iterable[Any],
+        max_results: int,
+        sort: str,
+        position: Callable[[Any], Tuple[str, int]],
+        query: Optional[str] = None
+    ) -> List[Any]:
+        """Order ``items`` as described in ``_take_results``."""
+        if sort == 'none':
+            return list(itertools.islice(items, max_results))
+        if sort == 'path':
+            return heapq.nsmallest(max_results, items, key=position)
+        
+        index = self.get_mtime_index()
+        mtimes: Dict[str, float] = {}
+        
+        def mtime(file: str) -> float:
+            if file not in mtimes:
+                indexed = index.mtime(file)
+                if indexed is None:
+                    # Not indexed yet, e.g. created since the last scan
                     try:
-                        if file_path.startswith(str(self.vault_path)):
-                            relative_path = str(Path(file_path).relative_to(self.vault_path))
-                        else:
-                            # Handle Windows paths in WSL
-                            vault_path_win = self._convert_path_for_rg(str(self.vault_path)).replace('\\', '/')
-                            file_path_normalized = file_path.replace('\\', '/')
-                            if vault_path_win and file_path_normalized.startswith(vault_path_win):
-                                relative_path = file_path_normalized[len(vault_path_win):].lstrip('/')
-                            else:
-                                relative_path = Path(file_path).name
-                    except ValueError:
-                        relative_path = Path(file_path).name
-                    
-                    results.append({
-                        'file': relative_path,
-                        'line_number': match_data.get('line_number'),
-                        'text': match_data.get('lines', {}).get('text', '') or '',
-                        'match_start': match_data.get('submatches', [{}])[0].get('start', 0),
-                        'match_end': match_data.get('submatches', [{}])[0].get('end', 0),
-                    })
-            except (json.JSONDecodeError, KeyError):
-                continue
+                        indexed = os.stat(self.vault_path / file).st_mtime
+                    except OSError:
+                        indexed = 0.0
+                mtimes[file] = indexed
+            return mtimes[file]
+        
+        if sort == 'recency':
+            def newest_first(item: Any) -> Tuple[float, str, int]:
+                file, line_number = position(item)
+                return -mtime(file), file, line_number
+            
+            return heapq.nsmallest(max_results, items, key=newest_first)
+        
+        # relevance: notes with the most matches first; bm25: notes with the highest
+        # BM25 score for the query's words first. Newest first among equals
+        counts: Dict[str, int] = {}
+        by_file: Dict[str, List[Any]] = {}
+        for item in items:
+            file = position(item)[0]
+            counts[file] = counts.get(file, 0) + 1
+            file_items = by_file.setdefault(file, [])
+            if len(file_items) < max_results:
+                file_items.append(item)
+        
+        scores: Dict[str, float] = counts
+        if sort == 'bm25':
+            scores = self.get_term_index().scores(query_terms(query or ''), by_file)
         
+        # Only the notes needed to fill max_results are popped off the heap
+        ranked = [(-scores.get(file, 0), -mtime(file), file) for file in by_file]
+        heapq.heapify(ranked)
+        results: List[Any] = []
+        while ranked and len(results) < max_results:
+            file = heapq.heappop(ranked)[2]
+            results.extend(sorted(by_file[file], key=lambda r: position(r)[1])[:max_results - len(results)])
         return results
     
-    def search_content(
+    def _search_plan(
         self,
-        query: str,
+        query: Union[str, List[str]],
+        search_scope: str = 'all',
         case_sensitive: bool = False,
         folder: Optional[str] = None,
         max_results: int = 15,
-        smart_context: bool = True
-    ) -> List[Dict[str, Any]]:
-        """Search for content in markdown files."""
+        sort: str = 'recency',
+        max_per_note: Optional[int] = None
+    ) -> Tuple[List[str], Optional[Callable[[Match], bool]], Optional[FrontmatterBlocks]]:
+        """Build the ripgrep command, post-filter and stdin blocks for a search scope.
+        
+        A list of queries is searched in one pass (see ``search_batch``).
+        Searches over note files read only the candidates from the trigram
+        index, when it can narrow them. ``max_per_note`` caps the matches
+        ripgrep reports per note where it can, ``max_results`` by default.
+        """
+        paths = None
+        if search_scope != 'frontmatter_only':
+            paths = self._candidate_notes([query] if isinstance(query, str) else query, folder)
+        
+        if search_scope == 'all':
+            # No file contributes more than max_results, except to relevance match counts;
+            # with several queries the cap would count lines matching any of them
+            capped = sort != 'relevance' and not isinstance(query, list)
+            cmd = self._build_rg_command(
+                pattern=query,
+                case_sensitive=case_sensitive,
+                folder=folder,
+                max_count=(max_per_note or max_results) if capped else None,
+                paths=paths
+            )
+            return cmd, None, None
+        
+        # No per-file cap: every match is in scope (frontmatter_only) or is
+        # filtered by the frontmatter table as it streams in (content_only)
         cmd = self._build_rg_command(
             pattern=query,
             case_sensitive=case_sensitive,
             folder=folder,
-            max_count=max_results
+            max_count=None,
+            paths=paths
         )
+        # Add --pcre2 for better regex support
+        cmd.insert(1, '--pcre2')
         
+        if search_scope == 'frontmatter_only':
+            # Search the frontmatter blocks piped to stdin in place of the vault
+            # path, so note bodies are never scanned
+            cmd[-1] = '-'
+            with stage('frontmatter'):
+                blocks = self.frontmatter.blocks(self._list_notes(folder))
+            return cmd, None, blocks
+        return cmd, self._is_content_match, None
+    
+    def _search(
+        self,
+        query: str,
+        search_scope: str,
+        case_sensitive: bool,
+        folder: Optional[str],
+        max_results: int,
+        smart_context: bool,
+        sort: str = 'recency'
+    ) -> List[Match]:
+        """Run a scoped search, returning at most ``max_results`` matches."""
         try:
-            result = subprocess.run(cmd, capture_output=True, text=True, encoding='utf-8', errors='replace')
+            cmd, keep, blocks = self._search_plan(query, search_scope, case_sensitive, folder, max_results, sort)
+            results = self._collect_matches(cmd, max_results, keep, sort, blocks, query)
             
-            if result.returncode == 0:
-                if not result.stdout:
-                    return []
-                
-                parsed_results = self._parse_rg_json_output(result.stdout)
-                
-                # Add smart context if enabled
-                if smart_context:
-                    parsed_results = self._add_smart_context(parsed_results)
-                
-                return parsed_results
-            else:
-                # Command failed, return empty results
-                pass
-            return []
+            # Add smart context if enabled
+            if smart_context:
+                results = self._add_smart_context(results)
+            
+            return results
         except (subprocess.SubprocessError, Exception):
             return []
     
+    def search_content(
+        self,
+        query: str,
+        case_sensitive: bool = False,
+        folder: Optional[str] = None,
+        max_results: int = 15,
+        smart_context: bool = True,
+        sort: str = 'recency'
+    ) -> List[Match]:
+        """Search for content in markdown files, returning at most ``max_results`` matches."""
+        return self._search(query, 'all', case_sensitive, folder, max_results, smart_context, sort)
+    
     def search_frontmatter_only(
         self,
         query: str,
         case_sensitive: bool = False,
         folder: Optional[str] = None,
         max_results: int = 15,
-        smart_context: bool = True
-    ) -> List[Dict[str, Any]]:
+        smart_context: bool = True,
+        sort: str = 'recency'
+    ) -> List[Match]:
         """Search only in frontmatter sections."""
-        # Use simpler approach: search for the query and filter results to frontmatter sections
-        # This is more reliable than complex regex patterns
-        
-        cmd = self._build_rg_command(
-            pattern=query,
-            case_sensitive=case_sensitive,
-            folder=folder,
-            max_count=max_results * 3  # Get more results to filter
-        )
-        # Add --pcre2 for better regex support
-        cmd.append('--pcre2')
-        
-        try:
-            result = subprocess.run(cmd, capture_output=True, text=True, encoding='utf-8', errors='replace')
-            if result.returncode == 0:
-                all_results = self._parse_rg_json_output(result.stdout)
-                # Filter to only results within frontmatter sections
-                frontmatter_results = self._filter_frontmatter_results(all_results)
-                
-                # Add smart context if enabled
-                if smart_context:
-                    frontmatter_results = self._add_smart_context(frontmatter_results)
-                
-                return frontmatter_results[:max_results]
-            return []
-        except subprocess.SubprocessError:
-            return []
+        return self._search(query, 'frontmatter_only', case_sensitive, folder, max_results, smart_context, sort)
     
     def search_content_only(
         self,
@@ -239,234 +688,437 @@ class RipgrepWrapper:
         case_sensitive: bool = False,
         folder: Optional[str] = None,
         max_results: int = 15,
-        smart_context: bool = True
-    ) -> List[Dict[str, Any]]:
+        smart_context: bool = True,
+        sort: str = 'recency'
+    ) -> List[Match]:
         """Search only in content (excluding frontmatter)."""
-        # Use simpler approach: search for the query and filter results to content sections
-        # This is more reliable than complex regex patterns
-        
-        cmd = self._build_rg_command(
-            pattern=query,
-            case_sensitive=case_sensitive,
-            folder=folder,
-            max_count=max_results * 3  # Get more results to filter
-        )
-        # Add --pcre2 for better regex support
-        cmd.append('--pcre2')
+        return self._search(query, 'content_only', case_sensitive, folder, max_results, smart_context, sort)
+    
+    async def search_async(
+        self,
+        query: str,
+        search_scope: str = 'all',
+        case_sensitive: bool = False,
+        folder: Optional[str] = None,
+        max_results: int = 15,
+        smart_context: bool = True,
+        sort: str = 'recency',
+        max_per_note: Optional[int] = None
+    ) -> List[Match]:
+        """Async scoped search that does not block the event loop.
         
+        ripgrep runs through asyncio subprocesses, limited to
+        ``max_concurrent_searches`` at a time, and note reads for scope
+        filtering and smart context run in a worker thread. ``max_per_note``
+        lets a search take many results, a page at a time, while ripgrep still
+        stops reading each note after a page's worth of matches.
+        """
         try:
-            result = subprocess.run(cmd, capture_output=True, text=True, encoding='utf-8', errors='replace')
-            if result.returncode == 0:
-                all_results = self._parse_rg_json_output(result.stdout)
-                # Filter to only results outside frontmatter sections
-                content_results = self._filter_content_results(all_results)
-                
-                # Add smart context if enabled
-                if smart_context:
-                    content_results = self._add_smart_context(content_results)
-                
-                return content_results[:max_results]
-            return []
-        except subprocess.SubprocessError:
+            if search_scope == 'frontmatter_only':
+                # Listing notes runs ripgrep and refreshing the frontmatter table reads files
+                plan = await self.run_rg_in_thread(
+                    self._search_plan, query, search_scope, case_sensitive, folder, max_results, sort
+                )
+            else:
+                plan = self._search_plan(query, search_scope, case_sensitive, folder, max_results, sort, max_per_note)
+            cmd, keep, blocks = plan
+            results = await self._collect_matches_async(cmd, max_results, keep, sort, blocks, query)
+            
+            # Add smart context if enabled
+            if smart_context:
+                results = await self.run_in_thread(self._add_smart_context, results)
+            
+            return results
+        except (subprocess.SubprocessError, Exception):
             return []
     
-    def _filter_frontmatter_results(self, results: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
-        """Filter results to only include those within frontmatter sections."""
-        frontmatter_results = []
+    def search_batch(
+        self,
+        queries: List[str],
+        search_scope: str = 'all',
+        case_sensitive: bool = False,
+        folder: Optional[str] = None,
+        max_results: int = 15,
+        smart_context: bool = True,
+        sort: str = 'recency'
+    ) -> List[List[Match]]:
+        """Run several searches with one ripgrep pass over the vault.
         
-        for result in results:
-            try:
-                file_path = self.vault_path / result['file']
-                if not file_path.exists():
-                    continue
-                    
-                with open(file_path, 'r', encoding='utf-8') as f:
-                    lines = f.readlines()
-                
-                line_num = result['line_number']
-                # Check if this line is within a frontmatter block
-                if self._is_line_in_frontmatter(lines, line_num):
-                    frontmatter_results.append(result)
-                    
-            except (IOError, KeyError):
-                continue
-                
-        return frontmatter_results
+        ripgrep looks for every query at once, each matching line is assigned
+        to the queries whose pattern it matches, and each query then gets its
+        own ``max_results`` in ``sort`` order. Each query adds
+        ``max_output_bytes`` to what the pass may read. Returns one result
+        list per query, in query order.
+        """
+        try:
+            matchers = self._batch_matchers(queries, case_sensitive)
+            buckets: List[List[Match]] = [[] for _ in queries]
+            batched = [query for query, matcher in zip(queries, matchers) if matcher is not None]
+            if batched:
+                cmd, keep, blocks = self._search_plan(batched, search_scope, case_sensitive, folder, max_results, sort)
+                stream = self._stream_rg_matches(
+                    cmd, max_output_bytes=self.max_output_bytes * len(batched), blocks=blocks
+                )
+                try:
+                    for match in (stream if keep is None else filter(keep, stream)):
+                        if self._assign_batch_match(match, matchers, buckets, max_results, sort):
+                            break
+                finally:
+                    stream.close()
+            return self._finish_batch(
+                queries, matchers, buckets, search_scope, case_sensitive, folder, max_results, smart_context, sort
+            )
+        except (subprocess.SubprocessError, Exception):
+            return [[] for _ in queries]
     
-    def _filter_content_results(self, results: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
-        """Filter results to only include those outside frontmatter sections."""
-        content_results = []
+    async def search_batch_async(
+        self,
+        queries: List[str],
+        search_scope: str = 'all',
+        case_sensitive: bool = False,
+        folder: Optional[str] = None,
+        max_results: int = 15,
+        smart_context: bool = True,
+        sort: str = 'recency'
+    ) -> List[List[Match]]:
+        """Async counterpart of ``search_batch`` built on asyncio subprocesses."""
+        try:
+            matchers = self._batch_matchers(queries, case_sensitive)
+            buckets: List[List[Match]] = [[] for _ in queries]
+            batched = [query for query, matcher in zip(queries, matchers) if matcher is not None]
+            if batched:
+                if search_scope == 'frontmatter_only':
+                    plan = await self.run_rg_in_thread(
+                        self._search_plan, batched, search_scope, case_sensitive, folder, max_results, sort
+                    )
+                else:
+                    plan = self._search_plan(batched, search_scope, case_sensitive, folder, max_results, sort)
+                cmd, keep, blocks = plan
+                async with self._rg_slots():
+                    stream = self._stream_rg_matches_async(
+                        cmd, max_output_bytes=self.max_output_bytes * len(batched), blocks=blocks
+                    )
+                    matches = stream if keep is None else self._filter_matches_async(stream, keep)
+                    try:
+                        async for match in matches:
+                            if self._assign_batch_match(match, matchers, buckets, max_results, sort):
+                                break
+                    finally:
+                        await matches.aclose()
+                        await stream.aclose()
+            # Queries that could not be batched run their own search here
+            return await self.run_rg_in_thread(
+                self._finish_batch,
+                queries, matchers, buckets, search_scope, case_sensitive, folder, max_results, smart_context, sort
+            )
+        except (subprocess.SubprocessError, Exception):
+            return [[] for _ in queries]
+    
+    @staticmethod
+    def _batch_matchers(queries: List[str], case_sensitive: bool) -> List[Optional[Pattern]]:
+        """Compile each query to tell which of them a matching line satisfies.
         
-        for result in results:
-            try:
-                file_path = self.vault_path / result['file']
-                if not file_path.exists():
-                    continue
-                    
-                with open(file_path, 'r', encoding='utf-8') as f:
-                    lines = f.readlines()
-                
-                line_num = result['line_number']
-                # Check if this line is NOT within a frontmatter block
-                if not self._is_line_in_frontmatter(lines, line_num):
-                    content_results.append(result)
-                    
-            except (IOError, KeyError):
+        Queries using syntax that Python's ``re`` does not accept, or reads
+        differently from ripgrep, get None and are searched on their own.
+        """
+        flags = 0 if case_sensitive else re.IGNORECASE
+        matchers: List[Optional[Pattern]] = []
+        for query in queries:
+            if not _BATCH_SAFE_QUERY_RE.match(query):
+                matchers.append(None)
                 continue
-                
-        return content_results
-    
-    def _is_line_in_frontmatter(self, lines: List[str], line_num: int) -> bool:
-        """Check if a specific line number is within a frontmatter block."""
-        if not lines or line_num < 1 or line_num > len(lines):
-            return False
-            
-        # Check if the file starts with frontmatter
-        if not lines[0].strip().startswith('---'):
-            return False
-            
-        # Find the end of frontmatter block
-        frontmatter_end = None
-        for i, line in enumerate(lines[1:], 1):  # Start from line 2 (index 1)
-            if line.strip() == '---':
-                frontmatter_end = i + 1  # Line numbers are 1-based
-                break
-                
-        if frontmatter_end is None:
-            return False
-            
-        # Check if our line is within the frontmatter block (lines 1 to frontmatter_end)
-        return 1 <= line_num <= frontmatter_end
+            try:
+                matchers.append(re.compile(query, flags))
+            except re.error:
+                matchers.append(None)
+        return matchers
     
-    def _add_smart_context(self, results: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
-        """Add smart context to search results based on location (frontmatter property or content heading)."""
-        enhanced_results = []
+    @staticmethod
+    def _assign_batch_match(
+        match: Match,
+        matchers: List[Optional[Pattern]],
+        buckets: List[List[Match]],
+        max_results: int,
+        sort: str
+    ) -> bool:
+        """Add a match to the bucket of every query it satisfies.
         
-        for result in results:
-            enhanced_result = result.copy()
-            
-            try:
-                file_path = self.vault_path / result['file']
-                if not file_path.exists():
-                    enhanced_results.append(enhanced_result)
-                    continue
-                    
-                with open(file_path, 'r', encoding='utf-8') as f:
-                    lines = f.readlines()
-                
-                line_num = result['line_number']
-                
-                # Check if this is in frontmatter
-                if self._is_line_in_frontmatter(lines, line_num):
-                    # Get frontmatter property context
-                    property_context = self._get_frontmatter_property_context(lines, line_num)
-                    if property_context:
-                        enhanced_result['smart_context'] = property_context
+        Each query's copy points ``match_start`` and ``match_end`` at its own
+        first match, as byte offsets like ripgrep's. Returns True once every
+        bucket is full and ``sort`` is 'none', so ripgrep can be stopped.
+        """
+        text = match.text
+        full = True
+        for matcher, bucket in zip(matchers, buckets):
+            if matcher is None:
+                continue
+            if sort == 'none' and len(bucket) >= max_results:
+                continue
+            found = matcher.search(text)
+            if found:
+                start, end = found.span()
+                if not text.isascii():
+                    start, end = len(text[:start].encode('utf-8')), len(text[:end].encode('utf-8'))
+                if (start, end) == (match.match_start, match.match_end):
+                    bucket.append(match)
                 else:
-                    # Get content heading context
-                    heading_context = self._get_content_heading_context(lines, line_num)
-                    if heading_context:
-                        enhanced_result['smart_context'] = heading_context
-                        
-            except (IOError, KeyError):
-                # If we can't read the file or parse it, just use the original result
-                pass
-                
-            enhanced_results.append(enhanced_result)
-        
-        return enhanced_results
+                    bucket.append(match.with_span(start, end))
+            full = full and sort == 'none' and len(bucket) >= max_results
+        return full
     
-    def _get_frontmatter_property_context(self, lines: List[str], line_num: int) -> Optional[str]:
-        """Get the frontmatter property name for a given line number."""
+    def _finish_batch(
+        self,
+        queries: List[str],
+        matchers: List[Optional[Pattern]],
+        buckets: List[List[Match]],
+        search_scope: str,
+        case_sensitive: bool,
+        folder: Optional[str],
+        max_results: int,
+        smart_context: bool,
+        sort: str
+    ) -> List[List[Match]]:
+        """Order and enrich each query's matches, searching unbatched queries on their own."""
+        results = []
+        for query, matcher, bucket in zip(queries, matchers, buckets):
+            if matcher is None:
+                results.append(
+                    self._search(query, search_scope, case_sensitive, folder, max_results, smart_context, sort)
+                )
+                continue
+            taken = self._take_results(bucket, max_results, sort, query=query)
+            results.append(self._add_smart_context(taken) if smart_context else taken)
+        return results
+    
+    async def _stream_rg_matches_async(
+        self,
+        cmd: List[str],
+        max_output_bytes: Optional[int] = None,
+        blocks: Optional[FrontmatterBlocks] = None
+    ) -> AsyncIterator[Match]:
+        """Async counterpart of ``_stream_rg_matches`` built on asyncio subprocesses."""
+        limit = max_output_bytes or 64 * 1024 * 1024  # Longest single JSON line we accept
+        started = time.perf_counter()
+        try:
+            process = await asyncio.create_subprocess_exec(
+                *cmd,
+                stdin=subprocess.PIPE if blocks is not None else subprocess.DEVNULL,
+                stdout=subprocess.PIPE,
+                stderr=subprocess.DEVNULL,
+                limit=limit
+            )
+        except (OSError, subprocess.SubprocessError):
+            return
         
-        if not lines or line_num < 1 or line_num > len(lines):
-            return None
+        feeder = None
+        if blocks is not None:
+            async def feed() -> None:
+                try:
+                    process.stdin.write(blocks.data)
+                    await process.stdin.drain()
+                    process.stdin.close()
+                except (OSError, ConnectionResetError):
+                    pass
+            feeder = asyncio.ensure_future(feed())
         
-        # Parse the frontmatter as YAML to understand the structure
+        bytes_read = 0
+        waited = parsed = 0.0
         try:
-            # Find frontmatter boundaries
-            if not lines[0].strip().startswith('---'):
-                return None
-            
-            frontmatter_end = None
-            for i, line in enumerate(lines[1:], 1):
-                if line.strip() == '---':
-                    frontmatter_end = i + 1
+            async for raw_line in process.stdout:
+                line_read = time.perf_counter()
+                waited += line_read - started
+                bytes_read += len(raw_line)
+                if max_output_bytes is not None and bytes_read > max_output_bytes:
+                    print(
+                        f"ripgrep output exceeded {max_output_bytes} bytes, returning partial results",
+                        file=sys.stderr
+                    )
                     break
-            
-            if frontmatter_end is None:
-                return None
-            
-            
-            # Just find the property context for this line
-            result = self._find_property_context_for_line(lines, line_num, frontmatter_end)
-            return result
-            
-        except Exception as e:
-            pass
+                match = self._parse_rg_json_line(raw_line)
+                if match is not None and blocks is not None:
+                    match = self._locate_match(match, blocks)
+                started = time.perf_counter()
+                parsed += started - line_read
+                if match is not None:
+                    # Recorded before the caller resumes, inside whatever stage it has open
+                    record_stage('ripgrep', waited)
+                    record_stage('parse', parsed)
+                    waited = parsed = 0.0
+                    yield match
+                    started = time.perf_counter()
+        except ValueError:
+            # A single line longer than the stream limit
+            print("ripgrep output line too long, returning partial results", file=sys.stderr)
+        finally:
+            finishing = time.perf_counter()
+            if process.returncode is None:
+                try:
+                    process.kill()
+                except ProcessLookupError:
+                    pass
+            if feeder is not None:
+                await feeder
+            await process.wait()
+            record_stage('ripgrep', waited + time.perf_counter() - finishing)
+            record_stage('parse', parsed)
+    
+    async def _collect_matches_async(
+        self,
+        cmd: List[str],
+        max_results: int,
+        keep: Optional[Callable[[Match], bool]] = None,
+        sort: str = 'recency',
+        blocks: Optional[FrontmatterBlocks] = None,
+        query: Optional[str] = None
+    ) -> List[Match]:
+        """Async counterpart of ``_collect_matches``; filters and ordering run off the event loop.
         
-        return None
+        The event loop reads ripgrep and passes chunks of matches to a single
+        worker thread, which filters them and keeps the top results like
+        ``_collect_matches`` does, so matches that cannot make the top are
+        dropped as they arrive.
+        """
+        handoff: 'queue.Queue[Optional[List[Match]]]' = queue.Queue()
+        
+        def chunks() -> Iterator[Match]:
+            while True:
+                started = time.perf_counter()
+                chunk = handoff.get()
+                # Time spent waiting for the event loop is ripgrep's, recorded there
+                record_stage('wait', time.perf_counter() - started)
+                if chunk is None:
+                    return
+                yield from chunk
+        
+        def take() -> Tuple[List[Match], Dict[str, float]]:
+            # Timed apart from the event loop, which records stages at the same time
+            with measure() as measured:
+                matches = chunks() if keep is None else filter(keep, chunks())
+                taken = self._take_results(matches, max_results, sort, query=query)
+            return taken, measured.timer.stages
+        
+        chunk_size = min(FILTER_CHUNK_SIZE, max_results) if sort == 'none' else FILTER_CHUNK_SIZE
+        async with self._rg_slots():
+            taking = asyncio.ensure_future(self.run_in_thread(take))
+            stream = self._stream_rg_matches_async(
+                cmd, max_output_bytes=self.max_output_bytes, blocks=blocks
+            )
+            chunk: List[Match] = []
+            try:
+                async for match in stream:
+                    chunk.append(match)
+                    if len(chunk) >= chunk_size:
+                        handoff.put(chunk)
+                        chunk = []
+                        # With sort='none' the worker is done once it has enough results
+                        if taking.done():
+                            break
+            finally:
+                handoff.put(chunk)
+                handoff.put(None)
+                await stream.aclose()
+            results, stages = await taking
+        stages.pop('wait', None)
+        for name, seconds in stages.items():
+            record_stage(name, seconds)
+        return results
     
-    def _find_property_context_for_line(self, lines: List[str], line_num: int, frontmatter_end: int) -> Optional[str]:
-        """Find the property context for a specific line in frontmatter."""
-        if line_num < 1 or line_num > len(lines):
-            return None
+    async def _filter_matches_async(
+        self,
+        stream: AsyncIterator[Match],
+        keep: Callable[[Match], bool]
+    ) -> AsyncIterator[Match]:
+        """Yield the matches of ``stream`` that pass ``keep``.
         
-        # Work backwards from the target line to find the property name
-        target_line = lines[line_num - 1]
-        target_indent = len(target_line) - len(target_line.lstrip())
-        
-        # Check if the target line itself is a property definition
-        if ':' in target_line and not target_line.strip().endswith(':'):
-            # This line contains a colon and is not just a property header
-            # Extract property name (everything before the colon)
-            property_name = target_line.split(':')[0].strip()
-            if property_name and not property_name.startswith('-'):  # Not a list item
-                return property_name
-        
-        # Look backwards for a property definition at a lower indent level
-        for i in range(line_num - 2, 0, -1):  # Go backwards from line before target
-            line = lines[i]
-            if line.strip() == '':  # Skip empty lines
+        ``keep`` may read notes, so it runs in a worker thread, on chunks of
+        ``FILTER_CHUNK_SIZE`` matches rather than one thread call per match.
+        """
+        chunk: List[Match] = []
+        async for match in stream:
+            chunk.append(match)
+            if len(chunk) < FILTER_CHUNK_SIZE:
                 continue
-            
-            line_indent = len(line) - len(line.lstrip())
-            
-            # If this line has lower indentation and contains a colon, it's a parent property
-            if line_indent < target_indent and ':' in line:
-                # Extract property name (everything before the colon)
-                property_name = line.split(':')[0].strip()
-                if property_name:
-                    return property_name
-        
-        return None
+            with stage('frontmatter'):
+                kept = await self.run_in_thread(list, filter(keep, chunk))
+            chunk = []
+            for match in kept:
+                yield match
+        if chunk:
+            with stage('frontmatter'):
+                kept = await self.run_in_thread(list, filter(keep, chunk))
+            for match in kept:
+                yield match
     
-    def _get_content_heading_context(self, lines: List[str], line_num: int) -> Optional[str]:
-        """Get the heading context for a given line number in content."""
-        if not lines or line_num < 1 or line_num > len(lines):
-            return None
+    def _rg_slots(self) -> asyncio.Semaphore:
+        """Return the semaphore limiting concurrent ripgrep processes on the running loop."""
+        loop = asyncio.get_running_loop()
+        if self._rg_semaphore is None or self._rg_semaphore[0] is not loop:
+            self._rg_semaphore = (loop, asyncio.Semaphore(self.max_concurrent_searches))
+        return self._rg_semaphore[1]
+    
+    async def run_in_thread(self, func: Callable[..., Any], *args: Any, **kwargs: Any) -> Any:
+        """Run blocking work such as file reads in the default executor.
         
-        # Find the most recent heading before this line
-        for i in range(line_num - 1, -1, -1):  # Go backwards from target line
-            line = lines[i].strip()
-            if line.startswith('#'):
-                # Extract heading text (remove # symbols and strip)
-                heading_text = line.lstrip('#').strip()
-                if heading_text:
-                    return heading_text
+        The work runs in a copy of the caller's context, so stage timings
+        recorded in the thread count towards the calling tool.
+        """
+        loop = asyncio.get_running_loop()
+        context = contextvars.copy_context()
+        return await loop.run_in_executor(None, functools.partial(context.run, func, *args, **kwargs))
+    
+    async def run_rg_in_thread(self, func: Callable[..., Any], *args: Any, **kwargs: Any) -> Any:
+        """Run a blocking method that spawns ripgrep, counting it against the concurrency limit."""
+        async with self._rg_slots():
+            return await self.run_in_thread(func, *args, **kwargs)
+    
+    def _is_content_match(self, result: Match) -> bool:
+        """Check whether a match is in its note's content, outside frontmatter."""
+        with stage('frontmatter'):
+            end_line = self.frontmatter.end_line(result.file)
+        return end_line is None or result.line_number > end_line
+    
+    def _add_smart_context(self, results: List[Match]) -> List[Match]:
+        """Add smart context to search results based on location (frontmatter property or content heading).
         
-        return None
+        Matches are updated in place and returned.
+        """
+        with stage('smart_context'):
+            for result in results:
+                # Notes are outlined once per file version, so each match is a lookup
+                note = self.note_cache.outline(self.vault_path / result.file)
+                if note is not None:
+                    line_num = result.line_number
+                    
+                    # Check if this is in frontmatter
+                    if note.is_in_frontmatter(line_num):
+                        # Get frontmatter property context
+                        property_context = note.property_for_line(line_num)
+                        if property_context:
+                            result.smart_context = property_context
+                    else:
+                        # Get content heading context
+                        heading_context = note.heading_for_line(line_num)
+                        if heading_context:
+                            result.smart_context = heading_context
+            
+            return results
     
-    def find_links(
+    async def add_smart_context_async(self, results: List[Match]) -> List[Match]:
+        """Add smart context to matches off the event loop, such as one page of a result set."""
+        return await self.run_in_thread(self._add_smart_context, results)
+    
+    def _links_command(
         self,
-        link_type: str = 'all',
-        url_pattern: Optional[str] = None,
-        title_pattern: Optional[str] = None,
-        case_sensitive: bool = False,
-        folder: Optional[str] = None,
-        max_results: int = 15
-    ) -> List[Dict[str, Any]]:
-        """Find links of specified type with optional filtering."""
+        link_type: str,
+        url_pattern: Optional[str],
+        title_pattern: Optional[str],
+        case_sensitive: bool,
+        folder: Optional[str],
+        max_results: int,
+        sort: str = 'recency',
+        max_per_note: Optional[int] = None
+    ) -> Optional[List[str]]:
+        """Build the ripgrep command for a link search, or None for an unknown link type."""
         patterns = []
         
         if link_type in ('all', 'wiki_links'):
@@ -477,92 +1129,146 @@ class RipgrepWrapper:
             patterns.append(self.PATTERNS['external_urls'])
         
         if not patterns:
-            return []
+            return None
         
         # Combine patterns with OR
         combined_pattern = '|'.join(f'({p})' for p in patterns)
         
-        cmd = self._build_rg_command(
+        # A matching line holds at least one link unless the filters reject it,
+        # so the per-file cap is only safe without filters (and without relevance counts)
+        capped = not (url_pattern or title_pattern) and sort != 'relevance'
+        return self._build_rg_command(
             pattern=combined_pattern,
             case_sensitive=case_sensitive,
             folder=folder,
-            max_count=max_results
+            max_count=(max_per_note or max_results) if capped else None
+        )
+    
+    def find_links(
+        self,
+        link_type: str = 'all',
+        url_pattern: Optional[str] = None,
+        title_pattern: Optional[str] = None,
+        case_sensitive: bool = False,
+        folder: Optional[str] = None,
+        max_results: int = 15,
+        sort: str = 'recency'
+    ) -> List[Dict[str, Any]]:
+        """Find links of specified type with optional filtering."""
+        cmd = self._links_command(
+            link_type, url_pattern, title_pattern, case_sensitive, folder, max_results, sort
         )
+        if cmd is None:
+            return []
+        url_filter, title_filter = self._compile_link_filters(url_pattern, title_pattern)
+        kinds = self.LINK_KINDS[link_type]
         
+        stream = self._stream_rg_matches(cmd, max_output_bytes=self.max_output_bytes)
         try:
-            result = subprocess.run(cmd, capture_output=True, text=True, encoding='utf-8', errors='replace')
-            if result.returncode == 0:
-                matches = self._parse_rg_json_output(result.stdout)
-                processed = self._process_link_matches(matches, url_pattern, title_pattern)
-                return processed
-            return []
+            links = itertools.chain.from_iterable(
+                self._process_link_matches([match], url_filter, title_filter, kinds) for match in stream
+            )
+            return self._take_results(links, max_results, sort, _LINK_POSITION)
         except subprocess.SubprocessError:
             return []
+        finally:
+            stream.close()
     
-    def _process_link_matches(
+    async def find_links_async(
         self,
-        matches: List[Dict[str, Any]],
+        link_type: str = 'all',
         url_pattern: Optional[str] = None,
-        title_pattern: Optional[str] = None
+        title_pattern: Optional[str] = None,
+        case_sensitive: bool = False,
+        folder: Optional[str] = None,
+        max_results: int = 15,
+        sort: str = 'recency',
+        max_per_note: Optional[int] = None
     ) -> List[Dict[str, Any]]:
-        """Process link matches and apply additional filtering."""
+        """Async counterpart of ``find_links`` built on asyncio subprocesses.
+        
+        ``max_per_note`` caps the link lines read per note, as in ``search_async``.
+        """
+        cmd = self._links_command(
+            link_type, url_pattern, title_pattern, case_sensitive, folder, max_results, sort, max_per_note
+        )
+        if cmd is None:
+            return []
+        url_filter, title_filter = self._compile_link_filters(url_pattern, title_pattern)
+        kinds = self.LINK_KINDS[link_type]
+        
         processed = []
+        async with self._rg_slots():
+            stream = self._stream_rg_matches_async(cmd, max_output_bytes=self.max_output_bytes)
+            try:
+                async for match in stream:
+                    processed.extend(self._process_link_matches([match], url_filter, title_filter, kinds))
+                    if sort == 'none' and len(processed) >= max_results:
+                        break
+            except subprocess.SubprocessError:
+                return []
+            finally:
+                await stream.aclose()
+        return await self.run_in_thread(self._take_results, processed, max_results, sort, _LINK_POSITION)
+    
+    @staticmethod
+    def _compile_link_filters(
+        url_pattern: Optional[str],
+        title_pattern: Optional[str]
+    ) -> Tuple[Optional[Pattern], Optional[Pattern]]:
+        """Compile the URL and title filters of a link search once, ignoring case."""
+        return (
+            re.compile(url_pattern, re.IGNORECASE) if url_pattern else None,
+            re.compile(title_pattern, re.IGNORECASE) if title_pattern else None,
+        )
+    
+    def _process_link_matches(
+        self,
+        matches: List[Match],
+        url_filter: Optional[Pattern] = None,
+        title_filter: Optional[Pattern] = None,
+        kinds: Tuple[str, ...] = LINK_KINDS['all']
+    ) -> List[Dict[str, Any]]:
+        """Tokenize the links on matched lines, keeping ``kinds`` that pass the filters.
         
-        for match in matches:
-            text = match.get('text', '') or ''
-            
-            # Extract different types of links
-            wiki_links = re.findall(self.PATTERNS['wiki_links'], text)
-            markdown_links = re.findall(self.PATTERNS['markdown_links'], text)
-            external_urls = re.findall(self.PATTERNS['external_urls'], text)
+        Links are listed in the order they appear on the line. Embeds are
+        marked with ``'embed': True``.
+        """
+        with stage('links'):
+            processed = []
             
-            # Process each type
-            for link in wiki_links:
-                if self._matches_filters(link, link, url_pattern, title_pattern):
-                    processed.append({
-                        'file': match['file'],
-                        'line_number': match['line_number'],
-                        'link_type': 'wiki_link',
-                        'title': link,
-                        'url': link,
-                        'context': (text or '').strip()
-                    })
-            
-            for title, url in markdown_links:
-                if self._matches_filters(url, title, url_pattern, title_pattern):
-                    processed.append({
-                        'file': match['file'],
-                        'line_number': match['line_number'],
-                        'link_type': 'markdown_link',
-                        'title': title,
-                        'url': url,
-                        'context': (text or '').strip()
-                    })
+            filtered = url_filter is not None or title_filter is not None
+            for match in matches:
+                context = match.text.strip()
+                for token in tokenize_links(match.text):
+                    if token.kind not in kinds:
+                        continue
+                    if filtered and not self._matches_filters(token, url_filter, title_filter):
+                        continue
+                    link = {
+                        'file': match.file,
+                        'line_number': match.line_number,
+                        'link_type': token.kind,
+                        'title': token.title,
+                        'url': token.url,
+                        'context': context
+                    }
+                    if token.embed:
+                        link['embed'] = True
+                    processed.append(link)
             
-            for url in external_urls:
-                if self._matches_filters(url, url, url_pattern, title_pattern):
-                    processed.append({
-                        'file': match['file'],
-                        'line_number': match['line_number'],
-                        'link_type': 'external_url',
-                        'title': url,
-                        'url': url,
-                        'context': (text or '').strip()
-                    })
-        
-        return processed
+            return processed
     
+    @staticmethod
     def _matches_filters(
-        self,
-        url: str,
-        title: str,
-        url_pattern: Optional[str],
-        title_pattern: Optional[str]
+        token: LinkToken,
+        url_filter: Optional[Pattern],
+        title_filter: Optional[Pattern]
     ) -> bool:
-        """Check if link matches the provided filters."""
-        if url_pattern and not re.search(url_pattern, url, re.IGNORECASE):
+        """Check if a link passes the compiled URL and title filters."""
+        if url_filter is not None and not url_filter.search(token.url):
             return False
-        if title_pattern and not re.search(title_pattern, title, re.IGNORECASE):
+        if title_filter is not None and not title_filter.search(token.title):
             return False
         return True
     
@@ -584,6 +1290,9 @@ class RipgrepWrapper:
         if not full_path.exists():
             return None
         
+        # Imported here so server startup does not pay for the YAML parser
+        import yaml
+        
         try:
             with open(full_path, 'r', encoding='utf-8') as f:
                 content = f.read()
@@ -594,7 +1303,7 @@ class RipgrepWrapper:
                 frontmatter_text = match.group(1)
                 frontmatter_data = yaml.safe_load(frontmatter_text)
                 return self._make_json_serializable(frontmatter_data)
-            
+        
         except (IOError, yaml.YAMLError):
             pass
         
@@ -604,42 +1313,741 @@ class RipgrepWrapper:
         self,
         start_date: Optional[str] = None,
         end_date: Optional[str] = None,
-        folder: Optional[str] = None
+        folder: Optional[str] = None,
+        limit: Optional[int] = None
     ) -> List[Dict[str, Any]]:
-        """Get files modified within a date range."""
-        search_path = self.vault_path
+        """Get files modified within a date range, newest first.
+        
+        Answered from the mtime index, so no files are walked or stat'ed and
+        only the first ``limit`` notes in range are looked at.
+        """
+        try:
+            # Dates bound local calendar days, so end_date includes its whole day
+            start = end = None
+            if start_date:
+                start_day = datetime.strptime(start_date, '%Y-%m-%d')
+                start = start_day.timestamp()
+            if end_date:
+                end_day = datetime.strptime(end_date, '%Y-%m-%d') + timedelta(days=1)
+                end = end_day.timestamp()
+        except ValueError:
+            return []
+        
+        prefix = ''
         if folder:
-            search_path = self.vault_path / folder
+            prefix = os.path.join(os.path.normpath(folder), '')
         
         files = []
-        for file_path in search_path.rglob('*.md'):
-            if file_path.name.startswith('.'):
-                continue
-            
+        for rel_path, mtime in self.get_mtime_index().newest(start, end, prefix, limit):
+            modified = datetime.fromtimestamp(mtime)
+            files.append({
+                'file': rel_path,
+                'modified_date': modified.date().isoformat(),
+                'modified_time': modified.isoformat()
+            })
+        return files
+    
+    def get_mtime_index(self) -> MtimeIndex:
+        """Return the note mtime index, rebuilding it once it is older than ``mtime_index_ttl``.
+        
+        While the vault is watched the index is updated in place and never expires.
+        """
+        with self._mtime_index_lock:
+            expired = self._watcher is None and (
+                self._mtime_index is not None and self._mtime_index.age() > self.mtime_index_ttl
+            )
+            if self._mtime_index is None or expired:
+                with stage('index'):
+                    # The notes searches cover, so hidden and ignored folders stay out as the watcher's do
+                    self._mtime_index = MtimeIndex.scan(self.vault_path, self._list_notes())
+            return self._mtime_index
+    
+    def invalidate_mtime_index(self) -> None:
+        """Drop the mtime index so the next query rescans the vault."""
+        with self._mtime_index_lock:
+            self._mtime_index = None
+    
+    def get_link_graph(self) -> LinkGraph:
+        """Return the vault link graph, rebuilding it once it is older than ``link_index_ttl``.
+        
+        While the vault is watched the graph is updated in place and never expires.
+        """
+        with self._link_graph_lock:
+            expired = self._watcher is None and (
+                self._link_graph is not None and self._link_graph.age() > self.link_index_ttl
+            )
+            if self._link_graph is None or expired:
+                with stage('index'):
+                    restored = self._restore_link_graph() if self._snapshot is not None else None
+                    self._link_graph = restored or self._build_link_graph()
+            return self._link_graph
+    
+    def invalidate_link_graph(self) -> None:
+        """Drop the cached link graph so the next query rebuilds it."""
+        with self._link_graph_lock:
+            self._link_graph = None
+    
+    def get_tag_index(self) -> TagIndex:
+        """Return the vault tag index, rebuilding it once it is older than ``link_index_ttl``.
+        
+        While the vault is watched the index is updated in place and never expires.
+        """
+        with self._tag_index_lock:
+            expired = self._watcher is None and (
+                self._tag_index is not None and self._tag_index.age() > self.link_index_ttl
+            )
+            if self._tag_index is None or expired:
+                with stage('index'):
+                    self._tag_index = self._build_tag_index()
+            return self._tag_index
+    
+    def invalidate_tag_index(self) -> None:
+        """Drop the cached tag index so the next query rebuilds it."""
+        with self._tag_index_lock:
+            self._tag_index = None
+    
+    def get_property_index(self) -> PropertyIndex:
+        """Return the frontmatter property index, refreshing it once it is older than ``mtime_index_ttl``.
+        
+        A refresh re-parses only notes whose mtime or size changed. While the
+        vault is watched the index is updated in place and never expires.
+        """
+        with self._property_index_lock:
+            index = self._property_index
+            expired = self._watcher is None and index is not None and index.age() > self.mtime_index_ttl
+            if index is None or expired:
+                with stage('index'):
+                    self._property_index = self._refresh_property_index(index)
+            return self._property_index
+    
+    def invalidate_property_index(self) -> None:
+        """Drop the property index so the next query re-parses every note."""
+        with self._property_index_lock:
+            self._property_index = None
+    
+    def get_term_index(self) -> TermIndex:
+        """Return the BM25 term statistics, rebuilding them once older than ``link_index_ttl``.
+        
+        While the vault is watched the index is updated in place and never expires.
+        """
+        with self._term_index_lock:
+            expired = self._watcher is None and (
+                self._term_index is not None and self._term_index.age() > self.link_index_ttl
+            )
+            if self._term_index is None or expired:
+                with stage('index'):
+                    self._term_index = self._build_term_index()
+            return self._term_index
+    
+    def invalidate_term_index(self) -> None:
+        """Drop the term statistics so the next BM25 search rebuilds them."""
+        with self._term_index_lock:
+            self._term_index = None
+    
+    def get_trigram_index(self) -> TrigramIndex:
+        """Return the trigram index of note contents, building it if there is none.
+        
+        Searches start the build in the background and read every note until
+        it is done; changes applied during the build also update the new index.
+        """
+        with self._trigram_build_lock:
+            index = self._trigram_index
+            if index is None:
+                index = TrigramIndex()
+                with self._trigram_index_lock:
+                    self._trigram_index_building = index
+                with stage('index'):
+                    for note in self._list_notes():
+                        data = self._read_note_bytes(note)
+                        if data is not None:
+                            index.add(note, data)
+                with self._trigram_index_lock:
+                    self._trigram_index = index
+                    self._trigram_index_building = None
+            return index
+    
+    def invalidate_trigram_index(self) -> None:
+        """Drop the trigram index; searches read every note until it is rebuilt."""
+        with self._trigram_index_lock:
+            self._trigram_index = None
+    
+    def invalidate_caches(self) -> None:
+        """Drop every cache and index so they are rebuilt from the vault on next use."""
+        self.invalidate_link_graph()
+        self.invalidate_tag_index()
+        self.invalidate_property_index()
+        self.invalidate_term_index()
+        self.invalidate_trigram_index()
+        self.invalidate_mtime_index()
+        self.note_cache.clear()
+        self.frontmatter.clear()
+        self.result_cache.clear()
+        self.generation += 1
+    
+    def cache_stats(self) -> Dict[str, Any]:
+        """Return counters for the caches and indexes, without building any that are missing."""
+        mtime_index = self._mtime_index
+        graph = self._link_graph
+        tag_index = self._tag_index
+        property_index = self._property_index
+        term_index = self._term_index
+        trigram_index = self._trigram_index
+        return {
+            'vault_path': str(self.vault_path),
+            'generation': self.generation,
+            'watching': self.is_watching,
+            'result_cache': self.result_cache.stats(),
+            'cursors': self.cursors.stats(),
+            'note_cache': {
+                'entries': len(self.note_cache),
+                'bytes': self.note_cache.size_bytes,
+                'hits': self.note_cache.hits,
+                'misses': self.note_cache.misses,
+            },
+            'frontmatter_table': {
+                'entries': len(self.frontmatter),
+                'reads': self.frontmatter.reads,
+            },
+            'mtime_index': None if mtime_index is None else {
+                'notes': len(mtime_index),
+                'age_seconds': round(mtime_index.age(), 1),
+            },
+            'link_graph': None if graph is None else {
+                'notes': len(graph.notes),
+                'linking_notes': len(graph.linking_notes),
+                'link_targets': len(graph.backward),
+                'age_seconds': round(graph.age(), 1),
+            },
+            'tag_index': None if tag_index is None else {
+                'tagged_notes': len(tag_index),
+                'tags': tag_index.tag_count,
+                'age_seconds': round(tag_index.age(), 1),
+            },
+            'property_index': None if property_index is None else {
+                'notes_with_properties': len(property_index),
+                'properties': property_index.property_count,
+                'age_seconds': round(property_index.age(), 1),
+            },
+            'term_index': None if term_index is None else {
+                'notes': len(term_index),
+                'terms': term_index.term_count,
+                'age_seconds': round(term_index.age(), 1),
+            },
+            'snapshot': None if self.snapshot_path is None else dict(self.snapshot_stats, path=str(self.snapshot_path)),
+            'trigram_index': None if trigram_index is None else {
+                'notes': len(trigram_index),
+                'trigrams': trigram_index.trigram_count,
+                'postings_bytes': trigram_index.postings_bytes(),
+                'garbage': trigram_index.garbage,
+                'age_seconds': round(trigram_index.age(), 1),
+            },
+        }
+    
+    @property
+    def is_watching(self) -> bool:
+        """Whether a vault watcher is running, so cached results can be trusted."""
+        return self._watcher is not None
+    
+    def start_watching(self, poll_interval: float = 2.0, use_inotify: bool = True) -> VaultWatcher:
+        """Watch the vault and apply changes to caches and indexes as they happen."""
+        if self._watcher is None:
+            self._watcher = start_watcher(
+                str(self.vault_path), self.apply_changes, poll_interval=poll_interval, use_inotify=use_inotify,
+                list_notes=functools.partial(self._list_notes, strict=True)
+            )
+            # A trigram index built before now may have missed edits
+            self.invalidate_trigram_index()
+        return self._watcher
+    
+    def stop_watching(self) -> None:
+        """Stop the vault watcher; indexes expire by TTL again."""
+        if self._watcher is not None:
+            self._watcher.stop()
+            self._watcher = None
+            # Nothing keeps it current any more
+            self.invalidate_trigram_index()
+    
+    def apply_changes(self, events: List[ChangeEvent]) -> None:
+        """Update caches and indexes for the notes in a batch of change events."""
+        with self._changes_lock:
+            for event in events:
+                if event.kind == 'overflow':
+                    self.invalidate_caches()
+                elif event.kind == 'deleted':
+                    self._forget_note(event.path)
+                elif event.kind == 'renamed':
+                    self._forget_note(event.old_path)
+                    self._refresh_note(event.path)
+                else:
+                    self._refresh_note(event.path)
+            # Advanced only after the changes are applied, so a result computed from
+            # the old state is never stored under the new generation
+            self.generation += 1
+    
+    def load_snapshot(self) -> bool:
+        """Open the vault's snapshot and seed the frontmatter table and note outlines from it.
+        
+        The link graph is restored from the snapshot when it is first needed,
+        so only the header and the small sections are read here. Returns
+        whether a usable snapshot was found.
+        """
+        if self.snapshot_path is None:
+            return False
+        snapshot = Snapshot.open(self.snapshot_path, str(self.vault_path))
+        if snapshot is None:
+            return False
+        frontmatter = snapshot.section('frontmatter')
+        if frontmatter:
+            self.frontmatter.load(frontmatter)
+        outlines = snapshot.section('outlines')
+        if outlines:
+            self.note_cache.load_outlines(outlines)
+        with self._link_graph_lock:
+            if self._snapshot is not None:
+                self._snapshot.close()
+            # A graph already built is newer than the snapshot's
+            self._snapshot = snapshot if self._link_graph is None else None
+            if self._snapshot is None:
+                snapshot.close()
+        self.snapshot_stats['loaded'] = True
+        return True
+    
+    def save_snapshot(self) -> bool:
+        """Write the link graph, mtimes, frontmatter entries and outlines to the vault's snapshot.
+        
+        Only done while the vault is watched, when the indexes are known to
+        match the notes' mtimes. Returns whether a snapshot was written.
+        
+        Raises:
+            OSError: If the snapshot directory is not writable
+        """
+        if self.snapshot_path is None or self._watcher is None:
+            return False
+        graph = self.get_link_graph()
+        mtime_index = self.get_mtime_index()
+        with self._snapshot_save_lock:
+            with self._changes_lock, self._link_graph_lock:
+                # An overflow may have dropped the indexes since they were fetched
+                if self._link_graph is not graph or self._mtime_index is not mtime_index:
+                    return False
+                sections = {
+                    'mtimes': marshal.dumps(mtime_index.mtimes()),
+                    'link_graph': marshal.dumps(graph.state()),
+                }
+            sections['frontmatter'] = marshal.dumps(self.frontmatter.entries())
+            sections['outlines'] = marshal.dumps(self.note_cache.outlines())
+            self.snapshot_stats['bytes'] = write_snapshot(self.snapshot_path, str(self.vault_path), sections)
+            self.snapshot_stats['saves'] += 1
+        return True
+    
+    def _forget_note(self, rel_path: str) -> None:
+        """Remove a deleted note from every cache and index."""
+        self.note_cache.discard(self.vault_path / rel_path)
+        self.frontmatter.discard(rel_path)
+        # Indexes that are being built hold their lock, so the change applies after the build
+        with self._mtime_index_lock:
+            if self._mtime_index is not None:
+                self._mtime_index.remove(rel_path)
+        with self._link_graph_lock:
+            if self._link_graph is not None:
+                self._link_graph.remove_note(rel_path)
+        with self._tag_index_lock:
+            if self._tag_index is not None:
+                self._tag_index.remove(rel_path)
+        with self._property_index_lock:
+            if self._property_index is not None:
+                self._property_index.remove(rel_path)
+        with self._term_index_lock:
+            if self._term_index is not None:
+                self._term_index.remove(rel_path)
+        with self._trigram_index_lock:
+            for index in (self._trigram_index, self._trigram_index_building):
+                if index is not None:
+                    index.remove(rel_path)
+            self._collect_trigram_garbage()
+    
+    def _refresh_note(self, rel_path: str) -> None:
+        """Re-index a created or modified note."""
+        try:
+            mtime = os.stat(self.vault_path / rel_path).st_mtime
+        except OSError:
+            self._forget_note(rel_path)
+            return
+        
+        self.frontmatter.discard(rel_path)
+        with self._mtime_index_lock:
+            if self._mtime_index is not None:
+                self._mtime_index.update(rel_path, mtime)
+        with self._link_graph_lock:
+            if self._link_graph is not None:
+                note = self.note_cache.get(self.vault_path / rel_path)
+                if note is not None:
+                    self._link_graph.update_note(rel_path, note.lines)
+        with self._tag_index_lock:
+            if self._tag_index is not None:
+                note = self.note_cache.get(self.vault_path / rel_path)
+                if note is not None:
+                    found = scan_tags(enumerate(note.lines, 1))
+                    tags = found.inline
+                    if found.has_tag_key:
+                        tags |= frontmatter_tags(note.lines[:found.frontmatter_end])
+                    self._tag_index.set_tags(rel_path, tags)
+        with self._property_index_lock:
+            if self._property_index is not None:
+                self._index_note_properties(self._property_index, rel_path)
+        with self._term_index_lock:
+            if self._term_index is not None:
+                note = self.note_cache.get(self.vault_path / rel_path)
+                if note is not None:
+                    terms = note_terms(self._note_title(rel_path), '\n'.join(note.lines))
+                    self._term_index.set_note(rel_path, *terms)
+        with self._trigram_index_lock:
+            indexes = [index for index in (self._trigram_index, self._trigram_index_building) if index is not None]
+            # Candidates are passed to ripgrep by path, which bypasses its hidden and
+            # ignore rules, so notes a full scan skips must stay out of the index
+            watcher = self._watcher
+            if watcher is not None and not watcher.covers(rel_path):
+                for index in indexes:
+                    index.remove(rel_path)
+                return
+            data = self._read_note_bytes(rel_path) if indexes else None
+            if data is not None:
+                for index in indexes:
+                    index.add(rel_path, data)
+                self._collect_trigram_garbage()
+    
+    def _build_term_index(self) -> TermIndex:
+        """Build the BM25 term statistics by reading every note the searches cover."""
+        index = TermIndex()
+        for note in self._list_notes():
+            data = self._read_note_bytes(note)
+            if data is not None:
+                index.set_note(note, *note_terms(self._note_title(note), data.decode('utf-8', 'replace')))
+        return index
+    
+    @staticmethod
+    def _note_title(rel_path: str) -> str:
+        """Return a note's title: its file name without the extension."""
+        return os.path.splitext(os.path.basename(rel_path))[0]
+    
+    def _read_note_bytes(self, rel_path: str) -> Optional[bytes]:
+        """Read a note's raw contents, or return None if it cannot be read."""
+        try:
+            with open(self.vault_path / rel_path, 'rb') as f:
+                return f.read()
+        except OSError:
+            return None
+    
+    def _collect_trigram_garbage(self) -> None:
+        """Drop the trigram index once stale trigrams and ids outnumber its notes.
+        
+        Called with the index lock held; the next search starts a rebuild.
+        """
+        index = self._trigram_index
+        if index is not None and index.garbage > max(len(index), 1000):
+            self._trigram_index = None
+    
+    def _candidate_notes(self, queries: List[str], folder: Optional[str]) -> Optional[List[str]]:
+        """Return the notes that can contain a match of any of ``queries``.
+        
+        Returns None when every note has to be searched: the vault is not
+        watched, the trigram index is not built yet, a query has no literal to
+        look up, or the candidates are too many to be worth listing.
+        """
+        if self._watcher is None or (platform.system() == 'Linux' and self.rg_command.endswith('.exe')):
+            # Under WSL each path would need converting for Windows ripgrep
+            return None
+        index = self._trigram_index
+        if index is None:
+            if not self._trigram_build_lock.locked():
+                threading.Thread(target=self.get_trigram_index, daemon=True).start()
+            return None
+        alternatives = query_trigrams(queries)
+        if alternatives is None:
+            return None
+        
+        with stage('prefilter'):
+            notes = index.candidates(alternatives)
+            folder = os.path.normpath(folder) if folder else os.curdir
+            if folder != os.curdir:
+                prefix = os.path.join(folder, '')
+                notes = {note for note in notes if note.startswith(prefix)}
+            if len(notes) > len(index) * PREFILTER_MAX_FRACTION:
+                return None
+            command_chars = sum(len(note) for note in notes) + len(notes) * (len(self._vault_prefix) + 1)
+            if command_chars > PREFILTER_MAX_COMMAND_CHARS:
+                return None
+            return sorted(notes)
+    
+    def _restore_link_graph(self) -> Optional[LinkGraph]:
+        """Restore the link graph from the opened snapshot, reparsing notes changed since it was saved.
+        
+        Returns None, so the graph is built from scratch, if the snapshot has
+        no usable graph or more than ``SNAPSHOT_MAX_CHANGED_SHARE`` of the
+        vault changed. Called with the link graph lock held.
+        """
+        snapshot, self._snapshot = self._snapshot, None
+        # The vault is scanned before the graph is decoded, while the heap is still small
+        current = self.get_mtime_index().mtimes()
+        with paused_gc():
             try:
-                mtime = datetime.fromtimestamp(file_path.stat().st_mtime)
-                mdate = mtime.date()
-                
-                # Check date range
-                if start_date:
-                    start = datetime.strptime(start_date, '%Y-%m-%d').date()
-                    if mdate < start:
-                        continue
-                
-                if end_date:
-                    end = datetime.strptime(end_date, '%Y-%m-%d').date()
-                    if mdate > end:
-                        continue
-                
-                files.append({
-                    'file': str(file_path.relative_to(self.vault_path)),
-                    'modified_date': mdate.isoformat(),
-                    'modified_time': mtime.isoformat()
-                })
-                
-            except (OSError, ValueError):
+                saved = snapshot.section('mtimes')
+                if saved is None:
+                    return None
+                changed = [note for note, mtime in current.items() if saved.get(note) != mtime]
+                deleted = [note for note in saved if note not in current]
+                if len(changed) + len(deleted) > self.SNAPSHOT_MAX_CHANGED_SHARE * max(len(current), 1):
+                    return None
+                state = snapshot.section('link_graph')
+                if state is None:
+                    return None
+            finally:
+                snapshot.close()
+            graph = LinkGraph.from_state(state)
+        
+        for note in deleted:
+            graph.remove_note(note)
+        # Oldest first, so the newest note ends up ranked first
+        for note in sorted(changed, key=current.__getitem__):
+            parsed = self.note_cache.get(self.vault_path / note)
+            if parsed is not None:
+                graph.update_note(note, parsed.lines)
+            else:
+                graph.remove_note(note)
+        self.snapshot_stats['restored_notes'] = len(graph.notes)
+        self.snapshot_stats['reparsed_notes'] = len(changed) + len(deleted)
+        return graph
+    
+    def _build_link_graph(self) -> LinkGraph:
+        """Build the link graph from one unsorted, uncapped ripgrep pass over the vault.
+        
+        The same pass finds the notes declaring frontmatter aliases; only their
+        frontmatter is read afterwards, to index the aliases.
+        """
+        files = self.get_files_by_date_range()
+        files.sort(key=lambda info: info['modified_time'], reverse=True)
+        graph = LinkGraph(info['file'] for info in files)
+        
+        combined_pattern = '|'.join(
+            f'({self.PATTERNS[name]})' for name in ('wiki_links', 'markdown_links', 'external_urls', 'alias_keys')
+        )
+        cmd = self._build_rg_command(
+            pattern=combined_pattern,
+            max_count=None
+        )
+        
+        # Links are indexed as they stream in, so the output ceiling does not apply
+        alias_notes = []
+        for match in self._stream_rg_matches(cmd):
+            text = match.text
+            if ALIAS_KEY_RE.match(text):
+                alias_notes.append(match.file)
+                if not LINK_TOKEN_RE.search(text):
+                    continue
+            graph.add_line(match.file, match.line_number, text.strip())
+        
+        for note in dict.fromkeys(alias_notes):
+            entry = self.frontmatter.get(note)
+            if entry is not None and entry.end_line is not None:
+                graph.set_aliases(note, parse_aliases(entry.block.decode('utf-8', 'replace').splitlines()))
+        
+        return graph
+    
+    def find_backlinks(
+        self,
+        target_note: str,
+        case_sensitive: bool = False,
+        folder: Optional[str] = None,
+        max_results: int = 15,
+        smart_context: bool = True
+    ) -> List[Match]:
+        """Find links from other notes to ``target_note`` using the link graph."""
+        graph = self.get_link_graph()
+        note = graph.resolve(target_note)
+        if note is None:
+            return []
+        
+        folder_prefix = Path(folder).as_posix().strip('/') + '/' if folder else None
+        results = []
+        for link in graph.backlinks(note):
+            if folder_prefix and not Path(link.source).as_posix().startswith(folder_prefix):
+                continue
+            if case_sensitive and not self._links_by_exact_name(link.target, note, graph):
                 continue
+            results.append(Match(link.source, link.line_number, link.text))
+            if len(results) >= max_results:
+                break
+        
+        if smart_context:
+            results = self._add_smart_context(results)
+        return results
+    
+    @staticmethod
+    def _links_by_exact_name(target: str, note: str, graph: LinkGraph) -> bool:
+        """Check that a link names ``note`` or one of its aliases with the exact case."""
+        name = posixpath.basename(target.replace('\\', '/'))
+        if name.lower().endswith('.md'):
+            name = name[:-3]
+        return name == Path(note).stem or name in graph.aliases.get(note, ())
+    
+    def find_orphaned_notes(self, folder: Optional[str] = None) -> List[Dict[str, Any]]:
+        """Find notes with no outgoing and no incoming links.
+        
+        Orphans are computed by set difference over the link graph, which is built
+        from one ripgrep pass. Incoming links may come from anywhere in the vault,
+        so only the candidate notes are limited to ``folder``.
+        """
+        orphans = self.get_link_graph().orphans()
+        candidates = self.get_files_by_date_range(folder=folder)
+        return [
+            {'file': info['file'], 'modified_date': info['modified_date']}
+            for info in candidates
+            if info['file'] in orphans
+        ]
+    
+    def _build_tag_index(self) -> TagIndex:
+        """Build the tag index from one unsorted, uncapped ripgrep pass over the vault.
+        
+        The pass returns lines with a word starting with '#', frontmatter and
+        code fences, and frontmatter tag keys. Only the frontmatter of notes
+        with a tag key is read afterwards.
+        """
+        index = TagIndex()
+        cmd = self._build_rg_command(
+            pattern=[self.PATTERNS[name] for name in ('tags', 'tag_keys', 'fences')],
+            max_count=None
+        )
+        
+        # ripgrep prints the matches of each file together and in line order
+        matches = self._stream_rg_matches(cmd)
+        for note, note_matches in itertools.groupby(matches, key=operator.attrgetter('file')):
+            found = scan_tags((match.line_number, match.text) for match in note_matches)
+            tags = found.inline
+            if found.has_tag_key:
+                entry = self.frontmatter.get(note)
+                if entry is not None and entry.end_line is not None:
+                    tags |= frontmatter_tags(entry.block.decode('utf-8', 'replace').splitlines())
+            index.set_tags(note, tags)
+        
+        return index
+    
+    def find_notes_by_tags(
+        self,
+        tags: Optional[List[str]] = None,
+        any_tags: Optional[List[str]] = None,
+        exclude_tags: Optional[List[str]] = None,
+        folder: Optional[str] = None,
+        max_results: int = 15
+    ) -> List[Dict[str, Any]]:
+        """Find notes by tag, newest first.
+        
+        Notes must carry every tag in ``tags``, at least one tag in
+        ``any_tags`` and none in ``exclude_tags``; a tag also matches the tags
+        nested below it. Answered from the tag and mtime indexes.
+        """
+        index = self.get_tag_index()
+        mtimes = self.get_mtime_index()
+        universe = None
+        if not tags and not any_tags:
+            # Exclusions alone select from every note, tagged or not
+            universe = [rel_path for rel_path, _ in mtimes.newest()]
+        # The watcher updates the index in place under its lock
+        with self._tag_index_lock:
+            notes = index.query(tags or (), any_tags or (), exclude_tags or (), universe)
+            
+            if folder:
+                prefix = os.path.join(os.path.normpath(folder), '')
+                notes = [note for note in notes if note.startswith(prefix)]
+            
+            newest = heapq.nlargest(max_results, ((mtimes.mtime(note) or 0.0, note) for note in notes))
+            return [
+                {
+                    'file': note,
+                    'modified_date': datetime.fromtimestamp(mtime).date().isoformat(),
+                    'tags': sorted(index.tags_of(note)),
+                }
+                for mtime, note in newest
+            ]
+    
+    def _refresh_property_index(self, index: Optional[PropertyIndex]) -> PropertyIndex:
+        """Bring a property index up to date with the vault, or build one if ``index`` is None."""
+        if index is None:
+            index = PropertyIndex()
+        notes = [rel_path for rel_path, _ in self.get_mtime_index().newest()]
+        for gone in index.indexed_notes().difference(notes):
+            index.remove(gone)
+        for rel_path in notes:
+            self._index_note_properties(index, rel_path)
+        index.built_at = time.monotonic()
+        return index
+    
+    def _index_note_properties(self, index: PropertyIndex, rel_path: str) -> None:
+        """Parse a note's frontmatter into the index unless this version is already indexed."""
+        entry = self.frontmatter.get(rel_path)
+        if entry is None:
+            index.remove(rel_path)
+            return
+        version = (entry.mtime_ns, entry.size)
+        if index.version(rel_path) != version:
+            properties = parse_properties(entry.block) if entry.end_line is not None else {}
+            index.set_properties(rel_path, properties, version)
+    
+    def find_notes_by_properties(
+        self,
+        conditions: List[Dict[str, Any]],
+        folder: Optional[str] = None,
+        max_results: int = 15
+    ) -> List[Dict[str, Any]]:
+        """Find notes whose frontmatter satisfies every condition, newest first.
+        
+        A condition is a dict with ``property`` (nested keys as dotted paths),
+        ``op`` and ``value``. ``op`` is ``eq``, ``contains``, ``gt``, ``gte``,
+        ``lt``, ``lte``, ``exists`` or ``missing``; it defaults to ``eq``, or
+        to ``exists`` without a value. Answered from the property and mtime
+        indexes without running ripgrep.
+        
+        Raises:
+            ValueError: If a condition has no property or an unknown operator
+        """
+        index = self.get_property_index()
+        mtimes = self.get_mtime_index()
         
-        # Sort by modification date (newest first)
-        files.sort(key=lambda x: x['modified_date'], reverse=True)
-        return files
\ No newline at end of file
+        # The watcher updates the index in place under its lock
+        with self._property_index_lock:
+            required = []
+            excluded = []
+            for condition in conditions:
+                key = condition.get('property')
+                if not key:
+                    raise ValueError("Each condition needs a 'property'")
+                op = condition.get('op') or ('eq' if 'value' in condition else 'exists')
+                if op == 'missing':
+                    excluded.append(index.select(key, 'exists'))
+                else:
+                    required.append(index.select(key, op, condition.get('value')))
+            
+            if required:
+                required.sort(key=len)
+                notes = set(required[0])
+                for other in required[1:]:
+                    notes &= other
+            else:
+                notes = {rel_path for rel_path, _ in mtimes.newest()}
+            for other in excluded:
+                notes -= other
+            
+            if folder:
+                prefix = os.path.join(os.path.normpath(folder), '')
+                notes = [note for note in notes if note.startswith(prefix)]
+            
+            keys = [condition['property'].lower() for condition in conditions]
+            newest = heapq.nlargest(max_results, ((mtimes.mtime(note) or 0.0, note) for note in notes))
+            results = []
+            for mtime, note in newest:
+                properties = index.properties_of(note)
+                results.append({
+                    'file': note,
+                    'modified_date': datetime.fromtimestamp(mtime).date().isoformat(),
+                    'properties': {key: properties[key] for key in keys if key in properties},
+                })
+            return results
\ No newline at end of file
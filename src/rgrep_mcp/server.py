@@ -1,43 +1,291 @@
 """MCP server for Obsidian vault search using ripgrep - FastMCP version."""
 
+import functools
+import inspect
 import json
+import operator
 import os
-import re
 import sys
-from typing import Any, Dict, List, Optional
+import threading
+import time
+from typing import Any, Awaitable, Callable, Dict, Hashable, List, Optional
 
 from mcp.server.fastmcp import FastMCP
 
 from .config import Config
+from .cursors import Page
+from .matches import Match
 from .ripgrep import RipgrepWrapper
+from .stats import measure, stage
 
 
-# Initialize configuration and ripgrep wrapper globally
-try:
-    config = Config()
-    config.validate()
-    rg = RipgrepWrapper(config.vault_path)
+# The wrapper is created on first use, so importing the server and the MCP
+# handshake never wait on ripgrep or a vault scan
+_config: Optional[Config] = None
+_rg: Optional[RipgrepWrapper] = None
+_init_lock = threading.Lock()
+
+
+def get_config() -> Config:
+    """Return the server configuration, loading it on first use."""
+    global _config
+    if _config is None:
+        with _init_lock:
+            if _config is None:
+                _config = Config()
+    return _config
+
+
+def get_rg() -> RipgrepWrapper:
+    """Return the ripgrep wrapper, creating it on first use.
+    
+    Raises:
+        ValueError: If the vault path is missing or invalid
+        RuntimeError: If ripgrep is not installed
+    """
+    global _rg
+    if _rg is None:
+        config = get_config()
+        with _init_lock:
+            if _rg is None:
+                config.validate()
+                _rg = RipgrepWrapper(
+                    config.vault_path,
+                    link_index_ttl=config.link_index_ttl,
+                    note_cache_entries=config.note_cache_entries,
+                    note_cache_bytes=config.note_cache_bytes,
+                    max_output_bytes=config.max_output_bytes,
+                    max_concurrent_searches=config.max_concurrent_searches,
+                    mtime_index_ttl=config.mtime_index_ttl,
+                    result_cache_entries=config.result_cache_entries,
+                    result_cache_bytes=config.result_cache_bytes,
+                    result_cache_ttl=config.result_cache_ttl,
+                    slow_query_ms=config.slow_query_ms,
+                    slow_query_entries=config.slow_query_entries,
+                    cursor_entries=config.cursor_entries,
+                    cursor_results=config.cursor_results,
+                    cursor_ttl=config.cursor_ttl,
+                    snapshot_dir=config.snapshot_dir
+                )
+    return _rg
+
+
+def _warm_up() -> None:
+    """Create the wrapper and build the vault indexes in the background.
     
-    # Test basic functionality
-    rg.search_content("test", max_results=1)
+    Runs after the server starts, so the first tool calls find the link graph,
+    tag, property and mtime indexes ready instead of building them on demand.
+    The link graph is restored from the vault's snapshot when there is one.
+    The trigram index is built last, since searches only use it while the
+    vault is watched. Afterwards the snapshot is saved again whenever the
+    vault changed in the last ``snapshot_interval`` seconds.
+    """
+    try:
+        rg = get_rg()
+        config = get_config()
+        rg.load_snapshot()
+        if config.watch_vault:
+            # Keeps caches and indexes current with edits made in Obsidian
+            rg.start_watching(poll_interval=config.watch_poll_interval)
+        rg.get_mtime_index()
+        rg.get_link_graph()
+        rg.get_tag_index()
+        rg.get_property_index()
+        if config.watch_vault:
+            rg.get_trigram_index()
+    except Exception as e:
+        print(f"Warning: Background warm-up failed. {e}", file=sys.stderr)
+        return
     
-except Exception as e:
-    print(f"Error: Could not initialize Obsidian search. {e}", file=sys.stderr)
-    print(f"Check that OBSIDIAN_VAULT_PATH is set to a valid vault directory.", file=sys.stderr)
-    sys.exit(1)
+    saved_generation = None
+    while rg.snapshot_path is not None and rg.is_watching:
+        if rg.generation != saved_generation:
+            saved_generation = rg.generation
+            _save_snapshot(rg)
+        time.sleep(config.snapshot_interval)
+
+
+def _save_snapshot(rg: RipgrepWrapper) -> None:
+    """Save the vault's snapshot, warning instead of failing if it cannot be written."""
+    try:
+        rg.save_snapshot()
+    except Exception as e:
+        print(f"Warning: Could not save the index snapshot. {e}", file=sys.stderr)
+
 
 # Create FastMCP server
 mcp = FastMCP("rgrep-mcp")
 
+# Queries accepted by one rg_search_notes_batch call
+MAX_BATCH_QUERIES = 20
+
+# What tells results apart when later pages of a sort "none" search are searched for
+_MATCH_POSITION = operator.attrgetter("file", "line_number")
+_LINK_POSITION = operator.itemgetter("file", "line_number", "link_type", "url", "title")
+
+
+def _normalize_folder(folder: Optional[str]) -> Optional[str]:
+    """Normalize a folder argument so equivalent spellings share cache entries."""
+    if not folder:
+        return None
+    return folder.replace('\\', '/').strip('/') or None
+
+
+def _cache_lookup(rg: RipgrepWrapper, key: tuple) -> Optional[str]:
+    """Return a cached tool result for the current vault generation.
+    
+    Results are only cached while the vault is watched, since otherwise edits
+    would go unnoticed.
+    """
+    if not rg.is_watching:
+        return None
+    return rg.result_cache.get(key, rg.generation)
+
+
+def _cache_store(rg: RipgrepWrapper, key: tuple, result: str, generation: int) -> str:
+    """Cache a tool result computed for ``generation`` and return it."""
+    if rg.is_watching:
+        rg.result_cache.put(key, result, generation)
+    return result
+
+
+async def _cached_first_page(rg: RipgrepWrapper, key: tuple) -> Optional[str]:
+    """Return a cached tool result, or the first page of a result set kept for the same search."""
+    cached = _cache_lookup(rg, key)
+    if cached is not None or not rg.is_watching:
+        return cached
+    page = rg.cursors.find(key, rg.generation)
+    if page is None:
+        return None
+    return await _render_page(page)
+
+
+def _first_page_limit(rg: RipgrepWrapper, max_results: int, sort: str) -> int:
+    """Return how many results a search collects for its first page.
+    
+    With sort "none" only the first page and one more result, telling whether
+    there is a next page, are searched for; later pages are searched for when
+    asked for. Other orders scan every match anyway and keep as many results
+    as cursors can reach, plus one to tell whether the result set is cut.
+    """
+    if sort == "none":
+        return max_results + 1
+    return max(max_results, rg.cursors.max_results) + 1
+
+
+def _search_rest(
+    rg: RipgrepWrapper,
+    search: Callable[[int], Awaitable[List[Any]]],
+    position: Callable[[Any], Hashable]
+) -> Callable[[List[Any]], Awaitable[List[Any]]]:
+    """Return the callback searching for the results after the first page of a sort "none" search.
+    
+    ripgrep finds matches in a different order on each run, so the search runs
+    again for a full result set and drops the results already served.
+    """
+    async def more(served: List[Any]) -> List[Any]:
+        seen = {position(result) for result in served}
+        results = await search(rg.cursors.max_results + 1)
+        return [result for result in results if position(result) not in seen]
+    
+    return more
+
+
+async def _first_page(
+    rg: RipgrepWrapper,
+    tool: str,
+    results: List[Any],
+    page_size: int,
+    render: Callable[[List[Any], Optional[str]], Awaitable[Dict[str, Any]]],
+    key: tuple,
+    generation: int,
+    more: Optional[Callable[[List[Any]], Awaitable[List[Any]]]] = None
+) -> str:
+    """Format the first page of a search's results, keeping the rest for ``next_cursor``.
+    
+    Results that fit on one page go to the result cache; larger result sets
+    serve repeated searches themselves. ``more`` searches for the results
+    after the first page, when only those were searched for.
+    """
+    page = rg.cursors.open(tool, results, page_size, render, key if rg.is_watching else None, generation, more)
+    result = await _render_page(page)
+    if page.next_cursor is None:
+        return _cache_store(rg, key, result, generation)
+    return result
+
+
+async def _next_page(rg: RipgrepWrapper, tool: str, cursor: str) -> str:
+    """Format the page of a kept result set that ``cursor`` points to."""
+    page = rg.cursors.page(cursor, tool)
+    if page is not None and page.more is not None:
+        # Only the first page was searched for; search for the rest now
+        page = rg.cursors.complete(cursor, tool, await page.more(page.results))
+    if page is None:
+        return json.dumps({"error": "Unknown or expired cursor. Run the search again for a new one"})
+    return await _render_page(page)
+
+
+async def _render_page(page: Page) -> str:
+    """Format a page of a result set; the last page of a set cut at the cursor limit is marked truncated."""
+    result = await page.render(page.results, page.next_cursor)
+    if page.truncated:
+        result["truncated"] = True
+    return _serialize(result)
+
+
+def _format_matches(results: List[Match], max_results: int) -> List[Dict[str, Any]]:
+    """Format search matches as snippets with their smart context."""
+    formatted_results = []
+    
+    # Limit results to max_results (since ripgrep --max-count is per-file)
+    for result in results[:max_results]:
+        formatted_result = {
+            "file": result.file,
+            "line_number": result.line_number,
+            "snippet": result.text.strip()
+        }
+        
+        # Add smart context if available
+        if result.smart_context is not None:
+            formatted_result['smart_context'] = result.smart_context
+        formatted_results.append(formatted_result)
+    
+    return formatted_results
+
+
+def _serialize(result: Dict[str, Any]) -> str:
+    """Format a tool result as indented JSON, timed as the 'serialize' stage."""
+    with stage('serialize'):
+        return json.dumps(result, indent=2)
+
+
+def _instrumented(tool):
+    """Record the latency and stage times of every call to ``tool`` in ``rg.stats``."""
+    signature = inspect.signature(tool)
+    
+    @functools.wraps(tool)
+    async def wrapper(*args, **kwargs):
+        with measure() as call:
+            result = await tool(*args, **kwargs)
+        if _rg is not None:
+            arguments = signature.bind_partial(*args, **kwargs).arguments
+            _rg.stats.record(tool.__name__, call.seconds, call.timer.stages, arguments)
+        return result
+    
+    return wrapper
+
 
 @mcp.tool()
-def rg_search_notes(
+@_instrumented
+async def rg_search_notes(
     query: str,
     search_scope: str = "all",
     case_sensitive: bool = False,
     folder: Optional[str] = None,
     max_results: int = 15,
-    smart_context: bool = True
+    smart_context: bool = True,
+    sort: str = "recency",
+    cursor: Optional[str] = None
 ) -> str:
     """Search through notes with scope filtering.
     
@@ -48,57 +296,69 @@ def rg_search_notes(
         folder: Optional folder to limit search scope
         max_results: Maximum number of results to return (minimum: 1, maximum: 100, capped automatically)
         smart_context: Whether to include smart context (frontmatter property names, content headings)
+        sort: Result order - "recency" (newest notes first), "relevance" (notes with most matches first),
+            "bm25" (notes ranked by BM25 score for the query's words, with title, heading and frontmatter
+            words weighted higher), "path" (by file and line), or "none" (first matches found, fastest)
+        cursor: The next_cursor of an earlier result, to get its next page without searching again;
+            the other arguments are then ignored
     
     Returns:
-        JSON string with search results
+        JSON string with search results; next_cursor is set when more results remain
     """
     try:
+        rg = get_rg()
+        
+        if cursor:
+            return await _next_page(rg, "rg_search_notes", cursor)
+        
         # Validate inputs
         if search_scope not in ["all", "content_only", "frontmatter_only"]:
             return json.dumps({"error": "Invalid search_scope. Use: all, content_only, or frontmatter_only"})
         
+        if sort not in rg.SEARCH_SORT_MODES:
+            return json.dumps({"error": f"Invalid sort. Use: {', '.join(rg.SEARCH_SORT_MODES)}"})
+        
         if max_results < 1 or max_results > 100:
             max_results = min(max(max_results, 1), 100)
         
-        # Perform search based on scope  
-        # Use a higher per-file limit to get enough results, then limit globally
-        per_file_limit = min(max_results * 2, 50)  # Get extra results but cap at reasonable limit
-        
-        if search_scope == "all":
-            results = rg.search_content(query, case_sensitive, folder, per_file_limit, smart_context)
-        elif search_scope == "content_only":
-            results = rg.search_content_only(query, case_sensitive, folder, per_file_limit, smart_context)
-        elif search_scope == "frontmatter_only":
-            results = rg.search_frontmatter_only(query, case_sensitive, folder, per_file_limit, smart_context)
-        
-        # Format results for LLM consumption
-        formatted_results = {
-            "query": query,
-            "search_scope": search_scope,
-            "total_matches": len(results),
-            "results": []
-        }
-        
-        # Limit results to max_results (since ripgrep --max-count is per-file)
-        limited_results = results[:max_results] if results else []
-        
-        for result in limited_results:
-            formatted_result = {
-                "file": result['file'],
-                "line_number": result['line_number'],
-                "snippet": (result.get('text', '') or '').strip()
-            }
+        cache_key = (
+            "rg_search_notes", query, search_scope, case_sensitive,
+            _normalize_folder(folder), max_results, smart_context, sort
+        )
+        cached = await _cached_first_page(rg, cache_key)
+        if cached is not None:
+            return cached
+        generation = rg.generation
+        
+        # Perform search based on scope
+        # ripgrep searches in parallel; results are ordered afterwards unless sort is "none".
+        # Results for later pages are collected too, no more than a page per note as before,
+        # and smart context is added per page
+        async def search(limit: int) -> List[Match]:
+            return await rg.search_async(
+                query, search_scope, case_sensitive, folder, limit, False, sort, max_per_note=max_results
+            )
+        
+        results = await search(_first_page_limit(rg, max_results, sort))
+        more = _search_rest(rg, search, _MATCH_POSITION) if sort == "none" else None
+        
+        async def render(page: List[Match], next_cursor: Optional[str]) -> Dict[str, Any]:
+            if smart_context:
+                page = await rg.add_smart_context_async(page)
             
-            # Add smart context if available
-            if 'smart_context' in result:
-                formatted_result['smart_context'] = result['smart_context']
-            formatted_results["results"].append(formatted_result)
-        
-        # Update total_matches to reflect actual returned results
-        formatted_results["total_matches"] = len(limited_results)
-        
-        return json.dumps(formatted_results, indent=2)
+            # Format results for LLM consumption
+            formatted = _format_matches(page, len(page))
+            return {
+                "query": query,
+                "search_scope": search_scope,
+                "sort": sort,
+                "total_matches": len(formatted),
+                "results": formatted,
+                "next_cursor": next_cursor
+            }
         
+        return await _first_page(rg, "rg_search_notes", results, max_results, render, cache_key, generation, more)
+    
     except Exception as e:
         return json.dumps({
             "error": str(e),
@@ -109,13 +369,96 @@ def rg_search_notes(
 
 
 @mcp.tool()
-def rg_search_links(
+@_instrumented
+async def rg_search_notes_batch(
+    queries: List[str],
+    search_scope: str = "all",
+    case_sensitive: bool = False,
+    folder: Optional[str] = None,
+    max_results: int = 15,
+    smart_context: bool = True,
+    sort: str = "recency"
+) -> str:
+    """Run several note searches at once, scanning the vault a single time.
+    
+    Prefer this over repeated rg_search_notes calls when exploring related terms.
+    
+    Args:
+        queries: Search patterns (support regex), up to 20
+        search_scope: Where to search - "all", "content_only", or "frontmatter_only"
+        case_sensitive: Whether search should be case sensitive
+        folder: Optional folder to limit search scope
+        max_results: Maximum number of results per query (minimum: 1, maximum: 100, capped automatically)
+        smart_context: Whether to include smart context (frontmatter property names, content headings)
+        sort: Result order for each query - "recency", "relevance", "bm25", "path", or "none" (see rg_search_notes)
+    
+    Returns:
+        JSON string with the results of each query, in query order
+    """
+    try:
+        rg = get_rg()
+        
+        # Validate inputs
+        if not queries:
+            return json.dumps({"error": "Provide at least one query"})
+        
+        if len(queries) > MAX_BATCH_QUERIES:
+            return json.dumps({"error": f"Too many queries. Use at most {MAX_BATCH_QUERIES} per batch"})
+        
+        if search_scope not in ["all", "content_only", "frontmatter_only"]:
+            return json.dumps({"error": "Invalid search_scope. Use: all, content_only, or frontmatter_only"})
+        
+        if sort not in rg.SEARCH_SORT_MODES:
+            return json.dumps({"error": f"Invalid sort. Use: {', '.join(rg.SEARCH_SORT_MODES)}"})
+        
+        if max_results < 1 or max_results > 100:
+            max_results = min(max(max_results, 1), 100)
+        
+        cache_key = (
+            "rg_search_notes_batch", tuple(queries), search_scope, case_sensitive,
+            _normalize_folder(folder), max_results, smart_context, sort
+        )
+        cached = _cache_lookup(rg, cache_key)
+        if cached is not None:
+            return cached
+        generation = rg.generation
+        
+        # One ripgrep pass finds the matches of every query
+        batch_results = await rg.search_batch_async(
+            queries, search_scope, case_sensitive, folder, max_results, smart_context, sort
+        )
+        
+        formatted_results = {
+            "search_scope": search_scope,
+            "sort": sort,
+            "total_queries": len(queries),
+            "results": []
+        }
+        for query, results in zip(queries, batch_results):
+            formatted = _format_matches(results, max_results)
+            formatted_results["results"].append({
+                "query": query,
+                "total_matches": len(formatted),
+                "results": formatted
+            })
+        
+        return _cache_store(rg, cache_key, _serialize(formatted_results), generation)
+    
+    except Exception as e:
+        return json.dumps({"error": str(e), "queries": queries})
+
+
+@mcp.tool()
+@_instrumented
+async def rg_search_links(
     link_type: str = "all",
     url_pattern: Optional[str] = None,
     title_pattern: Optional[str] = None,
     case_sensitive: bool = False,
     folder: Optional[str] = None,
-    max_results: int = 15
+    max_results: int = 15,
+    sort: str = "recency",
+    cursor: Optional[str] = None
 ) -> str:
     """Extract and filter all links (wiki, markdown, external).
     
@@ -126,120 +469,162 @@ def rg_search_links(
         case_sensitive: Whether search should be case sensitive
         folder: Optional folder to limit search scope
         max_results: Maximum number of results to return (minimum: 1, maximum: 100, capped automatically)
+        sort: Result order - "recency", "relevance", "path", or "none" (see rg_search_notes)
+        cursor: The next_cursor of an earlier result, to get its next page without searching again;
+            the other arguments are then ignored
     
     Returns:
-        JSON string with link search results
+        JSON string with link search results; next_cursor is set when more results remain
     """
     try:
+        rg = get_rg()
+        
+        if cursor:
+            return await _next_page(rg, "rg_search_links", cursor)
+        
         # Validate inputs
         valid_link_types = ["all", "wiki_links", "markdown_links", "external_urls"]
         if link_type not in valid_link_types:
             return json.dumps({"error": f"Invalid link_type. Use: {', '.join(valid_link_types)}"})
         
+        if sort not in rg.SORT_MODES:
+            return json.dumps({"error": f"Invalid sort. Use: {', '.join(rg.SORT_MODES)}"})
+        
         if max_results < 1 or max_results > 100:
             max_results = min(max(max_results, 1), 100)
         
-        # Use a higher per-file limit to get enough results, then limit globally
-        per_file_limit = min(max_results * 2, 50)  # Get extra results but cap at reasonable limit
-        
-        results = rg.find_links(
-            link_type=link_type,
-            url_pattern=url_pattern,
-            title_pattern=title_pattern,
-            case_sensitive=case_sensitive,
-            folder=folder,
-            max_results=per_file_limit
+        cache_key = (
+            "rg_search_links", link_type, url_pattern, title_pattern, case_sensitive,
+            _normalize_folder(folder), max_results, sort
         )
+        cached = await _cached_first_page(rg, cache_key)
+        if cached is not None:
+            return cached
+        generation = rg.generation
+        
+        # Links are ordered after the parallel search unless sort is "none"
+        async def search(limit: int) -> List[Dict[str, Any]]:
+            return await rg.find_links_async(
+                link_type=link_type,
+                url_pattern=url_pattern,
+                title_pattern=title_pattern,
+                case_sensitive=case_sensitive,
+                folder=folder,
+                max_results=limit,
+                sort=sort,
+                max_per_note=max_results
+            )
+        
+        results = await search(_first_page_limit(rg, max_results, sort))
+        more = _search_rest(rg, search, _LINK_POSITION) if sort == "none" else None
+        
+        async def render(page: List[Dict[str, Any]], next_cursor: Optional[str]) -> Dict[str, Any]:
+            return {
+                "link_type": link_type,
+                "sort": sort,
+                "filters": {
+                    "url_pattern": url_pattern,
+                    "title_pattern": title_pattern
+                },
+                "total_matches": len(page),
+                "results": page,
+                "next_cursor": next_cursor
+            }
         
-        # Limit results to max_results (since ripgrep --max-count is per-file)
-        limited_results = results[:max_results] if results else []
-        
-        formatted_result = {
-            "link_type": link_type,
-            "filters": {
-                "url_pattern": url_pattern,
-                "title_pattern": title_pattern
-            },
-            "total_matches": len(limited_results),
-            "results": limited_results
-        }
-        
-        return json.dumps(formatted_result, indent=2)
-        
+        return await _first_page(rg, "rg_search_links", results, max_results, render, cache_key, generation, more)
+    
     except Exception as e:
         return json.dumps({"error": str(e)})
 
 
 @mcp.tool()
-def rg_search_backlinks(
+@_instrumented
+async def rg_search_backlinks(
     target_note: str,
     case_sensitive: bool = False,
     folder: Optional[str] = None,
     max_results: int = 15,
-    smart_context: bool = True
+    smart_context: bool = True,
+    cursor: Optional[str] = None
 ) -> str:
     """Find all notes linking to a specific note.
     
     Args:
-        target_note: Note to find backlinks for (relative to vault root)
-        case_sensitive: Whether search should be case sensitive
+        target_note: Note to find backlinks for (path relative to vault root, a note name or an alias)
+        case_sensitive: Only count links naming the note or one of its aliases with the exact case
         folder: Optional folder to limit search scope
         max_results: Maximum number of results to return (minimum: 1, maximum: 100, capped automatically)
         smart_context: Whether to include smart context (frontmatter property names, content headings)
+        cursor: The next_cursor of an earlier result, to get its next page without searching again;
+            the other arguments are then ignored
     
     Returns:
-        JSON string with backlink results
+        JSON string with backlink results; next_cursor is set when more backlinks remain
     """
     try:
+        rg = get_rg()
+        
+        if cursor:
+            return await _next_page(rg, "rg_search_backlinks", cursor)
+        
         if max_results < 1 or max_results > 100:
             max_results = min(max(max_results, 1), 100)
         
-        # Create patterns for both wiki links and markdown links
-        note_name = target_note.replace('.md', '')
-        wiki_pattern = rf'\[\[.*{re.escape(note_name)}.*\]\]'
-        markdown_pattern = rf'\[.*\]\(.*{re.escape(target_note)}.*\)'
-        combined_pattern = f'({wiki_pattern})|({markdown_pattern})'
-        
-        results = rg.search_content(
-            query=combined_pattern,
+        cache_key = (
+            "rg_search_backlinks", target_note, case_sensitive,
+            _normalize_folder(folder), max_results, smart_context
+        )
+        cached = await _cached_first_page(rg, cache_key)
+        if cached is not None:
+            return cached
+        generation = rg.generation
+        
+        # Backlinks are a lookup in the in-memory link graph, not a vault scan
+        results = await rg.run_rg_in_thread(
+            rg.find_backlinks,
+            target_note=target_note,
             case_sensitive=case_sensitive,
             folder=folder,
-            max_results=max_results * 2,  # Get more results to filter out self-references
-            smart_context=smart_context
+            max_results=max(max_results, rg.cursors.max_results) + 1,
+            smart_context=False
         )
         
-        formatted_result = {
-            "target_note": target_note,
-            "total_backlinks": 0,
-            "backlinks": []
-        }
-        
-        backlinks_count = 0
-        for result in results:
-            if result['file'] != target_note and backlinks_count < max_results:  # Don't include self-references
+        async def render(page: List[Match], next_cursor: Optional[str]) -> Dict[str, Any]:
+            if smart_context:
+                page = await rg.add_smart_context_async(page)
+            
+            formatted_result = {
+                "target_note": target_note,
+                "total_backlinks": 0,
+                "backlinks": [],
+                "next_cursor": next_cursor
+            }
+            
+            for result in page:
                 backlink_result = {
-                    "file": result['file'],
-                    "line_number": result['line_number'],
-                    "context": (result.get('text', '') or '').strip()
+                    "file": result.file,
+                    "line_number": result.line_number,
+                    "context": result.text.strip()
                 }
                 
                 # Add smart context if available
-                if 'smart_context' in result:
-                    backlink_result['smart_context'] = result['smart_context']
+                if result.smart_context is not None:
+                    backlink_result['smart_context'] = result.smart_context
                 
                 formatted_result["backlinks"].append(backlink_result)
-                backlinks_count += 1
-        
-        formatted_result["total_backlinks"] = len(formatted_result["backlinks"])
-        
-        return json.dumps(formatted_result, indent=2)
+            
+            formatted_result["total_backlinks"] = len(formatted_result["backlinks"])
+            return formatted_result
         
+        return await _first_page(rg, "rg_search_backlinks", results, max_results, render, cache_key, generation)
+    
     except Exception as e:
         return json.dumps({"error": str(e)})
 
 
 @mcp.tool()
-def rg_search_recent_notes(
+@_instrumented
+async def rg_search_recent_notes(
     start_date: Optional[str] = None,
     end_date: Optional[str] = None,
     folder: Optional[str] = None,
@@ -257,6 +642,8 @@ def rg_search_recent_notes(
         JSON string with recent notes results
     """
     try:
+        rg = get_rg()
+        
         if max_results < 1 or max_results > 100:
             max_results = min(max(max_results, 1), 100)
         
@@ -279,15 +666,21 @@ def rg_search_recent_notes(
                     "error": f"Invalid end_date format: '{end_date}'. Expected YYYY-MM-DD format (e.g., '2024-01-31')"
                 })
         
-        files = rg.get_files_by_date_range(
+        cache_key = ("rg_search_recent_notes", start_date, end_date, _normalize_folder(folder), max_results)
+        cached = _cache_lookup(rg, cache_key)
+        if cached is not None:
+            return cached
+        generation = rg.generation
+        
+        # Served from the mtime index, which stops after the newest max_results notes
+        limited_files = await rg.run_in_thread(
+            rg.get_files_by_date_range,
             start_date=start_date,
             end_date=end_date,
-            folder=folder
+            folder=folder,
+            limit=max_results
         )
         
-        # Limit results
-        limited_files = files[:max_results]
-        
         result = {
             "date_range": {
                 "start_date": start_date,
@@ -297,14 +690,15 @@ def rg_search_recent_notes(
             "files": limited_files
         }
         
-        return json.dumps(result, indent=2)
-        
+        return _cache_store(rg, cache_key, _serialize(result), generation)
+    
     except Exception as e:
         return json.dumps({"error": str(e)})
 
 
 @mcp.tool()
-def rg_search_orphaned_notes(
+@_instrumented
+async def rg_search_orphaned_notes(
     case_sensitive: bool = False,
     folder: Optional[str] = None,
     max_results: int = 15
@@ -312,7 +706,7 @@ def rg_search_orphaned_notes(
     """Identify notes with no incoming or outgoing links.
     
     Args:
-        case_sensitive: Whether search should be case sensitive
+        case_sensitive: Accepted for compatibility (link resolution is case-insensitive, like Obsidian)
         folder: Optional folder to limit search scope
         max_results: Maximum number of results to return (minimum: 1, maximum: 100, capped automatically)
     
@@ -320,45 +714,197 @@ def rg_search_orphaned_notes(
         JSON string with orphaned notes results
     """
     try:
+        rg = get_rg()
+        
         if max_results < 1 or max_results > 100:
             max_results = min(max(max_results, 1), 100)
         
-        # Get all markdown files
-        files = rg.get_files_by_date_range(folder=folder)
-        orphaned = []
+        cache_key = ("rg_search_orphaned_notes", _normalize_folder(folder), max_results)
+        cached = _cache_lookup(rg, cache_key)
+        if cached is not None:
+            return cached
+        generation = rg.generation
         
-        for file_info in files:
-            file_path = file_info['file']
-            note_name = file_path.replace('.md', '')
-            
-            # Check if file has outgoing links
-            outgoing_links = rg.find_links(folder=folder, max_results=1000)
-            has_outgoing = any(link['file'] == file_path for link in outgoing_links)
-            
-            # Check if file has incoming links (backlinks)
-            wiki_pattern = rf'\[\[.*{re.escape(note_name)}.*\]\]'
-            markdown_pattern = rf'\[.*\]\(.*{re.escape(file_path)}.*\)'
-            combined_pattern = f'({wiki_pattern})|({markdown_pattern})'
-            
-            backlinks = rg.search_content(query=combined_pattern, max_results=1)
-            has_incoming = len(backlinks) > 0 and backlinks[0]['file'] != file_path
-            
-            if not has_outgoing and not has_incoming:
-                orphaned.append({
-                    "file": file_path,
-                    "modified_date": file_info['modified_date']
-                })
-                
-                if len(orphaned) >= max_results:
-                    break
+        # One vault pass finds every link; orphans are the notes no link touches
+        orphaned = (await rg.run_rg_in_thread(rg.find_orphaned_notes, folder=folder))[:max_results]
         
         result = {
             "total_orphaned": len(orphaned),
             "orphaned_notes": orphaned
         }
         
-        return json.dumps(result, indent=2)
+        return _cache_store(rg, cache_key, _serialize(result), generation)
+    
+    except Exception as e:
+        return json.dumps({"error": str(e)})
+
+
+@mcp.tool()
+@_instrumented
+async def rg_search_tags(
+    tags: Optional[List[str]] = None,
+    any_tags: Optional[List[str]] = None,
+    exclude_tags: Optional[List[str]] = None,
+    folder: Optional[str] = None,
+    max_results: int = 15
+) -> str:
+    """Find notes by tag, combining tags with AND, OR and NOT.
+    
+    Tags come from inline #tags, outside code blocks, and from the frontmatter
+    'tags' property. A tag also matches the tags nested below it: "project"
+    finds #project/alpha. Call without any tags to list the vault's most used
+    tags instead.
+    
+    Args:
+        tags: Notes must have every one of these tags (AND), with or without '#'
+        any_tags: Notes must have at least one of these tags (OR)
+        exclude_tags: Notes must have none of these tags (NOT)
+        folder: Optional folder to limit search scope
+        max_results: Maximum number of results to return (minimum: 1, maximum: 100, capped automatically)
+    
+    Returns:
+        JSON string with matching notes, newest first, and their tags
+    """
+    try:
+        rg = get_rg()
+        
+        if max_results < 1 or max_results > 100:
+            max_results = min(max(max_results, 1), 100)
+        
+        cache_key = (
+            "rg_search_tags", tuple(tags or ()), tuple(any_tags or ()), tuple(exclude_tags or ()),
+            _normalize_folder(folder), max_results
+        )
+        cached = _cache_lookup(rg, cache_key)
+        if cached is not None:
+            return cached
+        generation = rg.generation
+        
+        # Lookups in the tag index, so they do not queue behind ripgrep searches
+        if not tags and not any_tags and not exclude_tags:
+            index = await rg.run_in_thread(rg.get_tag_index)
+            counts = index.counts()
+            result = {
+                "total_tags": len(counts),
+                "tags": [{"tag": tag, "notes": notes} for tag, notes in counts[:max_results]]
+            }
+            return _cache_store(rg, cache_key, _serialize(result), generation)
+        
+        # Set operations on the tag index, not a vault scan
+        notes = await rg.run_in_thread(
+            rg.find_notes_by_tags,
+            tags=tags,
+            any_tags=any_tags,
+            exclude_tags=exclude_tags,
+            folder=folder,
+            max_results=max_results
+        )
+        
+        result = {
+            "query": {
+                "tags": tags,
+                "any_tags": any_tags,
+                "exclude_tags": exclude_tags
+            },
+            "total_notes": len(notes),
+            "notes": notes
+        }
+        
+        return _cache_store(rg, cache_key, _serialize(result), generation)
+    
+    except Exception as e:
+        return json.dumps({"error": str(e)})
+
+
+@mcp.tool()
+@_instrumented
+async def rg_query_properties(
+    where: Optional[List[Dict[str, Any]]] = None,
+    folder: Optional[str] = None,
+    max_results: int = 15
+) -> str:
+    """Find notes by frontmatter property values, like "status is active and priority above 2".
+    
+    Each condition is an object with "property", "op" and "value". Conditions
+    are combined with AND. Operators:
+    - "eq": equals the value; for list properties, one item equals it (default)
+    - "contains": a list item equals the value, or the text contains it
+    - "gt", "gte", "lt", "lte": numbers compare as numbers, other values
+      (such as YYYY-MM-DD dates) as text
+    - "exists" / "missing": the note has / does not have the property
+    Text compares case-insensitively. Nested properties use dotted paths
+    ("project.owner"). Call without conditions to list the properties in use.
+    
+    Args:
+        where: Conditions, e.g. [{"property": "status", "op": "eq", "value": "active"}]
+        folder: Optional folder to limit search scope
+        max_results: Maximum number of results to return (minimum: 1, maximum: 100, capped automatically)
+    
+    Returns:
+        JSON string with matching notes, newest first, and the values of the queried properties
+    """
+    try:
+        rg = get_rg()
+        
+        if max_results < 1 or max_results > 100:
+            max_results = min(max(max_results, 1), 100)
+        
+        cache_key = (
+            "rg_query_properties", json.dumps(where or [], sort_keys=True, default=str),
+            _normalize_folder(folder), max_results
+        )
+        cached = _cache_lookup(rg, cache_key)
+        if cached is not None:
+            return cached
+        generation = rg.generation
+        
+        if not where:
+            index = await rg.run_in_thread(rg.get_property_index)
+            counts = index.counts()
+            result = {
+                "total_properties": len(counts),
+                "properties": [{"property": key, "notes": notes} for key, notes in counts[:max_results]]
+            }
+            return _cache_store(rg, cache_key, _serialize(result), generation)
+        
+        # Lookups in the parsed frontmatter index; ripgrep is never run
+        notes = await rg.run_in_thread(
+            rg.find_notes_by_properties,
+            conditions=where,
+            folder=folder,
+            max_results=max_results
+        )
+        
+        result = {
+            "where": where,
+            "total_notes": len(notes),
+            "notes": notes
+        }
         
+        return _cache_store(rg, cache_key, _serialize(result), generation)
+    
+    except Exception as e:
+        return json.dumps({"error": str(e)})
+
+
+@mcp.tool()
+async def rg_server_stats() -> str:
+    """Report server health: tool latencies, slow queries, and cache and index counters.
+    
+    Returns:
+        JSON string with latency histograms per tool and per pipeline stage
+        (ripgrep, parse, frontmatter, order, smart_context, links, index,
+        serialize), the slowest recent calls with their arguments, and
+        counters for the result cache, note cache, mtime index, link graph,
+        tag index and property index
+    """
+    try:
+        rg = get_rg()
+        
+        result = rg.stats.snapshot()
+        result.update(rg.cache_stats())
+        return json.dumps(result, indent=2)
+    
     except Exception as e:
         return json.dumps({"error": str(e)})
 
@@ -366,7 +912,17 @@ def rg_search_orphaned_notes(
 def main():
     """Entry point for the FastMCP server."""
     print("Starting rgrep-mcp FastMCP server...", file=sys.stderr)
+    try:
+        get_config().validate()
+    except Exception as e:
+        print(f"Error: Could not initialize Obsidian search. {e}", file=sys.stderr)
+        print(f"Check that OBSIDIAN_VAULT_PATH is set to a valid vault directory.", file=sys.stderr)
+        sys.exit(1)
+    threading.Thread(target=_warm_up, name="rgrep-mcp-warm-up", daemon=True).start()
     mcp.run()
+    if _rg is not None:
+        # Lets the next session start from the state the vault ends this one in
+        _save_snapshot(_rg)
 
 
 if __name__ == "__main__":
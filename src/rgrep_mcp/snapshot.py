@@ -0,0 +1,152 @@
+"""On-disk snapshot of vault indexes for fast restarts."""
+
+import gc
+import hashlib
+import marshal
+import mmap
+import os
+import tempfile
+import time
+import zlib
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Any, Dict, Iterator, Optional, Tuple
+
+# Bumped whenever the layout of a section changes; older snapshots are ignored
+SCHEMA_VERSION = 1
+
+MAGIC = b'RGMCPSNP'
+_HEADER_LENGTH_BYTES = 4
+
+
+@contextmanager
+def paused_gc() -> Iterator[None]:
+    """Pause the cyclic garbage collector while a large index is created.
+    
+    Restoring an index creates millions of small containers, and the
+    collector would otherwise rescan all of them every few thousand. The
+    collector is enabled again afterwards only if it was enabled before.
+    """
+    enabled = gc.isenabled()
+    gc.disable()
+    try:
+        yield
+    finally:
+        if enabled:
+            gc.enable()
+
+
+def snapshot_path(snapshot_dir: str, vault_path: str) -> Path:
+    """Return the snapshot file of a vault: one file per resolved vault path."""
+    key = hashlib.sha256(os.path.realpath(vault_path).encode('utf-8', 'surrogateescape')).hexdigest()[:16]
+    return Path(snapshot_dir) / f'{key}.snapshot'
+
+
+def write_snapshot(path: Path, vault_path: str, sections: Dict[str, bytes]) -> int:
+    """Write marshalled sections to ``path`` atomically and return the file size.
+    
+    The file is written under a temporary name in the same directory, synced
+    and then renamed over the old snapshot, so a crash leaves either the old
+    snapshot or the new one, never a mix.
+    """
+    offsets: Dict[str, Tuple[int, int, int]] = {}
+    position = 0
+    for name, data in sections.items():
+        offsets[name] = (position, len(data), zlib.crc32(data))
+        position += len(data)
+    header = marshal.dumps({
+        'schema': SCHEMA_VERSION,
+        'marshal': marshal.version,
+        'vault': os.path.realpath(vault_path),
+        'created': time.time(),
+        'sections': offsets,
+    })
+    
+    path.parent.mkdir(parents=True, exist_ok=True)
+    fd, temp_path = tempfile.mkstemp(prefix=path.name + '.', suffix='.tmp', dir=str(path.parent))
+    try:
+        with os.fdopen(fd, 'wb') as f:
+            f.write(MAGIC)
+            f.write(len(header).to_bytes(_HEADER_LENGTH_BYTES, 'little'))
+            f.write(header)
+            for data in sections.values():
+                f.write(data)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(temp_path, path)
+    except BaseException:
+        try:
+            os.unlink(temp_path)
+        except OSError:
+            pass
+        raise
+    return len(MAGIC) + _HEADER_LENGTH_BYTES + len(header) + position
+
+
+class Snapshot:
+    """A snapshot file mapped into memory, decoded one section at a time.
+    
+    Only the header is read when the snapshot is opened; a section is
+    unmarshalled, and its checksum verified, when it is first asked for.
+    """
+    
+    def __init__(self, mapped: mmap.mmap, header: Dict[str, Any], data_start: int):
+        """Wrap a mapped file whose header has been validated."""
+        self._mapped = mapped
+        self._sections: Dict[str, Tuple[int, int, int]] = header['sections']
+        self._data_start = data_start
+        self.created = header['created']
+        self.size = len(mapped)
+    
+    @classmethod
+    def open(cls, path: Path, vault_path: str) -> Optional['Snapshot']:
+        """Open the snapshot at ``path``, or return None if it is missing, corrupt or from another schema.
+        
+        Snapshots written by a Python with another marshal format or for
+        another vault are ignored too.
+        """
+        try:
+            with open(path, 'rb') as f:
+                mapped = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        except (OSError, ValueError):
+            return None
+        try:
+            header_start = len(MAGIC) + _HEADER_LENGTH_BYTES
+            if mapped[:len(MAGIC)] != MAGIC:
+                raise ValueError('not a snapshot')
+            header_length = int.from_bytes(mapped[len(MAGIC):header_start], 'little')
+            header = marshal.loads(mapped[header_start:header_start + header_length])
+            if (
+                not isinstance(header, dict)
+                or header.get('schema') != SCHEMA_VERSION
+                or header.get('marshal') != marshal.version
+                or header.get('vault') != os.path.realpath(vault_path)
+            ):
+                raise ValueError('snapshot of another schema or vault')
+            return cls(mapped, header, header_start + header_length)
+        except (ValueError, EOFError, TypeError, KeyError):
+            mapped.close()
+            return None
+    
+    def section(self, name: str) -> Optional[Any]:
+        """Return the decoded section ``name``, or None if it is missing or corrupt."""
+        if name not in self._sections or self._mapped.closed:
+            return None
+        offset, length, checksum = self._sections[name]
+        start = self._data_start + offset
+        # Decoded straight from the mapped pages, without copying the section
+        with memoryview(self._mapped) as view, view[start:start + length] as data:
+            if len(data) != length or zlib.crc32(data) != checksum:
+                return None
+            try:
+                with paused_gc():
+                    return marshal.loads(data)
+            except (ValueError, EOFError, TypeError):
+                return None
+    
+    def close(self) -> None:
+        """Unmap the file."""
+        self._mapped.close()
+    
+    def __contains__(self, name: str) -> bool:
+        return name in self._sections
\ No newline at end of file
@@ -0,0 +1,217 @@
+"""Per-stage latency instrumentation for tool calls."""
+
+import threading
+import time
+from collections import deque
+from contextvars import ContextVar
+from typing import Any, Deque, Dict, List, Optional
+
+# Upper bounds of the latency histogram buckets, in milliseconds
+BUCKET_BOUNDS_MS = (1, 2, 5, 10, 25, 50, 100, 250, 500, 1000, 2500, 5000, 10000)
+
+_current_timer: "ContextVar[Optional[StageTimer]]" = ContextVar('rgrep_mcp_stage_timer', default=None)
+
+
+class StageTimer:
+    """Accumulates the time one tool call spends in each pipeline stage.
+    
+    Stages nest: time spent in an inner stage is not counted again in the
+    stage around it, so the stage times of a call add up to at most its
+    total latency.
+    """
+    
+    def __init__(self):
+        """Initialize an empty timer."""
+        self.stages: Dict[str, float] = {}
+        self._open: List[List[Any]] = []  # [name, start, seconds spent in nested stages]
+    
+    def start(self, name: str) -> None:
+        """Open a stage."""
+        self._open.append([name, time.perf_counter(), 0.0])
+    
+    def stop(self) -> None:
+        """Close the innermost open stage."""
+        name, start, nested = self._open.pop()
+        elapsed = time.perf_counter() - start
+        self.stages[name] = self.stages.get(name, 0.0) + elapsed - nested
+        if self._open:
+            self._open[-1][2] += elapsed
+    
+    def add(self, name: str, seconds: float) -> None:
+        """Add time measured outside ``start``/``stop``, e.g. summed over a stream."""
+        self.stages[name] = self.stages.get(name, 0.0) + seconds
+        if self._open:
+            self._open[-1][2] += seconds
+
+
+class _Stage:
+    """Context manager timing a block as one stage of the current tool call."""
+    
+    __slots__ = ('_timer', '_name')
+    
+    def __init__(self, name: str):
+        self._name = name
+        self._timer = _current_timer.get()
+    
+    def __enter__(self) -> None:
+        if self._timer is not None:
+            self._timer.start(self._name)
+    
+    def __exit__(self, *exc: Any) -> None:
+        if self._timer is not None:
+            self._timer.stop()
+
+
+def stage(name: str) -> _Stage:
+    """Time a block as stage ``name`` of the current tool call, if one is being measured."""
+    return _Stage(name)
+
+
+def record_stage(name: str, seconds: float) -> None:
+    """Add ``seconds`` to stage ``name`` of the current tool call, if one is being measured."""
+    timer = _current_timer.get()
+    if timer is not None:
+        timer.add(name, seconds)
+
+
+class measure:
+    """Measure the stages of a tool call made inside the ``with`` block.
+    
+    The timer is stored in a context variable, so it follows the call into
+    coroutines and into worker threads started with a copied context.
+    """
+    
+    def __init__(self):
+        """Create the timer for one call."""
+        self.timer = StageTimer()
+        self.seconds = 0.0
+        self._token = None
+        self._start = 0.0
+    
+    def __enter__(self) -> 'measure':
+        self._token = _current_timer.set(self.timer)
+        self._start = time.perf_counter()
+        return self
+    
+    def __exit__(self, *exc: Any) -> None:
+        self.seconds = time.perf_counter() - self._start
+        _current_timer.reset(self._token)
+
+
+class LatencyHistogram:
+    """Latency distribution over fixed buckets, with percentiles of recent samples."""
+    
+    def __init__(self, recent: int = 1000):
+        """Initialize an empty histogram keeping the last ``recent`` samples."""
+        self.counts = [0] * (len(BUCKET_BOUNDS_MS) + 1)
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+        self._recent: Deque[float] = deque(maxlen=recent)
+    
+    def add(self, seconds: float) -> None:
+        """Record one sample."""
+        ms = seconds * 1000
+        for i, bound in enumerate(BUCKET_BOUNDS_MS):
+            if ms <= bound:
+                self.counts[i] += 1
+                break
+        else:
+            self.counts[-1] += 1
+        self.count += 1
+        self.total += ms
+        self.max = max(self.max, ms)
+        self._recent.append(ms)
+    
+    def summary(self) -> Dict[str, Any]:
+        """Return count, mean, max, recent percentiles and bucket counts in milliseconds."""
+        recent = sorted(self._recent)
+        
+        def percentile(p: float) -> float:
+            if not recent:
+                return 0.0
+            return round(recent[min(len(recent) - 1, int(p * len(recent)))], 3)
+        
+        buckets = {f"<={bound}ms": n for bound, n in zip(BUCKET_BOUNDS_MS, self.counts)}
+        buckets[f">{BUCKET_BOUNDS_MS[-1]}ms"] = self.counts[-1]
+        return {
+            'count': self.count,
+            'mean_ms': round(self.total / self.count, 3) if self.count else 0.0,
+            'max_ms': round(self.max, 3),
+            'p50_ms': percentile(0.50),
+            'p95_ms': percentile(0.95),
+            'p99_ms': percentile(0.99),
+            'buckets': {label: n for label, n in buckets.items() if n},
+        }
+
+
+class LatencyStats:
+    """Latency histograms per tool and per stage, and a bounded slow-query log.
+    
+    Calls slower than ``slow_query_ms`` are logged with their arguments and
+    stage breakdown; the log keeps the latest ``slow_query_entries`` calls.
+    """
+    
+    MAX_ARGUMENT_CHARS = 200
+    
+    def __init__(self, slow_query_ms: float = 1000.0, slow_query_entries: int = 50):
+        """Initialize empty statistics."""
+        self.slow_query_ms = slow_query_ms
+        self.started_at = time.time()
+        self._tools: Dict[str, LatencyHistogram] = {}
+        self._stages: Dict[str, LatencyHistogram] = {}
+        self._tool_stages: Dict[str, Dict[str, float]] = {}
+        self._slow: Deque[Dict[str, Any]] = deque(maxlen=slow_query_entries)
+        self._lock = threading.Lock()
+    
+    def record(self, tool: str, seconds: float, stages: Dict[str, float], arguments: Dict[str, Any]) -> None:
+        """Record one tool call with its total latency and stage times."""
+        stages = dict(stages)
+        other = seconds - sum(stages.values())
+        if other > 0:
+            stages['other'] = other
+        
+        with self._lock:
+            self._tools.setdefault(tool, LatencyHistogram()).add(seconds)
+            tool_stages = self._tool_stages.setdefault(tool, {})
+            for name, stage_seconds in stages.items():
+                self._stages.setdefault(name, LatencyHistogram()).add(stage_seconds)
+                tool_stages[name] = tool_stages.get(name, 0.0) + stage_seconds
+            
+            if seconds * 1000 >= self.slow_query_ms:
+                self._slow.append({
+                    'tool': tool,
+                    'at': time.strftime('%Y-%m-%dT%H:%M:%S', time.localtime()),
+                    'latency_ms': round(seconds * 1000, 3),
+                    'stages_ms': {name: round(s * 1000, 3) for name, s in stages.items()},
+                    'arguments': {name: self._clip(value) for name, value in arguments.items()},
+                })
+    
+    def snapshot(self) -> Dict[str, Any]:
+        """Return every histogram and the slow-query log, newest slow query first."""
+        with self._lock:
+            tools = {}
+            for name, histogram in sorted(self._tools.items()):
+                summary = histogram.summary()
+                # Mean time per call in each stage shows where a tool's latency goes
+                summary['stages_mean_ms'] = {
+                    stage_name: round(total * 1000 / histogram.count, 3)
+                    for stage_name, total in sorted(self._tool_stages[name].items(), key=lambda item: -item[1])
+                }
+                tools[name] = summary
+            return {
+                'uptime_seconds': round(time.time() - self.started_at, 1),
+                'tools': tools,
+                'stages': {name: h.summary() for name, h in sorted(self._stages.items())},
+                'slow_query_ms': self.slow_query_ms,
+                'slow_queries': list(reversed(self._slow)),
+            }
+    
+    def _clip(self, value: Any) -> Any:
+        """Keep logged arguments small and JSON-serializable."""
+        if value is None or isinstance(value, (bool, int, float)):
+            return value
+        text = value if isinstance(value, str) else repr(value)
+        if len(text) > self.MAX_ARGUMENT_CHARS:
+            return text[:self.MAX_ARGUMENT_CHARS] + '...'
+        return text
\ No newline at end of file
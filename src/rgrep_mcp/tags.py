@@ -0,0 +1,212 @@
+"""Inverted index of note tags for Obsidian vaults."""
+
+import re
+import time
+from typing import Dict, Iterable, List, NamedTuple, Optional, Set, Tuple
+
+from .frontmatter import parse_list_property
+
+# An inline tag starts a word, so headings ('# Title'), URL fragments and
+# [[Note#Heading]] links are not tags. Nested tags are written '#area/topic'
+INLINE_TAG_RE = re.compile(r'(?<!\S)#([\w/-]+)')
+
+# Frontmatter key listing a note's tags
+TAG_KEY_RE = re.compile(r'(?:tags|tag)\s*:(.*)$')
+
+# Frontmatter tag values may also be separated by commas or spaces
+_TAG_SEPARATOR_RE = re.compile(r'[\s,]+')
+
+# Lines opening or closing a fenced code block; tags inside code are not tags
+CODE_FENCES = ('```', '~~~')
+
+
+class NoteTags(NamedTuple):
+    """What ``scan_tags`` found in one note."""
+    inline: Set[str]
+    frontmatter_end: Optional[int]  # Line of the closing '---', None without frontmatter
+    has_tag_key: bool  # Whether the frontmatter has a 'tags' or 'tag' key
+
+
+def normalize_tag(tag: str) -> Optional[str]:
+    """Return a tag as the index stores it: lowercase, without '#' or outer slashes.
+    
+    Returns None for text Obsidian does not treat as a tag, such as '#2024'.
+    """
+    tag = tag.strip().lstrip('#').strip('/').lower()
+    if not tag or tag.replace('/', '').isdigit():
+        return None
+    return tag
+
+
+def frontmatter_tags(lines: Iterable[str]) -> Set[str]:
+    """Return the tags listed in a note's frontmatter, given the note's first lines."""
+    tags = set()
+    for value in parse_list_property(lines, TAG_KEY_RE):
+        for word in _TAG_SEPARATOR_RE.split(value):
+            tag = normalize_tag(word)
+            if tag:
+                tags.add(tag)
+    return tags
+
+
+def scan_tags(lines: Iterable[Tuple[int, str]]) -> NoteTags:
+    """Find the inline tags of a note outside its frontmatter and code blocks.
+    
+    ``lines`` are (line number, text) pairs in order. They may be every line of
+    the note, or only the lines that matter: frontmatter and code fences,
+    frontmatter tag keys and lines with a word starting with '#'.
+    """
+    inline: Set[str] = set()
+    pending: Set[str] = set()  # Tags inside the frontmatter, kept only if it never closes
+    frontmatter_end = None
+    in_frontmatter = False
+    has_tag_key = False
+    fence = None
+    for line_number, text in lines:
+        stripped = text.strip()
+        if in_frontmatter:
+            if stripped == '---':
+                in_frontmatter = False
+                frontmatter_end = line_number
+            elif TAG_KEY_RE.match(text):
+                has_tag_key = True
+            elif '#' in text:
+                pending.update(_inline_tags(text))
+            continue
+        if line_number == 1 and stripped.startswith('---'):
+            in_frontmatter = True
+            continue
+        if fence is not None:
+            if stripped.startswith(fence):
+                fence = None
+            continue
+        if stripped.startswith(CODE_FENCES):
+            fence = stripped[:3]
+            continue
+        if '#' in text:
+            inline.update(_inline_tags(text))
+    
+    if in_frontmatter:
+        # Without a closing '---' the first lines are ordinary text
+        return NoteTags(inline | pending, None, False)
+    return NoteTags(inline, frontmatter_end, has_tag_key)
+
+
+def _inline_tags(text: str) -> Iterable[str]:
+    """Yield the normalized inline tags on one line."""
+    for found in INLINE_TAG_RE.findall(text):
+        tag = normalize_tag(found)
+        if tag:
+            yield tag
+
+
+def _with_parents(tags: Iterable[str]) -> Set[str]:
+    """Return tags together with every tag they are nested in."""
+    expanded = set()
+    for tag in tags:
+        expanded.add(tag)
+        slash = tag.find('/')
+        while slash > 0:
+            expanded.add(tag[:slash])
+            slash = tag.find('/', slash + 1)
+    return expanded
+
+
+class TagIndex:
+    """Inverted index from tags to the notes carrying them.
+    
+    A note tagged ``#project/alpha`` is indexed under ``project/alpha`` and
+    under ``project``, so a query for a tag also finds the tags nested below
+    it. Queries are intersections, unions and differences of the indexed
+    note sets, smallest set first; they never read the vault.
+    """
+    
+    def __init__(self):
+        """Initialize an empty index."""
+        self._notes_by_tag: Dict[str, Set[str]] = {}  # Every tag and the tags it is nested in
+        self._tags_by_note: Dict[str, Set[str]] = {}  # Tags as written, without parents
+        self.built_at = time.monotonic()
+    
+    def set_tags(self, note: str, tags: Iterable[str]) -> None:
+        """Replace the tags of ``note``."""
+        self.remove(note)
+        tags = set(tags)
+        if not tags:
+            return
+        self._tags_by_note[note] = tags
+        for tag in _with_parents(tags):
+            self._notes_by_tag.setdefault(tag, set()).add(note)
+    
+    def remove(self, note: str) -> None:
+        """Drop every tag of ``note``."""
+        tags = self._tags_by_note.pop(note, None)
+        if not tags:
+            return
+        for tag in _with_parents(tags):
+            notes = self._notes_by_tag.get(tag)
+            if notes is not None:
+                notes.discard(note)
+                if not notes:
+                    del self._notes_by_tag[tag]
+    
+    def tags_of(self, note: str) -> Set[str]:
+        """Return the tags of ``note``."""
+        return self._tags_by_note.get(note, set())
+    
+    def query(
+        self,
+        all_of: Iterable[str] = (),
+        any_of: Iterable[str] = (),
+        none_of: Iterable[str] = (),
+        universe: Optional[Iterable[str]] = None
+    ) -> Set[str]:
+        """Return notes with every tag in ``all_of``, one of ``any_of`` and none of ``none_of``.
+        
+        Each tag also matches the tags nested below it. Without ``all_of`` or
+        ``any_of`` the exclusions apply to ``universe``, or to every tagged note.
+        """
+        empty: Set[str] = set()
+        required = [self._notes_by_tag.get(_query_key(tag), empty) for tag in all_of]
+        any_of = [_query_key(tag) for tag in any_of]
+        if any_of:
+            required.append(set().union(*(self._notes_by_tag.get(tag, empty) for tag in any_of)))
+        
+        if required:
+            required.sort(key=len)
+            notes = set(required[0])
+            for other in required[1:]:
+                if not notes:
+                    break
+                notes &= other
+        else:
+            notes = set(self._tags_by_note if universe is None else universe)
+        
+        for tag in none_of:
+            notes -= self._notes_by_tag.get(_query_key(tag), empty)
+        return notes
+    
+    def counts(self, prefix: str = '') -> List[Tuple[str, int]]:
+        """Return (tag, notes) for every tag and parent tag below ``prefix``, most used first."""
+        prefix = _query_key(prefix)
+        return sorted(
+            ((tag, len(notes)) for tag, notes in self._notes_by_tag.items()
+             if not prefix or tag == prefix or tag.startswith(prefix + '/')),
+            key=lambda item: (-item[1], item[0])
+        )
+    
+    @property
+    def tag_count(self) -> int:
+        """Number of distinct tags, parent tags included."""
+        return len(self._notes_by_tag)
+    
+    def age(self) -> float:
+        """Seconds since the index was built."""
+        return time.monotonic() - self.built_at
+    
+    def __len__(self) -> int:
+        return len(self._tags_by_note)
+
+
+def _query_key(tag: str) -> str:
+    """Normalize a tag from a query; unlike ``normalize_tag`` it never rejects one."""
+    return tag.strip().lstrip('#').strip('/').lower()
\ No newline at end of file
@@ -0,0 +1,152 @@
+"""Term statistics of note contents for BM25 ranking."""
+
+import bisect
+import math
+import re
+import time
+from array import array
+from collections import Counter
+from typing import Dict, Iterable, List, Tuple
+
+# Weight of a term occurrence in each field of a note. A note's frequency of a
+# term is the weighted sum over its fields, and its length the weighted number
+# of terms, so a query word in the title or a heading counts several times
+FIELD_BOOSTS = {'title': 4, 'headings': 2, 'frontmatter': 2, 'body': 1}
+
+# BM25 term frequency saturation and length normalization
+BM25_K1 = 1.2
+BM25_B = 0.75
+
+TERM_RE = re.compile(r'\w+')
+
+_FRONTMATTER_RE = re.compile(r'\A---[ \t]*\r?\n(.*?)^---[ \t]*\r?$', re.MULTILINE | re.DOTALL)
+_HEADING_RE = re.compile(r'^#{1,6}[ \t]+(.*)$', re.MULTILINE)
+
+# Regex syntax dropped before a query is split into terms: escapes such as \b
+# and \d with their arguments, character classes, counted repetitions and flags
+_QUERY_SYNTAX_RE = re.compile(
+    r'\\[pPxuUk]\{[^}]*\}|\\[a-zA-Z]|\[(?:\\.|[^\]\\])*\]|\{\d*(?:,\d*)?\}|\(\?[a-zA-Z-]*:?'
+)
+
+
+def note_terms(title: str, text: str) -> Tuple[Dict[str, int], int]:
+    """Return the field-weighted frequency of each term in a note, and the note's weighted length.
+    
+    ``title`` is the note's file name without extension; headings and
+    frontmatter are taken out of the body and weighted on their own.
+    """
+    fields = {'title': title}
+    frontmatter = _FRONTMATTER_RE.match(text)
+    if frontmatter:
+        fields['frontmatter'] = frontmatter.group(1)
+        text = text[frontmatter.end():]
+    fields['headings'] = '\n'.join(_HEADING_RE.findall(text))
+    fields['body'] = _HEADING_RE.sub('', text)
+    
+    # Repeating a field's words by its boost lets one Counter do the weighting
+    terms: List[str] = []
+    for field, field_text in fields.items():
+        terms.extend(TERM_RE.findall(field_text.lower()) * FIELD_BOOSTS[field])
+    return Counter(terms), len(terms)
+
+
+def query_terms(query: str) -> List[str]:
+    """Return the distinct lowercase words of a search query, without its regex syntax."""
+    return list(dict.fromkeys(TERM_RE.findall(_QUERY_SYNTAX_RE.sub(' ', query).lower())))
+
+
+class TermIndex:
+    """Document frequencies and note lengths for scoring notes with BM25.
+    
+    Each note keeps its term ids, sorted, and the weighted frequency of each
+    in parallel arrays, about 6 bytes per distinct term, so a note's score is
+    one bisection per query term and document frequencies can be corrected
+    when a note changes or is deleted.
+    """
+    
+    def __init__(self):
+        """Initialize an empty index."""
+        self._term_ids: Dict[str, int] = {}
+        self._doc_freqs = array('I')  # Term id -> notes containing it
+        self._notes: Dict[str, Tuple[array, array, int]] = {}  # Note -> (term ids, frequencies, length)
+        self.total_length = 0
+        self.built_at = time.monotonic()
+    
+    def set_note(self, note: str, frequencies: Dict[str, int], length: int) -> None:
+        """Replace the term frequencies and length of ``note``."""
+        self.remove(note)
+        term_ids = self._term_ids
+        for term in frequencies:
+            if term not in term_ids:
+                term_ids[term] = len(self._doc_freqs)
+                self._doc_freqs.append(0)
+        counts = frequencies.values()
+        if counts and max(counts) > 0xFFFF:
+            counts = [min(count, 0xFFFF) for count in counts]
+        pairs = sorted(zip(map(term_ids.__getitem__, frequencies), counts))
+        ids = array('I', [term_id for term_id, _ in pairs])
+        doc_freqs = self._doc_freqs
+        for term_id in ids:
+            doc_freqs[term_id] += 1
+        self._notes[note] = (ids, array('H', [count for _, count in pairs]), length)
+        self.total_length += length
+    
+    def remove(self, note: str) -> None:
+        """Drop ``note`` and its terms from the statistics."""
+        entry = self._notes.pop(note, None)
+        if entry is None:
+            return
+        ids, _, length = entry
+        for term_id in ids:
+            self._doc_freqs[term_id] -= 1
+        self.total_length -= length
+    
+    def doc_freq(self, term: str) -> int:
+        """Return the number of notes containing ``term``."""
+        term_id = self._term_ids.get(term)
+        return 0 if term_id is None else self._doc_freqs[term_id]
+    
+    def scores(self, terms: Iterable[str], notes: Iterable[str]) -> Dict[str, float]:
+        """Return the BM25 score of each of ``notes`` for the query ``terms``.
+        
+        Notes that are not indexed or contain none of the terms score 0.
+        """
+        count = len(self._notes)
+        weights = []
+        for term in terms:
+            doc_freq = self.doc_freq(term)
+            if doc_freq:
+                idf = math.log(1 + (count - doc_freq + 0.5) / (doc_freq + 0.5))
+                weights.append((self._term_ids[term], idf))
+        
+        scores = {}
+        if not weights:
+            return scores
+        average_length = self.total_length / count or 1
+        for note in notes:
+            entry = self._notes.get(note)
+            if entry is None:
+                continue
+            ids, frequencies, length = entry
+            norm = BM25_K1 * (1 - BM25_B + BM25_B * length / average_length)
+            score = 0.0
+            for term_id, idf in weights:
+                position = bisect.bisect_left(ids, term_id)
+                if position < len(ids) and ids[position] == term_id:
+                    frequency = frequencies[position]
+                    score += idf * frequency * (BM25_K1 + 1) / (frequency + norm)
+            if score:
+                scores[note] = score
+        return scores
+    
+    @property
+    def term_count(self) -> int:
+        """Number of distinct terms ever indexed."""
+        return len(self._term_ids)
+    
+    def age(self) -> float:
+        """Seconds since the index was built."""
+        return time.monotonic() - self.built_at
+    
+    def __len__(self) -> int:
+        return len(self._notes)
\ No newline at end of file
@@ -0,0 +1,364 @@
+"""Trigram index narrowing the notes a content search has to read."""
+
+import bisect
+import re
+import threading
+import time
+from array import array
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+
+# Three consecutive bytes of lowercased note text
+Trigram = Tuple[int, int, int]
+
+# A trigram's note ids become a bitmap once more than 1 in DENSE_FRACTION notes
+# have it; past that point the bitmap is smaller than an array of 4-byte ids
+DENSE_FRACTION = 32
+MIN_DENSE_POSTINGS = 256
+
+# Non-ASCII letters that ripgrep's case-insensitive matching treats as an ASCII
+# letter: the Kelvin sign matches 'k' and the long s matches 's'
+_ASCII_FOLDS = (('\u212a'.encode('utf-8'), b'k'), ('\u017f'.encode('utf-8'), b's'))
+
+# Inline flags turning on verbose mode, where whitespace and '#' are not literal
+_VERBOSE_FLAG_RE = re.compile(r'\(\?[a-zA-Z-]*x[a-zA-Z-]*[:)]')
+
+# A counted repetition such as {2}, {0,3} or {1,}
+_REPETITION_RE = re.compile(r'\{(\d*)(?:,\d*)?\}')
+
+# Escapes followed by a fixed-length argument: \x41, \u00e9, \U0001F600, \pL, \cA
+_ESCAPE_ARGUMENT_LENGTHS = {'x': 2, 'u': 4, 'U': 8, 'p': 1, 'P': 1, 'c': 1}
+_ESCAPE_CLOSERS = {'{': '}', '<': '>', "'": "'"}
+
+_NONZERO_BYTE_RE = re.compile(b'[^\x00]')
+
+
+def note_trigrams(data: bytes) -> Set[Trigram]:
+    """Return the trigrams of a note's raw contents, lowercased."""
+    if data.startswith((b'\xff\xfe', b'\xfe\xff')):
+        # ripgrep transcodes UTF-16 notes with a byte order mark; index the text it searches
+        data = data.decode('utf-16', 'replace').encode('utf-8')
+    data = data.lower()
+    if not data.isascii():
+        for folded, letter in _ASCII_FOLDS:
+            data = data.replace(folded, letter)
+    return set(zip(data, data[1:], data[2:]))
+
+
+def query_trigrams(patterns: Iterable[str]) -> Optional[List[Set[Trigram]]]:
+    """Return the trigram sets a note must contain to match one of ``patterns``.
+    
+    A note can match only if it contains every trigram of at least one of the
+    returned sets, one set per alternative of each pattern. Returns None when
+    an alternative has no literal of three ASCII characters, in which case
+    every note is a candidate.
+    
+    Only literals that every match must contain are used: text inside groups
+    and character classes, optional characters and escapes other than escaped
+    punctuation break the literal around them. Non-ASCII characters do too,
+    since case-insensitive matching may fold them to other bytes.
+    """
+    alternatives = []
+    for pattern in patterns:
+        if '\\Q' in pattern or _VERBOSE_FLAG_RE.search(pattern):
+            return None
+        for branch in _split_alternatives(pattern):
+            grams: Set[Trigram] = set()
+            for run in _literal_runs(branch):
+                data = run.encode('ascii')
+                grams.update(zip(data, data[1:], data[2:]))
+            if not grams:
+                return None
+            alternatives.append(grams)
+    return alternatives
+
+
+def _split_alternatives(pattern: str) -> List[str]:
+    """Split a regex at its top-level '|' operators."""
+    branches = []
+    start = i = 0
+    while i < len(pattern):
+        char = pattern[i]
+        if char == '\\':
+            i += 2
+        elif char == '[':
+            i = _skip_class(pattern, i)
+        elif char == '(':
+            i = _skip_group(pattern, i)
+        elif char == '|':
+            branches.append(pattern[start:i])
+            i += 1
+            start = i
+        else:
+            i += 1
+    branches.append(pattern[start:])
+    return branches
+
+
+def _literal_runs(branch: str) -> List[str]:
+    """Return the lowercased literal runs of three or more characters in a regex without top-level '|'."""
+    runs = []
+    run = ''
+    i = 0
+    while i < len(branch):
+        char = branch[i]
+        if char == '\\':
+            escaped = branch[i + 1:i + 2]
+            if escaped and escaped.isascii() and not escaped.isalnum():
+                run += escaped
+                i += 2
+                continue
+            runs.append(run)
+            run = ''
+            i = _skip_escape(branch, i)
+            continue
+        if char in '*?':
+            # The repeated character may be absent
+            run = run[:-1]
+        elif char == '{':
+            repetition = _REPETITION_RE.match(branch, i)
+            if repetition is None or not repetition.group(1) or int(repetition.group(1)) == 0:
+                run = run[:-1]
+            if repetition is not None:
+                i = repetition.end() - 1
+            else:
+                close = branch.find('}', i)
+                i = len(branch) if close < 0 else close
+        elif char == '[':
+            i = _skip_class(branch, i) - 1
+        elif char == '(':
+            i = _skip_group(branch, i) - 1
+        elif char.isascii() and char not in '.^$+)':
+            run += char.lower()
+            i += 1
+            continue
+        runs.append(run)
+        run = ''
+        i += 1
+    runs.append(run)
+    return [run for run in runs if len(run) >= 3]
+
+
+def _skip_escape(pattern: str, i: int) -> int:
+    """Return the index past the non-literal escape at ``i``, its argument included."""
+    letter = pattern[i + 1:i + 2]
+    i += 2
+    if letter.isdigit() or letter in ('g', 'k'):
+        # Backreferences and octal escapes: \1, \012, \g-1
+        while i < len(pattern) and (pattern[i].isdigit() or pattern[i] in '+-'):
+            i += 1
+    opening = pattern[i:i + 1]
+    if opening in _ESCAPE_CLOSERS:
+        # Braced arguments such as \x{263A}, \p{Greek}, \b{start} and \k<name>
+        close = pattern.find(_ESCAPE_CLOSERS[opening], i + 1)
+        return len(pattern) if close < 0 else close + 1
+    return i + _ESCAPE_ARGUMENT_LENGTHS.get(letter, 0)
+
+
+def _skip_class(pattern: str, i: int) -> int:
+    """Return the index past the character class opening at ``i``, nested classes included."""
+    j = i + 1
+    if pattern[j:j + 1] == '^':
+        j += 1
+    if pattern[j:j + 1] == ']':
+        # A ']' right after the opening bracket is a literal member
+        j += 1
+    depth = 1
+    while j < len(pattern):
+        char = pattern[j]
+        if char == '\\':
+            j += 2
+            continue
+        if char == '[':
+            depth += 1
+        elif char == ']':
+            depth -= 1
+            if depth == 0:
+                return j + 1
+        j += 1
+    return len(pattern)
+
+
+def _skip_group(pattern: str, i: int) -> int:
+    """Return the index past the group opening at ``i``, nested groups included."""
+    depth = 0
+    j = i
+    while j < len(pattern):
+        char = pattern[j]
+        if char == '\\':
+            j += 2
+            continue
+        if char == '[':
+            j = _skip_class(pattern, j)
+            continue
+        if char == '(':
+            depth += 1
+        elif char == ')':
+            depth -= 1
+            if depth == 0:
+                return j + 1
+        j += 1
+    return len(pattern)
+
+
+def _bits(value: int) -> Set[int]:
+    """Return the positions of the set bits of ``value``."""
+    data = value.to_bytes((value.bit_length() + 7) // 8, 'little')
+    positions = set()
+    for found in _NONZERO_BYTE_RE.finditer(data):
+        offset = found.start()
+        byte = data[offset]
+        for bit in range(8):
+            if byte >> bit & 1:
+                positions.add(offset * 8 + bit)
+    return positions
+
+
+class TrigramIndex:
+    """Inverted index from the trigrams of note contents to the notes containing them.
+    
+    Contents are indexed lowercased, so one index serves case-sensitive and
+    case-insensitive searches. Notes are numbered in the order they are
+    added; a trigram's notes are a sorted array of note ids, or a bitmap over
+    note ids once the trigram is common enough for the bitmap to be smaller.
+    
+    An edited note keeps its id and gains the trigrams it did not have. The
+    trigrams it lost stay behind, which can only add candidates, never hide a
+    match. Deleted notes leave their id unused. Both count as ``garbage``
+    until the index is rebuilt.
+    """
+    
+    def __init__(self):
+        """Initialize an empty index."""
+        self._paths: List[Optional[str]] = []  # Note id -> path, None once deleted
+        self._ids: Dict[str, int] = {}
+        self._sparse: Dict[Trigram, array] = {}  # Trigram -> sorted note ids
+        self._dense: Dict[Trigram, bytearray] = {}  # Trigram -> bitmap over note ids
+        self._bitmap_bytes = 0
+        self._lock = threading.Lock()
+        self.garbage = 0
+        self.built_at = time.monotonic()
+    
+    def add(self, note: str, data: bytes) -> None:
+        """Index the contents of a new or changed note."""
+        grams = note_trigrams(data)
+        with self._lock:
+            note_id = self._ids.get(note)
+            if note_id is None:
+                note_id = self._ids[note] = len(self._paths)
+                self._paths.append(note)
+            else:
+                self.garbage += 1
+            byte, bit = note_id >> 3, 1 << (note_id & 7)
+            if byte >= self._bitmap_bytes:
+                # Bitmaps all cover every note id, grown by doubling
+                self._bitmap_bytes = max(64, 2 * self._bitmap_bytes)
+                for bitmap in self._dense.values():
+                    bitmap.extend(bytes(self._bitmap_bytes - len(bitmap)))
+            
+            dense = self._dense
+            common = grams & dense.keys()
+            for gram in common:
+                dense[gram][byte] |= bit
+            
+            sparse = self._sparse
+            dense_at = max(MIN_DENSE_POSTINGS, len(self._paths) // DENSE_FRACTION)
+            for gram in grams - common if common else grams:
+                ids = sparse.get(gram)
+                if ids is None:
+                    sparse[gram] = array('I', (note_id,))
+                elif ids[-1] < note_id:
+                    ids.append(note_id)
+                    if len(ids) > dense_at:
+                        dense[gram] = self._bitmap(ids)
+                        del sparse[gram]
+                elif ids[-1] != note_id:
+                    position = bisect.bisect_left(ids, note_id)
+                    if ids[position] != note_id:
+                        ids.insert(position, note_id)
+    
+    def remove(self, note: str) -> None:
+        """Drop a deleted note from the candidates."""
+        with self._lock:
+            note_id = self._ids.pop(note, None)
+            if note_id is not None:
+                self._paths[note_id] = None
+                self.garbage += 1
+    
+    def candidates(self, alternatives: Iterable[Set[Trigram]]) -> Set[str]:
+        """Return the notes having every trigram of at least one set in ``alternatives``."""
+        with self._lock:
+            ids: Set[int] = set()
+            for grams in alternatives:
+                ids |= self._ids_with_all(grams)
+            paths = self._paths
+            return {paths[note_id] for note_id in ids if paths[note_id] is not None}
+    
+    @property
+    def trigram_count(self) -> int:
+        """Number of distinct trigrams."""
+        return len(self._sparse) + len(self._dense)
+    
+    def postings_bytes(self) -> int:
+        """Size of the note id arrays and bitmaps, without dictionary overhead."""
+        with self._lock:
+            return (
+                sum(ids.itemsize * len(ids) for ids in self._sparse.values())
+                + sum(len(bitmap) for bitmap in self._dense.values())
+            )
+    
+    def age(self) -> float:
+        """Seconds since the index was built."""
+        return time.monotonic() - self.built_at
+    
+    def __len__(self) -> int:
+        return len(self._ids)
+    
+    def _ids_with_all(self, grams: Set[Trigram]) -> Set[int]:
+        """Return the ids of notes having every trigram in ``grams``."""
+        arrays = []
+        bitmaps = []
+        for gram in grams:
+            ids = self._sparse.get(gram)
+            if ids is not None:
+                arrays.append(ids)
+                continue
+            bitmap = self._dense.get(gram)
+            if bitmap is None:
+                return set()
+            bitmaps.append(bitmap)
+        
+        if not arrays:
+            combined = int.from_bytes(bitmaps[0], 'little')
+            for bitmap in bitmaps[1:]:
+                combined &= int.from_bytes(bitmap, 'little')
+            return _bits(combined)
+        
+        # Rarest trigram first; long arrays are probed by bisection rather than read whole
+        arrays.sort(key=len)
+        found = set(arrays[0])
+        for ids in arrays[1:]:
+            if not found:
+                break
+            if len(found) * 16 < len(ids):
+                found = {note_id for note_id in found if self._has(ids, note_id)}
+            else:
+                found.intersection_update(ids)
+        for bitmap in bitmaps:
+            found = {
+                note_id for note_id in found
+                if note_id >> 3 < len(bitmap) and bitmap[note_id >> 3] >> (note_id & 7) & 1
+            }
+        return found
+    
+    @staticmethod
+    def _has(ids: array, note_id: int) -> bool:
+        """Whether the sorted array ``ids`` contains ``note_id``."""
+        position = bisect.bisect_left(ids, note_id)
+        return position < len(ids) and ids[position] == note_id
+    
+    def _bitmap(self, ids: array) -> bytearray:
+        """Return a bitmap with the bits of ``ids`` set."""
+        bitmap = bytearray(self._bitmap_bytes)
+        for note_id in ids:
+            bitmap[note_id >> 3] |= 1 << (note_id & 7)
+        return bitmap
\ No newline at end of file
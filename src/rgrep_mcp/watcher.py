@@ -0,0 +1,449 @@
+"""Vault change feed: inotify where available, scandir polling elsewhere."""
+
+import ctypes
+import ctypes.util
+import os
+import select
+import struct
+import sys
+import threading
+from typing import Callable, Dict, Iterable, List, NamedTuple, Optional, Set, Tuple
+
+IGNORE_FILES = ('.gitignore', '.ignore', '.rgignore')  # Changing one can change which notes searches cover
+
+
+class ChangeEvent(NamedTuple):
+    """A change to one note, with paths relative to the vault."""
+    kind: str  # 'created', 'modified', 'deleted', 'renamed' or 'overflow'
+    path: str  # Empty for 'overflow', which means events were lost and caches must be rebuilt
+    old_path: Optional[str] = None  # Previous path of a renamed note
+
+
+NoteLister = Callable[[], Iterable[str]]
+
+
+def _walk(root: str, rel_dir: str = '') -> Tuple[List[str], List[str]]:
+    """Return the directories and the notes below ``rel_dir``, skipping hidden directories."""
+    dirs = [rel_dir]
+    notes: List[str] = []
+    pending = [rel_dir]
+    while pending:
+        current = pending.pop()
+        try:
+            with os.scandir(os.path.join(root, current)) as entries:
+                entries = list(entries)
+        except OSError:
+            continue
+        for entry in entries:
+            rel_path = os.path.join(current, entry.name) if current else entry.name
+            try:
+                if entry.is_dir(follow_symlinks=False):
+                    if not entry.name.startswith('.'):
+                        dirs.append(rel_path)
+                        pending.append(rel_path)
+                elif entry.name.endswith('.md'):
+                    notes.append(rel_path)
+            except OSError:
+                continue
+    return dirs, notes
+
+
+class VaultWatcher:
+    """Base class publishing batches of note changes to subscribers."""
+    
+    def __init__(self, vault_path: str, list_notes: Optional[NoteLister] = None):
+        """Initialize a stopped watcher for a vault.
+        
+        ``list_notes`` returns the relative paths of the notes searches cover,
+        and the watcher reports on exactly those; it may raise OSError. By
+        default every note outside hidden directories is covered.
+        """
+        self.vault_path = str(vault_path)
+        self.list_notes = list_notes if list_notes is not None else (lambda: _walk(self.vault_path)[1])
+        self._subscribers: List[Callable[[List[ChangeEvent]], None]] = []
+        self._thread: Optional[threading.Thread] = None
+        self._stop = threading.Event()
+    
+    def subscribe(self, callback: Callable[[List[ChangeEvent]], None]) -> None:
+        """Call ``callback`` with every batch of changes."""
+        self._subscribers.append(callback)
+    
+    def start(self) -> None:
+        """Take the initial snapshot and start watching in a background thread."""
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name=type(self).__name__, daemon=True)
+        self._thread.start()
+    
+    def stop(self) -> None:
+        """Stop watching and wait for the background thread to exit."""
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+    
+    @property
+    def running(self) -> bool:
+        """Whether the background thread is running."""
+        return self._thread is not None and self._thread.is_alive()
+    
+    def covers(self, rel_path: str) -> bool:
+        """Check whether a note is one the watcher reports on."""
+        raise NotImplementedError
+    
+    def _publish(self, events: List[ChangeEvent]) -> None:
+        if not events:
+            return
+        for callback in self._subscribers:
+            try:
+                callback(events)
+            except Exception as e:
+                print(f"Vault watcher subscriber failed: {e}", file=sys.stderr)
+    
+    def _run(self) -> None:
+        raise NotImplementedError
+
+
+class PollingWatcher(VaultWatcher):
+    """Detect changes by comparing snapshots of the listed notes every ``interval`` seconds.
+    
+    Renames are recognized by a deleted and a created note sharing an inode.
+    """
+    
+    def __init__(self, vault_path: str, interval: float = 2.0, list_notes: Optional[NoteLister] = None):
+        """Initialize with a polling interval in seconds."""
+        super().__init__(vault_path, list_notes)
+        self.interval = interval
+        self._snapshot: Optional[Dict[str, Tuple[int, int, int]]] = None
+    
+    def start(self) -> None:
+        """Take the initial snapshot and start polling."""
+        if self._snapshot is None:
+            self.poll()
+        super().start()
+    
+    def covers(self, rel_path: str) -> bool:
+        """Check whether a note was listed by the last poll."""
+        return self._snapshot is not None and rel_path in self._snapshot
+    
+    def poll(self) -> List[ChangeEvent]:
+        """Compare the vault with the last snapshot and publish the differences."""
+        # Notes are listed afresh, so notes an edited ignore file hides or reveals are reported
+        snapshot = {}
+        for path in self.list_notes():
+            try:
+                stat = os.stat(os.path.join(self.vault_path, path))
+            except OSError:
+                continue
+            snapshot[path] = (stat.st_mtime_ns, stat.st_size, stat.st_ino)
+        previous, self._snapshot = self._snapshot, snapshot
+        if previous is None:
+            return []
+        
+        events = []
+        created = [path for path in snapshot if path not in previous]
+        deleted = {previous[path][2]: path for path in previous if path not in snapshot}
+        for path in created:
+            old_path = deleted.pop(snapshot[path][2], None)
+            if old_path is not None:
+                events.append(ChangeEvent('renamed', path, old_path))
+            else:
+                events.append(ChangeEvent('created', path))
+        events.extend(ChangeEvent('deleted', path) for path in deleted.values())
+        events.extend(
+            ChangeEvent('modified', path) for path, state in snapshot.items()
+            if path in previous and previous[path][:2] != state[:2]
+        )
+        self._publish(events)
+        return events
+    
+    def _run(self) -> None:
+        while not self._stop.wait(self.interval):
+            try:
+                self.poll()
+            except Exception as e:
+                print(f"Vault polling failed: {e}", file=sys.stderr)
+
+
+# inotify(7) constants
+IN_ATTRIB = 0x00000004
+IN_CLOSE_WRITE = 0x00000008
+IN_MOVED_FROM = 0x00000040
+IN_MOVED_TO = 0x00000080
+IN_CREATE = 0x00000100
+IN_DELETE = 0x00000200
+IN_Q_OVERFLOW = 0x00004000
+IN_IGNORED = 0x00008000
+IN_ISDIR = 0x40000000
+IN_NONBLOCK = os.O_NONBLOCK
+IN_CLOEXEC = 0o2000000
+
+WATCH_MASK = IN_ATTRIB | IN_CLOSE_WRITE | IN_MOVED_FROM | IN_MOVED_TO | IN_CREATE | IN_DELETE
+EVENT_HEADER = struct.Struct('iIII')
+
+
+class InotifyWatcher(VaultWatcher):
+    """Linux inotify watcher over every visible vault directory, called through libc.
+    
+    Events are checked against the listed notes. A note is covered when its
+    directory is, since searches glob ``*.md`` past file-level ignore rules. A
+    new note in a directory no listed note is in is reported at once and
+    confirmed by listing the notes again at the end of the batch; a directory
+    the listing leaves out is skipped from then on. Changes to ignore files and
+    new or moved directories re-list the notes and report the difference.
+    """
+    
+    def __init__(self, vault_path: str, list_notes: Optional[NoteLister] = None):
+        """Initialize inotify, raising OSError where it is unavailable."""
+        super().__init__(vault_path, list_notes)
+        if not sys.platform.startswith('linux'):
+            raise OSError("inotify is only available on Linux")
+        self._libc = ctypes.CDLL(ctypes.util.find_library('c') or 'libc.so.6', use_errno=True)
+        self._fd = self._libc.inotify_init1(IN_NONBLOCK | IN_CLOEXEC)
+        if self._fd < 0:
+            raise OSError(ctypes.get_errno(), "inotify_init1 failed")
+        self._dirs: Dict[int, str] = {}  # Watch descriptor -> relative directory
+        self._notes: Set[str] = set()
+        self._note_dirs: Set[str] = set()  # Directories of listed notes, where any note is covered
+        self._skipped_dirs: Set[str] = set()  # Directories with notes the listing left out
+        self._unconfirmed = False  # Whether the current batch reported notes in new directories
+        self._started = False
+    
+    def start(self) -> None:
+        """Add a watch on every directory, then start reading events."""
+        if not self._started:
+            self._started = True
+            self._watch_tree('')
+            self._resync()
+        super().start()
+    
+    def covers(self, rel_path: str) -> bool:
+        """Check whether a note is among the listed notes."""
+        return rel_path in self._notes
+    
+    def stop(self) -> None:
+        """Stop reading events and release the inotify descriptor."""
+        super().stop()
+        if self._fd >= 0:
+            os.close(self._fd)
+            self._fd = -1
+    
+    def _watch_tree(self, rel_dir: str) -> None:
+        """Watch a directory tree."""
+        dirs, _notes = _walk(self.vault_path, rel_dir)
+        for directory in dirs:
+            path = os.path.join(self.vault_path, directory).encode()
+            wd = self._libc.inotify_add_watch(self._fd, path, WATCH_MASK)
+            if wd < 0:
+                raise OSError(ctypes.get_errno(), f"inotify_add_watch failed for {path!r}")
+            self._dirs[wd] = directory
+    
+    def _reset(self) -> None:
+        """Drop every watch, then watch the vault and list its notes again."""
+        for wd in list(self._dirs):
+            self._libc.inotify_rm_watch(self._fd, wd)
+        self._dirs.clear()
+        self._skipped_dirs.clear()
+        self._watch_tree('')
+        self._resync()
+    
+    def _resync(self) -> List[ChangeEvent]:
+        """List the notes again and report how they differ from the known ones."""
+        listed = set(self.list_notes())
+        gone = sorted(self._notes - listed)
+        events = [ChangeEvent('deleted', note) for note in gone]
+        events.extend(ChangeEvent('created', note) for note in sorted(listed - self._notes))
+        self._notes = listed
+        self._note_dirs = {os.path.dirname(note) for note in listed}
+        self._skipped_dirs.update(
+            os.path.dirname(note) for note in gone if os.path.exists(os.path.join(self.vault_path, note))
+        )
+        self._skipped_dirs.difference_update(self._note_dirs)
+        return events
+    
+    def _covers_new(self, rel_path: str) -> bool:
+        """Check whether searches cover a note the watcher has not listed yet."""
+        if not rel_path.endswith('.md'):
+            return False
+        rel_dir = os.path.dirname(rel_path)
+        if rel_dir in self._skipped_dirs:
+            return False
+        if rel_dir not in self._note_dirs:
+            self._unconfirmed = True
+        return True
+    
+    def _forget_tree(self, rel_dir: str) -> List[str]:
+        """Drop notes below a directory that left the vault, returning them."""
+        prefix = rel_dir + os.sep
+        gone = [note for note in self._notes if note.startswith(prefix)]
+        self._notes.difference_update(gone)
+        for wd, directory in list(self._dirs.items()):
+            if directory == rel_dir or directory.startswith(prefix):
+                self._libc.inotify_rm_watch(self._fd, wd)
+                del self._dirs[wd]
+        return gone
+    
+    def _move_tree(self, old_dir: str, new_dir: str) -> List[ChangeEvent]:
+        """Follow a directory renamed inside the vault; its watches move with it."""
+        old_prefix = old_dir + os.sep
+        events = []
+        for note in [note for note in self._notes if note.startswith(old_prefix)]:
+            new_note = os.path.join(new_dir, note[len(old_prefix):])
+            self._notes.discard(note)
+            self._notes.add(new_note)
+            events.append(ChangeEvent('renamed', new_note, note))
+        for wd, directory in self._dirs.items():
+            if directory == old_dir:
+                self._dirs[wd] = new_dir
+            elif directory.startswith(old_prefix):
+                self._dirs[wd] = os.path.join(new_dir, directory[len(old_prefix):])
+        return events
+    
+    def _run(self) -> None:
+        while not self._stop.is_set():
+            readable, _, _ = select.select([self._fd], [], [], 0.5)
+            if not readable:
+                continue
+            try:
+                data = os.read(self._fd, 64 * 1024)
+            except BlockingIOError:
+                continue
+            except OSError as e:
+                print(f"inotify read failed: {e}", file=sys.stderr)
+                return
+            try:
+                self._publish(self._translate(data))
+            except Exception as e:
+                print(f"inotify event handling failed: {e}", file=sys.stderr)
+    
+    def _translate(self, data: bytes) -> List[ChangeEvent]:
+        """Turn raw inotify events into note changes, pairing moves by cookie."""
+        events: List[ChangeEvent] = []
+        moved_from: Dict[int, Tuple[str, bool]] = {}
+        resync = False
+        self._unconfirmed = False
+        offset = 0
+        while offset < len(data):
+            wd, mask, cookie, length = EVENT_HEADER.unpack_from(data, offset)
+            name = data[offset + EVENT_HEADER.size:offset + EVENT_HEADER.size + length]
+            offset += EVENT_HEADER.size + length
+            
+            if mask & IN_Q_OVERFLOW:
+                # Events were dropped: re-watch the whole vault and let subscribers rebuild
+                self._reset()
+                return [ChangeEvent('overflow', '')]
+            if mask & IN_IGNORED:
+                self._dirs.pop(wd, None)
+                continue
+            directory = self._dirs.get(wd)
+            if directory is None:
+                continue
+            name = os.fsdecode(name.rstrip(b'\0'))
+            rel_path = os.path.join(directory, name) if directory else name
+            is_dir = bool(mask & IN_ISDIR)
+            
+            if is_dir:
+                if name.startswith('.'):
+                    continue
+                if mask & IN_CREATE:
+                    self._watch_tree(rel_path)
+                    resync = True
+                elif mask & IN_MOVED_FROM:
+                    moved_from[cookie] = (rel_path, True)
+                elif mask & IN_MOVED_TO:
+                    old = moved_from.pop(cookie, None)
+                    if old is not None and old[1]:
+                        events.extend(self._move_tree(old[0], rel_path))
+                    else:
+                        self._watch_tree(rel_path)
+                    # Ignore rules may cover the new location differently
+                    resync = True
+                continue
+            if name in IGNORE_FILES:
+                # Re-list at once, so later events in the batch are checked against the new rules
+                self._skipped_dirs.clear()
+                events.extend(self._resync())
+                continue
+            
+            if mask & IN_MOVED_FROM:
+                moved_from[cookie] = (rel_path, False)
+                continue
+            if mask & IN_MOVED_TO:
+                old = moved_from.pop(cookie, None)
+                old_path = old[0] if old is not None and not old[1] else None
+                events.extend(self._moved(old_path, rel_path))
+                continue
+            if mask & IN_DELETE:
+                if rel_path in self._notes:
+                    self._notes.discard(rel_path)
+                    events.append(ChangeEvent('deleted', rel_path))
+            elif mask & (IN_CREATE | IN_CLOSE_WRITE | IN_ATTRIB):
+                if rel_path in self._notes:
+                    events.append(ChangeEvent('modified', rel_path))
+                elif self._covers_new(rel_path):
+                    self._notes.add(rel_path)
+                    events.append(ChangeEvent('created', rel_path))
+        
+        # Moves without a matching MOVED_TO left the vault
+        for old_path, is_dir in moved_from.values():
+            if is_dir:
+                events.extend(ChangeEvent('deleted', note) for note in self._forget_tree(old_path))
+            elif old_path in self._notes:
+                self._notes.discard(old_path)
+                events.append(ChangeEvent('deleted', old_path))
+        if resync or self._unconfirmed:
+            events.extend(self._resync())
+        return _coalesce(events)
+    
+    def _moved(self, old_path: Optional[str], new_path: str) -> List[ChangeEvent]:
+        """Events for a file moved to ``new_path``, from ``old_path`` if it was in the vault."""
+        was_note = old_path is not None and old_path in self._notes
+        if was_note:
+            self._notes.discard(old_path)
+        if new_path not in self._notes and not self._covers_new(new_path):
+            return [ChangeEvent('deleted', old_path)] if was_note else []
+        if was_note:
+            self._notes.add(new_path)
+            return [ChangeEvent('renamed', new_path, old_path)]
+        # e.g. an editor saving through a temporary file renamed over the note
+        kind = 'modified' if new_path in self._notes else 'created'
+        self._notes.add(new_path)
+        return [ChangeEvent(kind, new_path)]
+
+
+def _coalesce(events: List[ChangeEvent]) -> List[ChangeEvent]:
+    """Drop repeated 'modified' events for a note within one batch."""
+    seen: Set[str] = set()
+    result = []
+    for event in events:
+        if event.kind == 'modified':
+            if event.path in seen:
+                continue
+            seen.add(event.path)
+        result.append(event)
+    return result
+
+
+def start_watcher(
+    vault_path: str,
+    callback: Callable[[List[ChangeEvent]], None],
+    poll_interval: float = 2.0,
+    use_inotify: bool = True,
+    list_notes: Optional[NoteLister] = None
+) -> VaultWatcher:
+    """Start an inotify watcher where possible, falling back to polling."""
+    if use_inotify:
+        watcher: Optional[VaultWatcher] = None
+        try:
+            watcher = InotifyWatcher(vault_path, list_notes)
+            watcher.subscribe(callback)
+            watcher.start()
+            return watcher
+        except (OSError, AttributeError) as e:
+            # Not Linux, no libc inotify, or too many directories for the watch limit
+            if watcher is not None:
+                watcher.stop()
+            print(f"inotify unavailable ({e}), polling the vault every {poll_interval}s", file=sys.stderr)
+    watcher = PollingWatcher(vault_path, interval=poll_interval, list_notes=list_notes)
+    watcher.subscribe(callback)
+    watcher.start()
+    return watcher
\ No newline at end of file
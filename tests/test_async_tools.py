@@ -0,0 +1,107 @@
+#!/usr/bin/env python3
+"""Test asyncio-native searches and the concurrent ripgrep limit."""
+
+import asyncio
+import sys
+import tempfile
+from pathlib import Path
+
+# Add src to path
+sys.path.insert(0, str(Path(__file__).parent / "src"))
+
+from rgrep_mcp.ripgrep import RipgrepWrapper
+from rgrep_mcp.stats import measure
+
+
+def _write_vault(root: Path) -> None:
+    """Create notes with frontmatter, headings and links."""
+    for i in range(20):
+        (root / f"Note {i}.md").write_text(
+            f"---\nstatus: meeting-{i}\n---\n# Note {i}\n\n## Agenda\nmeeting notes, see [[Note {i + 1}]]\n",
+            encoding="utf-8",
+        )
+
+
+def test_async_matches_sync():
+    """Test that async searches return the same results as sync searches."""
+    with tempfile.TemporaryDirectory() as vault:
+        _write_vault(Path(vault))
+        rg = RipgrepWrapper(vault)
+        
+        print("=== ASYNC SEARCH TEST ===")
+        
+        sync_results = {
+            "all": rg.search_content("meeting", max_results=10),
+            "content_only": rg.search_content_only("meeting", max_results=10),
+            "frontmatter_only": rg.search_frontmatter_only("meeting", max_results=10),
+        }
+        for scope, expected in sync_results.items():
+            results = asyncio.run(rg.search_async("meeting", scope, max_results=10))
+            print(f"  {scope}: {len(results)} results")
+            assert results == expected, scope
+        print("  ✅ Async scoped searches match sync results")
+        
+        for scope in ("all", "content_only"):
+            for sort in ("none", "path", "recency", "relevance"):
+                expected = rg._search("meeting", scope, False, None, 3, True, sort)
+                assert asyncio.run(rg.search_async("meeting", scope, max_results=3, sort=sort)) == expected, (scope, sort)
+        with measure() as measured:
+            asyncio.run(rg.search_async("meeting", "content_only", max_results=3))
+        assert {"ripgrep", "order", "frontmatter"} <= set(measured.timer.stages), measured.timer.stages
+        assert "wait" not in measured.timer.stages
+        print("  ✅ Top results are kept in the worker thread for every order, with stage timings")
+        
+        links = asyncio.run(rg.find_links_async(link_type="wiki_links", max_results=5))
+        assert links == rg.find_links(link_type="wiki_links", max_results=5)
+        print("  ✅ Async link search matches sync results")
+
+
+def test_concurrent_ripgrep_limit():
+    """Test that parallel searches never run more ripgrep processes than allowed."""
+    with tempfile.TemporaryDirectory() as vault:
+        _write_vault(Path(vault))
+        rg = RipgrepWrapper(vault, max_concurrent_searches=2)
+        
+        print("=== CONCURRENCY LIMIT TEST ===")
+        
+        running = 0
+        peak = 0
+        original_exec = asyncio.create_subprocess_exec
+        
+        async def tracking_exec(*args, **kwargs):
+            nonlocal running, peak
+            process = await original_exec(*args, **kwargs)
+            running += 1
+            peak = max(peak, running)
+            original_wait = process.wait
+            
+            async def wait():
+                nonlocal running
+                code = await original_wait()
+                running -= 1
+                process.wait = original_wait
+                return code
+            
+            process.wait = wait
+            return process
+        
+        async def run_searches():
+            return await asyncio.gather(*(
+                rg.search_async("meeting", "content_only", max_results=50) for _ in range(6)
+            ))
+        
+        asyncio.create_subprocess_exec = tracking_exec
+        try:
+            all_results = asyncio.run(run_searches())
+        finally:
+            asyncio.create_subprocess_exec = original_exec
+        
+        print(f"  Peak concurrent ripgrep processes: {peak}")
+        assert peak == 2, peak
+        assert all(len(results) == 20 for results in all_results)
+        print("  ✅ Six parallel searches ran two ripgrep processes at a time")
+
+
+if __name__ == "__main__":
+    test_async_matches_sync()
+    test_concurrent_ripgrep_limit()
\ No newline at end of file
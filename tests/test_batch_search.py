@@ -0,0 +1,124 @@
+#!/usr/bin/env python3
+"""Test batched multi-query searches in one ripgrep pass."""
+
+import asyncio
+import json
+import subprocess
+import sys
+import tempfile
+from pathlib import Path
+
+# Add src to path
+sys.path.insert(0, str(Path(__file__).parent / "src"))
+
+from rgrep_mcp import server
+from rgrep_mcp.ripgrep import RipgrepWrapper
+
+QUERIES = ["meeting", "budget", "Alpha|Beta", "status", "ελα"]
+
+
+def _write_vault(root: Path) -> None:
+    """Create notes where queries share lines, files and frontmatter."""
+    for i in range(12):
+        (root / f"Note {i}.md").write_text(
+            f"---\nstatus: meeting-{i}\nproject: Alpha\n---\n# Note {i}\n\n"
+            f"## Agenda\nmeeting about the budget\nBeta budget review\n"
+            + "meeting notes\n" * (i % 4)
+            + ("γεια ελα εδώ meeting\n" if i % 3 == 0 else ""),
+            encoding="utf-8",
+        )
+
+
+def test_batch_matches_single_searches():
+    """Test that each query gets the results of its own search."""
+    with tempfile.TemporaryDirectory() as vault:
+        _write_vault(Path(vault))
+        rg = RipgrepWrapper(vault)
+        
+        print("=== BATCH SEARCH TEST ===")
+        
+        for scope in ("all", "content_only", "frontmatter_only"):
+            for sort in ("recency", "path", "relevance"):
+                expected = [rg._search(q, scope, False, None, 5, True, sort) for q in QUERIES]
+                assert rg.search_batch(QUERIES, scope, max_results=5, sort=sort) == expected, (scope, sort)
+                results = asyncio.run(rg.search_batch_async(QUERIES, scope, max_results=5, sort=sort))
+                assert results == expected, (scope, sort)
+            print(f"  ✅ {scope}: every query matches its single search, sync and async")
+        
+        unicode_match = rg.search_batch(QUERIES, sort="path")[-1][0]
+        assert unicode_match["text"].encode("utf-8")[unicode_match["match_start"]:unicode_match["match_end"]] == "ελα".encode("utf-8")
+        print("  ✅ Match offsets are per query, in bytes")
+        
+        none_results = rg.search_batch(QUERIES, max_results=2, sort="none")
+        assert [len(r) for r in none_results] == [2, 2, 2, 2, 2]
+        print("  ✅ Per-query max_results with sort none")
+
+
+def test_one_ripgrep_pass():
+    """Test that a batch scans the vault once, and unbatchable queries still work."""
+    with tempfile.TemporaryDirectory() as vault:
+        _write_vault(Path(vault))
+        rg = RipgrepWrapper(vault)
+        
+        print("=== SINGLE PASS TEST ===")
+        
+        searches = []
+        original = subprocess.Popen
+        
+        def counting_popen(cmd, *args, **kwargs):
+            if "--json" in cmd:
+                searches.append(cmd)
+            return original(cmd, *args, **kwargs)
+        
+        subprocess.Popen = counting_popen
+        try:
+            rg.search_batch(QUERIES)
+            assert len(searches) == 1 and searches[0].count("-e") == len(QUERIES)
+            print("  ✅ Five queries, one ripgrep process")
+            
+            searches.clear()
+            # \p{Greek} is ripgrep syntax that Python's re rejects
+            results = rg.search_batch(["budget", r"\p{Greek}+"], sort="path")
+            assert len(searches) == 2
+            assert results[1] and all("ελα" in r["text"] for r in results[1])
+            print("  ✅ Queries Python cannot compile are searched on their own")
+            
+            searches.clear()
+            # Python's re compiles these, but reads them differently from ripgrep
+            queries = ["budget", "[[:digit:]]", r"ελ\w"]
+            results = rg.search_batch(queries, sort="path")
+            assert len(searches) == 3
+            assert results == [rg._search(q, "all", False, None, 15, True, "path") for q in queries]
+            assert results[1] and results[2]
+            print("  ✅ POSIX classes and Unicode escapes are searched on their own, with ripgrep's meaning")
+        finally:
+            subprocess.Popen = original
+
+
+def test_batch_tool():
+    """Test the rg_search_notes_batch tool output and validation."""
+    with tempfile.TemporaryDirectory() as vault:
+        _write_vault(Path(vault))
+        server._rg = RipgrepWrapper(vault)
+        
+        print("=== BATCH TOOL TEST ===")
+        
+        try:
+            result = json.loads(asyncio.run(server.rg_search_notes_batch(["meeting", "budget"], max_results=3)))
+            assert [r["query"] for r in result["results"]] == ["meeting", "budget"]
+            assert all(r["total_matches"] == 3 for r in result["results"])
+            assert "smart_context" in result["results"][1]["results"][0]
+            print("  ✅ Results grouped by query")
+            
+            assert "error" in json.loads(asyncio.run(server.rg_search_notes_batch([])))
+            assert "error" in json.loads(asyncio.run(server.rg_search_notes_batch(["x"] * 21)))
+            assert "error" in json.loads(asyncio.run(server.rg_search_notes_batch(["x"], sort="random")))
+            print("  ✅ Empty, oversized and invalid batches rejected")
+        finally:
+            server._rg = None
+
+
+if __name__ == "__main__":
+    test_batch_matches_single_searches()
+    test_one_ripgrep_pass()
+    test_batch_tool()
\ No newline at end of file
@@ -0,0 +1,75 @@
+#!/usr/bin/env python3
+"""Test the synthetic vault generator and the benchmark runner."""
+
+import json
+import sys
+import tempfile
+from pathlib import Path
+
+# Add the repository root to path for the benchmarks package
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from benchmarks.run import build_cases, compare_results, run_benchmarks, uncovered_targets
+from benchmarks.vault import MARKER, VaultGenerator, VaultSpec, ensure_vault
+
+
+def _snapshot(root: Path) -> dict:
+    """Return every file's bytes and mtime below ``root``."""
+    return {
+        str(p.relative_to(root)): (p.read_bytes(), p.stat().st_mtime)
+        for p in root.rglob("*") if p.is_file() and p.name != MARKER
+    }
+
+
+def test_generator_is_deterministic():
+    """Test that a spec always produces the same vault."""
+    spec = VaultSpec(notes=60, folders=4, frontmatter_ratio=0.5, properties=5, note_bytes=600)
+    with tempfile.TemporaryDirectory() as a, tempfile.TemporaryDirectory() as b:
+        print("=== VAULT GENERATOR TEST ===")
+        
+        manifest = ensure_vault(a, spec)
+        ensure_vault(b, spec)
+        assert manifest["notes"] == 60
+        assert _snapshot(Path(a)) == _snapshot(Path(b))
+        print("  ✅ Same spec and seed give identical notes and mtimes")
+        
+        notes = list(Path(a).rglob("*.md"))
+        with_frontmatter = sum(p.read_text(encoding="utf-8").startswith("---\n") for p in notes)
+        assert len(notes) == 60 and 15 < with_frontmatter < 45
+        assert sum("[[" in p.read_text(encoding="utf-8") for p in notes) > 50
+        print(f"  ✅ {with_frontmatter}/60 notes with frontmatter, links in most notes")
+        
+        assert ensure_vault(a, spec) == manifest
+        try:
+            ensure_vault(a, spec._replace(seed=7))
+        except ValueError:
+            pass
+        else:
+            raise AssertionError("a vault for another spec must not be reused")
+        print("  ✅ Existing vault reused only for the same spec")
+
+
+def test_runner_covers_every_tool():
+    """Test that every tool and wrapper method is timed and results compare."""
+    spec = VaultSpec(notes=40, folders=3, note_bytes=400)
+    with tempfile.TemporaryDirectory() as vault:
+        print("=== BENCHMARK RUNNER TEST ===")
+        
+        manifest = ensure_vault(vault, spec)
+        generator = VaultGenerator(spec)
+        cases = build_cases(vault, generator)
+        assert uncovered_targets(cases) == []
+        print(f"  ✅ {len(cases)} cases cover every MCP tool and public wrapper method")
+        
+        results = run_benchmarks(vault, manifest, generator, repeat=1)
+        assert set(results["results"]) == {case.name for case in cases}
+        assert json.loads(json.dumps(results)) == results
+        assert all(timing["median_ms"] >= 0 and timing["peak_kib"] > 0 for timing in results["results"].values())
+        report = compare_results(results, results)
+        assert len(report) == len(cases) + 1 and "x " in report[1]
+        print("  ✅ Results are JSON with timings and peak memory, and compare case by case")
+
+
+if __name__ == "__main__":
+    test_generator_is_deterministic()
+    test_runner_covers_every_tool()
\ No newline at end of file
@@ -0,0 +1,109 @@
+#!/usr/bin/env python3
+"""Test BM25 ranking of search results by the term index."""
+
+import asyncio
+import json
+import sys
+import tempfile
+from pathlib import Path
+
+# Add src to path
+sys.path.insert(0, str(Path(__file__).parent / "src"))
+
+from rgrep_mcp import server
+from rgrep_mcp.ripgrep import RipgrepWrapper
+from rgrep_mcp.terms import TermIndex, note_terms, query_terms
+from rgrep_mcp.watcher import ChangeEvent
+
+
+def _write_vault(root: Path) -> None:
+    """Create notes mentioning a word in the title, a heading, frontmatter and body text."""
+    notes = {
+        "Gardening.md": "# Tips\n\nGardening: water in the morning.\n",
+        "Weekend.md": "# Weekend\n\n## Gardening\n\nSome weeding.\n",
+        "Journal.md": "---\ntopic: gardening\n---\n# Journal\n\nA long day of chores and errands.\n",
+        "Errands.md": "# Errands\n\nBought gardening gloves, then gardening soil.\n",
+        "Recipes.md": "# Recipes\n\nBread and soup.\n",
+    }
+    for name, content in notes.items():
+        path = root / name
+        path.write_text(content, encoding="utf-8")
+
+
+def test_term_statistics():
+    """Test field weights, query words and document frequencies."""
+    print("=== TERM STATISTICS TEST ===")
+    
+    frequencies, length = note_terms("Garden Plan", "---\nseason: spring\n---\n# Garden\n\nplant the garden\n")
+    assert frequencies["garden"] == 4 + 2 + 1 and frequencies["spring"] == 2 and frequencies["plan"] == 4
+    assert length == 2 * 4 + 2 * 2 + 1 * 2 + 3
+    print("  ✅ Title words count 4 times, heading and frontmatter words twice")
+    
+    assert query_terms(r"\bgarden(ing)?\b") == ["garden", "ing"]
+    assert query_terms("(?i)apple|Pear pear [xyz]") == ["apple", "pear"]
+    assert query_terms(r"\d{4}-\d{2}") == []
+    print("  ✅ Queries lose escapes, classes and repetitions and keep their distinct words")
+    
+    index = TermIndex()
+    index.set_note("a", {"apple": 3, "pear": 1}, 4)
+    index.set_note("b", {"pear": 2}, 2)
+    index.set_note("c", {"plum": 1}, 1)
+    assert index.doc_freq("pear") == 2 and index.total_length == 7
+    scores = index.scores(["apple", "pear"], ["a", "b", "c", "missing"])
+    assert set(scores) == {"a", "b"} and scores["a"] > scores["b"]
+    assert index.scores(["kiwi"], ["a"]) == {}
+    print("  ✅ Rare words outweigh common ones; notes without the words do not score")
+    
+    index.set_note("a", {"plum": 1}, 1)
+    index.remove("b")
+    assert index.doc_freq("pear") == 0 and index.doc_freq("plum") == 2 and index.total_length == 2
+    print("  ✅ Replacing and removing notes corrects document frequencies and lengths")
+
+
+def test_bm25_search():
+    """Test that sort='bm25' ranks title and heading matches first and stays current."""
+    with tempfile.TemporaryDirectory() as vault:
+        root = Path(vault)
+        _write_vault(root)
+        rg = RipgrepWrapper(vault)
+        
+        print("=== BM25 SEARCH TEST ===")
+        
+        def files(matches):
+            return list(dict.fromkeys(m.file for m in matches))
+        
+        assert files(rg.search_content("gardening", sort="bm25")) == ["Gardening.md", "Weekend.md", "Errands.md", "Journal.md"]
+        assert files(rg.search_content("gardening", sort="bm25", max_results=1)) == ["Gardening.md"]
+        assert files(rg.search_content("gardening", sort="relevance"))[0] == "Errands.md"
+        print("  ✅ Title and heading words outrank repeated body words")
+        
+        assert files(rg.search_batch(["gardening", "bread"], sort="bm25")[0])[:2] == ["Gardening.md", "Weekend.md"]
+        print("  ✅ Batched searches rank each query on its own")
+        
+        rg.start_watching(poll_interval=3600, use_inotify=False)
+        try:
+            index = rg.get_term_index()
+            (root / "Recipes.md").write_text("# Gardening gardening\n\nGardening.\n", encoding="utf-8")
+            (root / "Gardening.md").unlink()
+            rg.apply_changes([ChangeEvent("modified", "Recipes.md"), ChangeEvent("deleted", "Gardening.md")])
+            assert rg.get_term_index() is index and len(index) == 4
+            assert files(rg.search_content("gardening", sort="bm25"))[0] == "Recipes.md"
+            print("  ✅ Changed and deleted notes are re-indexed in place")
+        finally:
+            rg.stop_watching()
+        
+        original = server._rg
+        server._rg = rg
+        try:
+            result = json.loads(asyncio.run(server.rg_search_notes("gardening", sort="bm25", smart_context=False)))
+            assert result["results"][0]["file"] == "Recipes.md", result
+            error = json.loads(asyncio.run(server.rg_search_notes("gardening", sort="score")))
+            assert "bm25" in error["error"]
+        finally:
+            server._rg = original
+        print("  ✅ rg_search_notes accepts sort='bm25' and lists it for invalid orders")
+
+
+if __name__ == "__main__":
+    test_term_statistics()
+    test_bm25_search()
\ No newline at end of file
@@ -0,0 +1,165 @@
+#!/usr/bin/env python3
+"""Test cursor pagination of search results kept server-side."""
+
+import asyncio
+import json
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+# Add src to path
+sys.path.insert(0, str(Path(__file__).parent / "src"))
+
+from rgrep_mcp import server
+from rgrep_mcp.cursors import CursorStore
+from rgrep_mcp.ripgrep import RipgrepWrapper
+from rgrep_mcp.watcher import ChangeEvent
+
+HUB_LINK = r"\[\[Hub\]\]"
+
+
+def _write_vault(root: Path) -> None:
+    """Create 25 notes linking to a hub under a heading, one matching line each."""
+    (root / "Hub.md").write_text("# Hub\n", encoding="utf-8")
+    for number in range(25):
+        content = f"# Note {number:02d}\n\n## Links\n\nSee [[Hub]] and https://example.com/{number}\n"
+        (root / f"Note {number:02d}.md").write_text(content, encoding="utf-8")
+
+
+def _pages(call, **kwargs):
+    """Call a tool and follow next_cursor to the last page, returning every page."""
+    pages = [json.loads(asyncio.run(call(**kwargs)))]
+    while pages[-1].get("next_cursor"):
+        pages.append(json.loads(asyncio.run(call(**kwargs, cursor=pages[-1]["next_cursor"]))))
+    return pages
+
+
+def test_cursor_store():
+    """Test paging, expiry and bounds of the result set store."""
+    print("=== CURSOR STORE TEST ===")
+    
+    store = CursorStore(max_entries=2, max_results=25, ttl=60)
+    render = object()
+    assert store.open("tool", list(range(10)), 10, render).next_cursor is None and len(store) == 0
+    print("  ✅ Results that fit on one page keep nothing")
+    
+    first = store.open("tool", list(range(40)), 10, render, key="search", generation=3)
+    assert first.results == list(range(10)) and first.render is render
+    second = store.page(first.next_cursor, "tool")
+    third = store.page(second.next_cursor, "tool")
+    assert second.results == list(range(10, 20)) and third.results == [20, 21, 22, 23, 24]
+    assert third.next_cursor is None and third.truncated and not second.truncated
+    assert store.page(first.next_cursor, "tool").results == second.results
+    print("  ✅ Pages are slices of at most max_results results, and cursors can be reused")
+    print("  ✅ The last page of a cut result set is marked truncated")
+    
+    assert store.page(first.next_cursor, "other") is None
+    assert store.page("nonsense", "tool") is None and store.page(first.next_cursor + "x", "tool") is None
+    assert store.find("search", 3).results == first.results and store.find("search", 4) is None
+    print("  ✅ Cursors of other tools and malformed cursors are rejected; searches are found by key")
+    
+    lazy_store = CursorStore(max_results=25)
+    lazy = lazy_store.open("tool", list(range(11)), 10, render, more=lambda served: None)
+    pending = lazy_store.page(lazy.next_cursor, "tool")
+    assert lazy.results == list(range(10)) and pending.more is not None and pending.results == list(range(10))
+    rest = lazy_store.complete(lazy.next_cursor, "tool", list(range(10, 40)))
+    last = lazy_store.page(rest.next_cursor, "tool")
+    assert rest.results == list(range(10, 20)) and last.results == list(range(20, 25)) and last.truncated
+    assert lazy_store.page(lazy.next_cursor, "tool").more is None
+    print("  ✅ A set holding only its first page is completed when the next page is asked for")
+    
+    store.open("tool", list(range(40)), 10, render)
+    store.open("tool", list(range(40)), 10, render)
+    assert len(store) == 2 and store.page(first.next_cursor, "tool") is None and store.find("search", 3) is None
+    store.ttl = 0
+    time.sleep(0.01)
+    assert store.open("tool", list(range(40)), 10, render) and len(store) == 1
+    assert store.stats()["evictions"] == 1 and store.stats()["expired"] == 2
+    print("  ✅ The least recently paged set is evicted and expired sets are dropped")
+
+
+def test_paginated_tools():
+    """Test that rg_search_notes, rg_search_links and rg_search_backlinks page without searching again."""
+    with tempfile.TemporaryDirectory() as vault:
+        root = Path(vault)
+        _write_vault(root)
+        rg = RipgrepWrapper(vault)
+        
+        print("=== PAGINATED TOOLS TEST ===")
+        
+        original = server._rg
+        server._rg = rg
+        try:
+            pages = _pages(server.rg_search_notes, query=HUB_LINK, sort="path", max_results=10)
+            assert [page["total_matches"] for page in pages] == [10, 10, 5]
+            files = [result["file"] for page in pages for result in page["results"]]
+            assert files == [f"Note {number:02d}.md" for number in range(25)]
+            assert all(result["smart_context"] == "Links" for result in pages[-1]["results"])
+            assert pages[1]["query"] == HUB_LINK and pages[-1]["next_cursor"] is None
+            print("  ✅ rg_search_notes pages through every match in order, with smart context on each page")
+            
+            pages = _pages(server.rg_search_links, link_type="external_urls", sort="path", max_results=10)
+            urls = [link["url"] for page in pages for link in page["results"]]
+            assert len(pages) == 3 and urls == [f"https://example.com/{number}" for number in range(25)]
+            print("  ✅ rg_search_links pages through every link")
+            
+            pages = _pages(server.rg_search_backlinks, target_note="Hub", max_results=10)
+            backlinks = {backlink["file"] for page in pages for backlink in page["backlinks"]}
+            assert [page["total_backlinks"] for page in pages] == [10, 10, 5] and len(backlinks) == 25
+            print("  ✅ rg_search_backlinks pages through every backlink")
+            
+            limits = []
+            search_async = rg.search_async
+            
+            async def recording_search(query, search_scope, case_sensitive, folder, max_results, *args, **kwargs):
+                limits.append(max_results)
+                return await search_async(query, search_scope, case_sensitive, folder, max_results, *args, **kwargs)
+            
+            rg.search_async = recording_search
+            try:
+                pages = _pages(server.rg_search_notes, query=HUB_LINK, sort="none", max_results=10)
+            finally:
+                rg.search_async = search_async
+            files = [result["file"] for page in pages for result in page["results"]]
+            assert [page["total_matches"] for page in pages] == [10, 10, 5] and len(set(files)) == 25
+            assert limits == [11, rg.cursors.max_results + 1]
+            print("  ✅ sort none searches for one page, and for the rest when the next page is asked for")
+            
+            rg.cursors.max_results = 20
+            try:
+                pages = _pages(server.rg_search_notes, query=HUB_LINK, sort="path", max_results=10)
+            finally:
+                rg.cursors.max_results = 500
+            assert [page["total_matches"] for page in pages] == [10, 10]
+            assert pages[-1]["truncated"] is True and "truncated" not in pages[0]
+            print("  ✅ Result sets cut at the cursor limit say so on their last page")
+            
+            cursor = json.loads(asyncio.run(server.rg_search_notes(HUB_LINK, max_results=10)))["next_cursor"]
+            error = json.loads(asyncio.run(server.rg_search_links(cursor=cursor)))
+            assert "error" in error and "error" in json.loads(asyncio.run(server.rg_search_notes(HUB_LINK, cursor="stale.10")))
+            print("  ✅ Unknown cursors and cursors of another tool are reported")
+            
+            rg.start_watching(poll_interval=3600, use_inotify=False)
+            try:
+                first = asyncio.run(server.rg_search_notes(HUB_LINK, sort="path", max_results=10))
+                pages_served = rg.cache_stats()["cursors"]["pages"]
+                assert asyncio.run(server.rg_search_notes(HUB_LINK, sort="path", max_results=10)) == first
+                assert rg.cache_stats()["cursors"]["pages"] == pages_served + 1
+                print("  ✅ A repeated search is served from its result set")
+                
+                (root / "Note 00.md").unlink()
+                rg.apply_changes([ChangeEvent("deleted", "Note 00.md")])
+                repeated = json.loads(asyncio.run(server.rg_search_notes(HUB_LINK, sort="path", max_results=10)))
+                assert repeated["results"][0]["file"] == "Note 01.md"
+                assert json.loads(first)["next_cursor"] != repeated["next_cursor"]
+                print("  ✅ After a change the search runs again with a new result set")
+            finally:
+                rg.stop_watching()
+        finally:
+            server._rg = original
+
+
+if __name__ == "__main__":
+    test_cursor_store()
+    test_paginated_tools()
\ No newline at end of file
@@ -0,0 +1,115 @@
+#!/usr/bin/env python3
+"""Test the frontmatter boundary table behind scoped searches."""
+
+import asyncio
+import os
+import subprocess
+import sys
+import tempfile
+from pathlib import Path
+
+# Add src to path
+sys.path.insert(0, str(Path(__file__).parent / "src"))
+
+from rgrep_mcp.frontmatter import read_frontmatter
+from rgrep_mcp.ripgrep import RipgrepWrapper
+
+
+def test_read_frontmatter():
+    """Test that only the frontmatter block is read, with ParsedNote's rules."""
+    with tempfile.TemporaryDirectory() as vault:
+        root = Path(vault)
+        cases = {
+            "plain.md": (b"# No frontmatter\n---\n", None, b""),
+            "crlf.md": (b"---\r\ntitle: A\r\n---\r\nbody\r\n", 3, b"---\r\ntitle: A\r\n---\r\n"),
+            "eof.md": (b"---\ntitle: B\n---", 3, b"---\ntitle: B\n---\n"),
+            "open.md": (b"---\ntitle: C\nno closing line\n", None, b""),
+            "empty.md": (b"", None, b""),
+        }
+        
+        print("=== READ FRONTMATTER TEST ===")
+        
+        for name, (content, end_line, block) in cases.items():
+            (root / name).write_bytes(content)
+            assert read_frontmatter(root / name) == (end_line, block), name
+        print("  ✅ Boundaries found for LF, CRLF and unterminated notes")
+
+
+def _write_vault(root: Path) -> None:
+    """Create notes whose bodies are full of matches."""
+    body = "\n".join(f"status update {n}" for n in range(200))
+    for i in range(10):
+        (root / f"Note {i}.md").write_text(
+            f"---\nstatus: draft-{i}\n---\n# Note {i}\n\n{body}\n", encoding="utf-8"
+        )
+    (root / "Plain.md").write_text(f"# Plain\n\n{body}\n", encoding="utf-8")
+
+
+def test_scoped_searches():
+    """Test exact scoped results without scanning bodies for frontmatter_only."""
+    with tempfile.TemporaryDirectory() as vault:
+        _write_vault(Path(vault))
+        rg = RipgrepWrapper(vault)
+        
+        print("=== FRONTMATTER TABLE SEARCH TEST ===")
+        
+        commands = []
+        original_popen = subprocess.Popen
+        
+        def recording_popen(cmd, *args, **kwargs):
+            commands.append(cmd)
+            return original_popen(cmd, *args, **kwargs)
+        
+        subprocess.Popen = recording_popen
+        try:
+            results = rg.search_frontmatter_only("status", max_results=50, smart_context=False)
+        finally:
+            subprocess.Popen = original_popen
+        
+        assert commands and "-" in commands[-1] and vault not in commands[-1], commands
+        assert sorted(r["file"] for r in results) == [f"Note {i}.md" for i in range(10)], results
+        assert all(r["line_number"] == 2 for r in results), results
+        print("  ✅ frontmatter_only searches only frontmatter blocks on stdin")
+        
+        results = rg.search_frontmatter_only("status", max_results=4, smart_context=False)
+        assert len(results) == 4
+        print("  ✅ 200 body matches per note do not starve frontmatter_only")
+        
+        results = rg.search_content_only("status", max_results=50, smart_context=False, sort="path")
+        assert len(results) == 50 and all(r["line_number"] > 3 for r in results), results
+        print("  ✅ content_only skips frontmatter lines using the table")
+        
+        async_results = asyncio.run(rg.search_async("status", "frontmatter_only", max_results=50))
+        assert len(async_results) == 10
+        assert {r["smart_context"] for r in async_results} == {"status"}, async_results
+        print("  ✅ Async frontmatter_only search matches")
+
+
+def test_table_reuses_unchanged_notes():
+    """Test that only edited notes have their frontmatter re-read."""
+    with tempfile.TemporaryDirectory() as vault:
+        _write_vault(Path(vault))
+        rg = RipgrepWrapper(vault)
+        
+        print("=== FRONTMATTER TABLE REUSE TEST ===")
+        
+        rg.search_frontmatter_only("status", smart_context=False)
+        assert rg.frontmatter.reads == 11, rg.frontmatter.reads
+        rg.search_frontmatter_only("draft", smart_context=False)
+        assert rg.frontmatter.reads == 11, rg.frontmatter.reads
+        
+        path = Path(vault) / "Plain.md"
+        path.write_text("---\nstatus: new\n---\n# Plain\n", encoding="utf-8")
+        stat = path.stat()
+        os.utime(path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000))
+        
+        results = rg.search_frontmatter_only("new", smart_context=False)
+        assert [(r["file"], r["line_number"]) for r in results] == [("Plain.md", 2)], results
+        assert rg.frontmatter.reads == 12, rg.frontmatter.reads
+        print("  ✅ Edited note re-read, unchanged notes reused")
+
+
+if __name__ == "__main__":
+    test_read_frontmatter()
+    test_scoped_searches()
+    test_table_reuses_unchanged_notes()
\ No newline at end of file
@@ -0,0 +1,95 @@
+#!/usr/bin/env python3
+"""Test the bytes-level ripgrep JSON parser."""
+
+import json
+import subprocess
+import sys
+import tempfile
+from pathlib import Path
+
+# Add src to path
+sys.path.insert(0, str(Path(__file__).parent / "src"))
+
+from rgrep_mcp import ripgrep
+from rgrep_mcp.ripgrep import RipgrepWrapper
+
+
+def _rg_output(rg: RipgrepWrapper, pattern: str) -> bytes:
+    """Return real ripgrep JSON output for ``pattern``, with context messages."""
+    cmd = rg._build_rg_command(pattern, max_count=None)
+    cmd.insert(1, "--context=1")
+    return subprocess.run(cmd, capture_output=True).stdout
+
+
+def test_parser_matches_messages():
+    """Test that only match messages are decoded, with either decoder."""
+    with tempfile.TemporaryDirectory() as vault:
+        root = Path(vault)
+        (root / "Daily").mkdir()
+        (root / "Daily" / "Note.md").write_text("intro\nmeeting \"quoted\" ☕\noutro\nmeeting again\n", encoding="utf-8")
+        (root / "Other.md").write_text("no match here\n", encoding="utf-8")
+        rg = RipgrepWrapper(vault)
+        
+        print("=== JSON PARSER TEST ===")
+        
+        output = _rg_output(rg, "meeting")
+        decoded = []
+        loads = ripgrep._json_loads
+        
+        def counting_loads(line):
+            decoded.append(line)
+            return loads(line)
+        
+        ripgrep._json_loads = counting_loads
+        try:
+            results = rg._parse_rg_json_output(output)
+        finally:
+            ripgrep._json_loads = loads
+        
+        assert [(r["file"], r["line_number"], r["text"]) for r in results] == [
+            (str(Path("Daily") / "Note.md"), 2, "meeting \"quoted\" ☕\n"),
+            (str(Path("Daily") / "Note.md"), 4, "meeting again\n"),
+        ], results
+        assert (results[0]["match_start"], results[0]["match_end"]) == (0, 7)
+        assert len(decoded) == 2 and len(output.splitlines()) > 5
+        print(f"  ✅ {len(output.splitlines())} messages, only the 2 matches decoded ({ripgrep.JSON_PARSER})")
+        
+        ripgrep._json_loads = ripgrep._stdlib_json_loads
+        try:
+            assert rg._parse_rg_json_output(output) == results
+            assert rg._parse_rg_json_output(output.decode("utf-8")) == results
+        finally:
+            ripgrep._json_loads = loads
+        print("  ✅ Standard library decoder and str input give the same results")
+
+
+def test_unusual_lines():
+    """Test spacing, non-UTF-8 data and malformed lines."""
+    with tempfile.TemporaryDirectory() as vault:
+        rg = RipgrepWrapper(vault)
+        
+        print("=== UNUSUAL LINES TEST ===")
+        
+        path = str(Path(vault) / "Spaced.md")
+        spaced = json.dumps({"type": "match", "data": {
+            "path": {"text": path}, "lines": {"text": "hit\n"}, "line_number": 3,
+            "absolute_offset": 0, "submatches": [{"match": {"text": "hit"}, "start": 0, "end": 3}],
+        }}).encode("utf-8")
+        assert rg._parse_rg_json_line(spaced)["file"] == "Spaced.md"
+        print("  ✅ Match messages are decoded whatever their spacing")
+        
+        raw = json.dumps({"type": "match", "data": {
+            "path": {"text": path}, "lines": {"bytes": "/w=="}, "line_number": 1,
+            "absolute_offset": 0, "submatches": [],
+        }}, separators=(",", ":")).encode("utf-8")
+        assert rg._parse_rg_json_line(raw) == {
+            "file": "Spaced.md", "line_number": 1, "text": "", "match_start": 0, "match_end": 0,
+        }
+        assert rg._parse_rg_json_line(b'{"type":"match","data":') is None
+        assert rg._parse_rg_json_line(b"") is None
+        print("  ✅ Non-UTF-8 lines, truncated and empty lines handled")
+
+
+if __name__ == "__main__":
+    test_parser_matches_messages()
+    test_unusual_lines()
\ No newline at end of file
@@ -0,0 +1,81 @@
+#!/usr/bin/env python3
+"""Test the in-memory link graph behind backlink queries."""
+
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+# Add src to path
+sys.path.insert(0, str(Path(__file__).parent / "src"))
+
+from rgrep_mcp.ripgrep import RipgrepWrapper
+
+
+def _write_vault(root: Path) -> None:
+    """Create a small vault with a mix of link styles."""
+    notes = {
+        "Meeting.md": "# Meeting\n\nAgenda for [[Project Ideas]].\n",
+        "Meetings 2024.md": "# Meetings 2024\n\nNot the same note as Meeting.\n",
+        "Project Ideas.md": "---\nrelated: \"[[Meeting]]\"\n---\n# Ideas\n\n## Links\nBack to [[Meeting#Agenda|the meeting]].\n",
+        "Daily/2024-01-15.md": "# Log\n\nSee [[Meetings 2024]] and [notes](../Meeting.md).\n",
+        "Daily/2024-01-16.md": "# Log\n\nLink to [[meeting]] in lowercase.\n",
+    }
+    for name, content in notes.items():
+        path = root / name
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_text(content, encoding="utf-8")
+
+
+def test_backlinks_from_graph():
+    """Test that backlinks resolve exactly and come from the cached graph."""
+    with tempfile.TemporaryDirectory() as vault:
+        _write_vault(Path(vault))
+        rg = RipgrepWrapper(vault)
+        
+        print("=== LINK GRAPH BACKLINKS TEST ===")
+        
+        backlinks = rg.find_backlinks("Meeting.md", smart_context=False, max_results=50)
+        sources = sorted((Path(b["file"]).as_posix(), b["line_number"]) for b in backlinks)
+        print(f"Backlinks to Meeting.md: {sources}")
+        
+        # [[Meetings 2024]] must not count as a link to Meeting.md
+        assert sources == [
+            ("Daily/2024-01-15.md", 3),
+            ("Daily/2024-01-16.md", 3),
+            ("Project Ideas.md", 2),
+            ("Project Ideas.md", 7),
+        ], sources
+        print("  ✅ Wiki, aliased, heading and relative markdown links resolved")
+        
+        in_folder = rg.find_backlinks("Meeting", folder="Daily", smart_context=False)
+        assert {Path(b["file"]).parent.name for b in in_folder} == {"Daily"}, in_folder
+        print("  ✅ Folder filter applied to linking notes")
+        
+        exact_case = rg.find_backlinks("Meeting", case_sensitive=True, smart_context=False)
+        exact_sources = {Path(b["file"]).as_posix() for b in exact_case}
+        assert "Daily/2024-01-16.md" not in exact_sources and len(exact_case) == 3, exact_case
+        print("  ✅ case_sensitive keeps only links written with the note's casing")
+        
+        with_context = rg.find_backlinks("Meeting", smart_context=True, max_results=50)
+        contexts = {b.get("smart_context") for b in with_context}
+        assert "related" in contexts and "Links" in contexts, contexts
+        print("  ✅ Smart context added to backlinks")
+        
+        graph = rg.get_link_graph()
+        assert rg.get_link_graph() is graph
+        start = time.perf_counter()
+        for _ in range(1000):
+            graph.backlinks("Meeting.md")
+        per_query = (time.perf_counter() - start) / 1000
+        print(f"  Warm backlink lookup: {per_query * 1e6:.1f} µs")
+        assert per_query < 0.001
+        print("  ✅ Warm queries reuse the graph and take under a millisecond")
+        
+        rg.invalidate_link_graph()
+        assert rg.get_link_graph() is not graph
+        print("  ✅ Graph is rebuilt after invalidation")
+
+
+if __name__ == "__main__":
+    test_backlinks_from_graph()
\ No newline at end of file
@@ -0,0 +1,118 @@
+#!/usr/bin/env python3
+"""Test that links resolve like Obsidian: by path, file name, partial path and alias."""
+
+import sys
+import tempfile
+from pathlib import Path
+
+# Add src to path
+sys.path.insert(0, str(Path(__file__).parent / "src"))
+
+from rgrep_mcp.links import LinkGraph, parse_aliases
+from rgrep_mcp.ripgrep import RipgrepWrapper
+from rgrep_mcp.watcher import ChangeEvent
+
+
+def _write_vault(root: Path) -> None:
+    """Create a vault with aliases, duplicate file names and partial-path links."""
+    notes = {
+        "Meeting.md": "---\naliases: [Standup, \"Daily Sync\"]\n---\n# Meeting\n",
+        "Meetings 2024.md": "---\naliases:\n  - Yearly\n---\n# Meetings 2024\n",
+        "Work/Plans/Roadmap.md": "# Roadmap\n",
+        "Archive/Plans/Roadmap.md": "# Old roadmap\n",
+        "Index.md": (
+            "# Index\n"
+            "[[Standup]] and [[daily sync|the sync]]\n"
+            "[[Work/Plans/Roadmap]] vs [[Archive/Plans/Roadmap]]\n"
+            "[[Plans/Roadmap]] and [[Yearly]]\n"
+            "aliases: Body text, not frontmatter\n"
+        ),
+    }
+    for name, content in notes.items():
+        path = root / name
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_text(content, encoding="utf-8")
+
+
+def test_parse_aliases():
+    """Test the frontmatter forms aliases are written in."""
+    print("=== ALIAS PARSING TEST ===")
+    
+    assert parse_aliases(["---", "aliases: [One, 'Two', \"Three\"]", "---"]) == ["One", "Two", "Three"]
+    assert parse_aliases(["---", "aliases:", "  - One", "- Two", "tags: x", "---"]) == ["One", "Two"]
+    assert parse_aliases(["---", "alias: Solo", "---"]) == ["Solo"]
+    assert parse_aliases(["# Title", "aliases: [Body]"]) == []
+    assert parse_aliases(["---", "title: x", "---", "aliases: [After]"]) == []
+    print("  ✅ Inline lists, block lists and single values; frontmatter only")
+
+
+def test_resolution_order():
+    """Test how path, file name, partial path and alias lookups combine."""
+    print("=== LINK RESOLUTION TEST ===")
+    
+    graph = LinkGraph(["Meeting.md", "Work/Plans/Roadmap.md", "Archive/Plans/Roadmap.md", "Deep/A/Roadmap.md"])
+    graph.set_aliases("Work/Plans/Roadmap.md", ["Meeting", "Plan"])
+    
+    assert graph.resolve("Meeting") == "Meeting.md"
+    print("  ✅ A note's file name wins over another note's alias")
+    
+    assert graph.resolve("plan") == "Work/Plans/Roadmap.md"
+    assert graph.resolve("Unknown") is None
+    print("  ✅ Aliases resolve case-insensitively")
+    
+    assert graph.resolve("Plans/Roadmap") == "Archive/Plans/Roadmap.md"
+    assert graph.resolve("A/Roadmap") == "Deep/A/Roadmap.md"
+    assert graph.resolve("lans/Roadmap") is None
+    print("  ✅ Partial paths match whole trailing folders, shallowest note first")
+    
+    graph.set_aliases("Work/Plans/Roadmap.md", [])
+    assert graph.resolve("Plan") is None
+    print("  ✅ Cleared aliases stop resolving")
+
+
+def test_backlinks_through_aliases():
+    """Test backlinks and graph updates for aliased and partial-path links."""
+    with tempfile.TemporaryDirectory() as vault:
+        root = Path(vault)
+        _write_vault(root)
+        rg = RipgrepWrapper(vault)
+        
+        print("=== ALIAS BACKLINKS TEST ===")
+        
+        graph = rg.get_link_graph()
+        assert graph.aliases == {"Meeting.md": ["Standup", "Daily Sync"], "Meetings 2024.md": ["Yearly"]}, graph.aliases
+        print("  ✅ Aliases indexed from frontmatter only")
+        
+        backlinks = rg.find_backlinks("Meeting", smart_context=False)
+        assert [b["line_number"] for b in backlinks] == [2, 2], backlinks
+        assert [b["line_number"] for b in rg.find_backlinks("Meetings 2024", smart_context=False)] == [4]
+        print("  ✅ [[Standup]] and [[daily sync]] link to Meeting.md, [[Yearly]] to Meetings 2024.md")
+        
+        exact = rg.find_backlinks("Meeting", case_sensitive=True, smart_context=False)
+        assert len(exact) == 1, exact
+        print("  ✅ case_sensitive compares the linked name with the alias exactly")
+        
+        work = rg.find_backlinks("Work/Plans/Roadmap.md", smart_context=False)
+        archive = rg.find_backlinks("Archive/Plans/Roadmap.md", smart_context=False)
+        assert [b["line_number"] for b in work] == [3], work
+        assert sorted(b["line_number"] for b in archive) == [3, 4], archive
+        print("  ✅ Path-qualified links pick the matching note among same-named ones")
+        
+        (root / "Meeting.md").write_text("---\naliases: [Huddle]\n---\n# Meeting\n", encoding="utf-8")
+        (root / "Index.md").write_text("# Index\n[[Standup]] then [[Huddle]]\n", encoding="utf-8")
+        rg.apply_changes([ChangeEvent("modified", "Meeting.md"), ChangeEvent("modified", "Index.md")])
+        assert rg.get_link_graph() is graph
+        assert graph.resolve("Standup") is None and graph.resolve("Huddle") == "Meeting.md"
+        assert [b["text"] for b in rg.find_backlinks("Meeting", smart_context=False)] == ["[[Standup]] then [[Huddle]]"]
+        print("  ✅ Edited aliases are re-indexed incrementally")
+        
+        (root / "Meeting.md").unlink()
+        rg.apply_changes([ChangeEvent("deleted", "Meeting.md")])
+        assert graph.resolve("Huddle") is None and "Meeting.md" not in graph.aliases
+        print("  ✅ Deleting a note drops its aliases")
+
+
+if __name__ == "__main__":
+    test_parse_aliases()
+    test_resolution_order()
+    test_backlinks_through_aliases()
\ No newline at end of file
@@ -0,0 +1,68 @@
+#!/usr/bin/env python3
+"""Test the single-pass link tokenizer shared by the link tools."""
+
+import sys
+import tempfile
+from pathlib import Path
+
+# Add src to path
+sys.path.insert(0, str(Path(__file__).parent / "src"))
+
+from rgrep_mcp.links import LinkToken, extract_note_targets, tokenize_links
+from rgrep_mcp.ripgrep import RipgrepWrapper
+
+
+LINE = (
+    "See [[Projects/Alpha#Goals|the goals]], ![[Diagram.png]] and [[Beta#^block-1]]; "
+    "[docs](https://example.com/docs) [local](Sub%20Folder/Gamma.md#Plan) https://bare.org/x"
+)
+
+
+def test_tokenize_links():
+    """Test link kinds, wiki link parts and embeds."""
+    print("=== LINK TOKENIZER TEST ===")
+    
+    tokens = tokenize_links(LINE)
+    assert [t.kind for t in tokens] == [
+        "wiki_link", "wiki_link", "wiki_link", "markdown_link", "external_url", "markdown_link", "external_url",
+    ], tokens
+    assert tokens[0] == LinkToken(
+        "wiki_link", "Projects/Alpha#Goals|the goals", "Projects/Alpha#Goals|the goals",
+        "Projects/Alpha", "Goals", "", "the goals", False
+    )
+    assert (tokens[1].target, tokens[1].embed) == ("Diagram.png", True)
+    assert (tokens[2].target, tokens[2].heading, tokens[2].block) == ("Beta", "", "block-1")
+    print("  ✅ Wiki links split into target, heading, block and alias; embeds marked")
+    
+    assert (tokens[3].title, tokens[3].url, tokens[3].target) == ("docs", "https://example.com/docs", "")
+    assert tokens[4].url == "https://example.com/docs" and tokens[6].url == "https://bare.org/x"
+    assert (tokens[5].target, tokens[5].heading) == ("Sub Folder/Gamma.md", "Plan")
+    print("  ✅ Markdown links, their web URLs and bare URLs in line order")
+    
+    assert extract_note_targets(LINE) == ["Projects/Alpha", "Diagram.png", "Beta", "Sub Folder/Gamma.md"]
+    assert tokenize_links("no links here") == [] and tokenize_links("[[]] [x]") == []
+    print("  ✅ Note targets match the tokens")
+
+
+def test_find_links_uses_tokens():
+    """Test link types, filters and embeds in find_links."""
+    with tempfile.TemporaryDirectory() as vault:
+        (Path(vault) / "Note.md").write_text(LINE + "\n", encoding="utf-8")
+        rg = RipgrepWrapper(vault)
+        
+        print("=== FIND LINKS TEST ===")
+        
+        wiki = rg.find_links(link_type="wiki_links")
+        assert [l["title"] for l in wiki] == ["Projects/Alpha#Goals|the goals", "Diagram.png", "Beta#^block-1"], wiki
+        assert [l.get("embed", False) for l in wiki] == [False, True, False]
+        assert {l["link_type"] for l in rg.find_links(link_type="external_urls")} == {"external_url"}
+        print("  ✅ Only the requested link type is returned")
+        
+        filtered = rg.find_links(url_pattern="EXAMPLE", title_pattern="^d")
+        assert [(l["link_type"], l["title"]) for l in filtered] == [("markdown_link", "docs")], filtered
+        print("  ✅ URL and title filters applied case-insensitively")
+
+
+if __name__ == "__main__":
+    test_tokenize_links()
+    test_find_links_uses_tokens()
\ No newline at end of file
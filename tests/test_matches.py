@@ -0,0 +1,81 @@
+#!/usr/bin/env python3
+"""Test the compact match records searches return."""
+
+import sys
+import tempfile
+import tracemalloc
+from pathlib import Path
+
+# Add src to path
+sys.path.insert(0, str(Path(__file__).parent / "src"))
+
+from rgrep_mcp.matches import Match
+from rgrep_mcp.ripgrep import RipgrepWrapper
+
+
+def test_match_record():
+    """Test attribute access and the dict view of a match."""
+    match = Match("Daily/Note.md", 4, "meeting notes\n", 0, 7)
+    
+    print("=== MATCH RECORD TEST ===")
+    
+    assert not hasattr(match, "__dict__")
+    assert match["file"] == match.file == "Daily/Note.md" and match.get("text") == "meeting notes\n"
+    assert "smart_context" not in match and match.get("smart_context", "none") == "none"
+    assert match.to_dict() == {
+        "file": "Daily/Note.md", "line_number": 4, "text": "meeting notes\n", "match_start": 0, "match_end": 7,
+    }
+    try:
+        match["smart_context"]
+    except KeyError:
+        pass
+    else:
+        raise AssertionError("smart_context must be missing until it is set")
+    print("  ✅ Item access and to_dict match the dicts searches used to return")
+    
+    match.smart_context = "Meetings"
+    assert match["smart_context"] == "Meetings" and dict(match) == dict(match.to_dict())
+    moved = match.with_span(8, 13)
+    assert (moved.match_start, moved.smart_context) == (8, "Meetings") and match.match_start == 0
+    assert moved != match and moved.with_span(0, 7) == match
+    print("  ✅ Smart context shows up once set; with_span copies")
+
+
+def test_smart_context_in_place():
+    """Test that smart context is set on the matches without copying them."""
+    with tempfile.TemporaryDirectory() as vault:
+        (Path(vault) / "Note.md").write_text("# Plans\n\nbudget review\n", encoding="utf-8")
+        rg = RipgrepWrapper(vault)
+        
+        print("=== SMART CONTEXT TEST ===")
+        
+        results = rg.search_content("budget", smart_context=False)
+        assert [type(r) for r in results] == [Match] and "smart_context" not in results[0]
+        enhanced = rg._add_smart_context(results)
+        assert enhanced is results and enhanced[0].smart_context == "Plans"
+        print("  ✅ Matches enriched in place")
+
+
+def test_records_smaller_than_dicts():
+    """Test that match records take less memory than per-match dicts."""
+    print("=== MATCH MEMORY TEST ===")
+    
+    def peak(make) -> int:
+        tracemalloc.start()
+        try:
+            items = [make(i) for i in range(10000)]
+            assert len(items) == 10000
+            return tracemalloc.get_traced_memory()[1]
+        finally:
+            tracemalloc.stop()
+    
+    records = peak(lambda i: Match("Note.md", i, "text", 0, 4))
+    dicts = peak(lambda i: {"file": "Note.md", "line_number": i, "text": "text", "match_start": 0, "match_end": 4})
+    assert records < dicts * 0.7, (records, dicts)
+    print(f"  ✅ 10k records: {records // 1024} KiB, 10k dicts: {dicts // 1024} KiB")
+
+
+if __name__ == "__main__":
+    test_match_record()
+    test_smart_context_in_place()
+    test_records_smaller_than_dicts()
\ No newline at end of file
@@ -0,0 +1,101 @@
+#!/usr/bin/env python3
+"""Test the mtime index behind recent-note searches."""
+
+import os
+import sys
+import tempfile
+from datetime import datetime
+from pathlib import Path
+
+# Add src to path
+sys.path.insert(0, str(Path(__file__).parent / "src"))
+
+from rgrep_mcp.mtimes import MtimeIndex
+from rgrep_mcp.ripgrep import RipgrepWrapper
+
+
+def _touch(path: Path, day: str, hour: int = 12) -> None:
+    """Create a note modified at a given local day and hour."""
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_text(f"# {path.stem}\n", encoding="utf-8")
+    ts = datetime.strptime(day, "%Y-%m-%d").replace(hour=hour).timestamp()
+    os.utime(path, (ts, ts))
+
+
+def _write_vault(root: Path) -> None:
+    """Create notes spread over January 2024."""
+    for day in range(1, 21):
+        _touch(root / "Daily" / f"2024-01-{day:02d}.md", f"2024-01-{day:02d}")
+    _touch(root / "Projects" / "Alpha.md", "2024-01-15", hour=23)
+    _touch(root / "Projects" / "Beta.md", "2024-01-10")
+    _touch(root / ".hidden.md", "2024-01-16")
+    _touch(root / "Daily Archive" / "Old.md", "2024-01-16")
+
+
+def test_date_range_queries():
+    """Test date bounds, folder prefixes and limits against the index."""
+    with tempfile.TemporaryDirectory() as vault:
+        _write_vault(Path(vault))
+        rg = RipgrepWrapper(vault)
+        
+        print("=== MTIME INDEX QUERY TEST ===")
+        
+        files = rg.get_files_by_date_range("2024-01-14", "2024-01-15")
+        assert [f["file"] for f in files] == [
+            os.path.join("Projects", "Alpha.md"),
+            os.path.join("Daily", "2024-01-15.md"),
+            os.path.join("Daily", "2024-01-14.md"),
+        ], files
+        assert files[0]["modified_date"] == "2024-01-15"
+        print("  ✅ end_date includes its whole day, newest first")
+        
+        daily = rg.get_files_by_date_range(folder="Daily", limit=3)
+        assert [f["file"] for f in daily] == [
+            os.path.join("Daily", f"2024-01-{day}.md") for day in (20, 19, 18)
+        ], daily
+        print("  ✅ Folder prefix filter stops after the limit")
+        
+        everything = rg.get_files_by_date_range()
+        assert len(everything) == 23 and ".hidden.md" not in {f["file"] for f in everything}
+        assert rg.get_files_by_date_range("not-a-date") == []
+        print("  ✅ Hidden notes skipped and invalid dates return nothing")
+
+
+def test_incremental_updates():
+    """Test that updates and removals keep the sorted order."""
+    index = MtimeIndex()
+    for i in range(10):
+        index.update(f"Note {i}.md", float(i))
+    
+    print("=== MTIME INDEX UPDATE TEST ===")
+    
+    index.update("Note 2.md", 100.0)
+    index.remove("Note 9.md")
+    assert index.newest(limit=3) == [("Note 2.md", 100.0), ("Note 8.md", 8.0), ("Note 7.md", 7.0)]
+    assert index.newest(start=3.0, end=5.0) == [("Note 4.md", 4.0), ("Note 3.md", 3.0)]
+    assert len(index) == 9 and "Note 9.md" not in index
+    print("  ✅ Moved and removed notes reflected without a rescan")
+
+
+def test_index_is_reused():
+    """Test that queries reuse the index until it is invalidated."""
+    with tempfile.TemporaryDirectory() as vault:
+        _write_vault(Path(vault))
+        rg = RipgrepWrapper(vault)
+        
+        print("=== MTIME INDEX REUSE TEST ===")
+        
+        index = rg.get_mtime_index()
+        _touch(Path(vault) / "New.md", "2024-02-01")
+        assert rg.get_mtime_index() is index
+        assert rg.get_files_by_date_range(limit=1)[0]["file"] != "New.md"
+        
+        rg.invalidate_mtime_index()
+        assert rg.get_files_by_date_range(limit=1)[0]["file"] == "New.md"
+        print("  ✅ Index reused between queries and rescanned after invalidation")
+
+
+if __name__ == "__main__":
+    test_date_range_queries()
+    test_incremental_updates()
+    test_index_is_reused()
\ No newline at end of file
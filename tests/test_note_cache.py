@@ -0,0 +1,127 @@
+#!/usr/bin/env python3
+"""Test the parsed-note cache used by smart context and scope filtering."""
+
+import os
+import sys
+import tempfile
+from pathlib import Path
+
+# Add src to path
+sys.path.insert(0, str(Path(__file__).parent / "src"))
+
+from rgrep_mcp.notes import NoteCache, ParsedNote
+from rgrep_mcp.ripgrep import RipgrepWrapper
+
+
+NOTE = """---
+title: Cache Test
+collaborators:
+  - Alice
+  - Bob
+---
+# Introduction
+
+Alice wrote this.
+
+## Team Members
+- Alice
+- Bob
+"""
+
+
+def test_parsed_note():
+    """Test frontmatter and heading positions of a parsed note."""
+    note = ParsedNote(NOTE)
+    print("=== PARSED NOTE TEST ===")
+    
+    assert note.frontmatter_end == 6
+    assert note.is_in_frontmatter(4) and not note.is_in_frontmatter(7)
+    assert note.headings == [(7, "Introduction"), (11, "Team Members")]
+    assert note.heading_for_line(9) == "Introduction"
+    assert note.heading_for_line(13) == "Team Members"
+    assert note.heading_for_line(3) is None
+    assert note.line_offsets[1] == len("---\n")
+    print("  ✅ Frontmatter end, headings and line offsets parsed")
+    
+    assert note.properties == [(2, "title"), (3, "collaborators")]
+    assert [note.property_for_line(n) for n in (2, 3, 4, 5)] == [
+        "title", None, "collaborators", "collaborators"
+    ]
+    
+    nested = ParsedNote("---\nproject:\n  status: open\n  team:\n    - Alice\n---\n")
+    assert nested.properties == [(2, "project"), (3, "project.status"), (4, "project.team")]
+    assert nested.property_for_line(3) == "status" and nested.property_for_line(5) == "team"
+    print("  ✅ Frontmatter outline maps lines to properties, nested keys included")
+
+
+def test_cache_reuses_unchanged_notes():
+    """Test that repeated queries only read notes that changed."""
+    with tempfile.TemporaryDirectory() as vault:
+        note_path = Path(vault) / "Cache Test.md"
+        note_path.write_text(NOTE, encoding="utf-8")
+        rg = RipgrepWrapper(vault)
+        
+        print("=== NOTE CACHE TEST ===")
+        
+        results = rg.search_content_only("Alice", smart_context=True)
+        contexts = sorted(r["smart_context"] for r in results)
+        print(f"Content contexts: {contexts}")
+        assert contexts == ["Introduction", "Team Members"], contexts
+        
+        fm_results = rg.search_frontmatter_only("Alice", smart_context=True)
+        assert [r["smart_context"] for r in fm_results] == ["collaborators"], fm_results
+        print("  ✅ Smart context unchanged with cached notes")
+        
+        # Filtering and smart context for several matches share one read
+        assert rg.note_cache.misses == 1, rg.note_cache.misses
+        print(f"  ✅ One disk read for {len(results) + len(fm_results)} matches")
+        
+        note_path.write_text(NOTE.replace("## Team Members", "## People"), encoding="utf-8")
+        stat = note_path.stat()
+        os.utime(note_path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000))
+        
+        results = rg.search_content_only("Bob", smart_context=True)
+        assert [r["smart_context"] for r in results] == ["People"], results
+        assert rg.note_cache.misses == 2, rg.note_cache.misses
+        print("  ✅ Edited note is re-read once its mtime changes")
+
+
+def test_cache_limits():
+    """Test entry and byte limits evict the least recently used notes."""
+    with tempfile.TemporaryDirectory() as vault:
+        paths = []
+        for i in range(5):
+            path = Path(vault) / f"Note {i}.md"
+            path.write_text("x" * 1000, encoding="utf-8")
+            paths.append(path)
+        
+        print("=== NOTE CACHE LIMITS TEST ===")
+        
+        cache = NoteCache(max_entries=3)
+        for path in paths:
+            cache.get(path)
+        assert len(cache) == 3
+        cache.get(paths[0])
+        assert cache.misses == 6, cache.misses
+        print("  ✅ Entry limit evicts least recently used notes")
+        
+        cache = NoteCache(max_bytes=2500)
+        for path in paths:
+            cache.get(path)
+        assert len(cache) == 2 and cache.size_bytes <= 2500, (len(cache), cache.size_bytes)
+        print("  ✅ Byte limit bounds cache memory")
+        
+        cache = NoteCache(max_entries=3)
+        cache.get(paths[0])
+        outlines = {str(path): (i, 1000, ParsedNote("# Old\n").state()) for i, path in enumerate(paths)}
+        cache.load_outlines(outlines)
+        assert set(cache.outlines()) == {str(paths[0]), str(paths[3]), str(paths[4])}
+        cache.get(paths[1])
+        assert set(cache.outlines()) == {str(paths[0]), str(paths[1]), str(paths[4])}
+        print("  ✅ Loaded outlines share the entry limit; the newest are kept and dropped before cached notes")
+
+
+if __name__ == "__main__":
+    test_parsed_note()
+    test_cache_reuses_unchanged_notes()
+    test_cache_limits()
\ No newline at end of file
@@ -0,0 +1,70 @@
+#!/usr/bin/env python3
+"""Test single-pass orphan detection."""
+
+import sys
+import tempfile
+from pathlib import Path
+
+# Add src to path
+sys.path.insert(0, str(Path(__file__).parent / "src"))
+
+from rgrep_mcp.ripgrep import RipgrepWrapper
+
+
+def _write_vault(root: Path) -> None:
+    """Create a small vault with linked and orphaned notes."""
+    notes = {
+        "Hub.md": "# Hub\n\nSee [[Projects/Alpha|the alpha project]] and [Beta](Projects/Beta.md).\n",
+        "Projects/Alpha.md": "# Alpha\n\nNo links out, but Hub links here.\n",
+        "Projects/Beta.md": "# Beta\n\nOnly linked by a markdown link.\n",
+        "Projects/Gamma.md": "# Gamma\n\nLinks to itself: [[Gamma#Top]]\n",
+        "Lonely.md": "# Lonely\n\nMentions Hub without linking to it.\n",
+        "Archive/Forgotten.md": "---\ntitle: Forgotten\n---\nNothing here.\n",
+        "Web.md": "Reference: https://example.com/page\n",
+    }
+    for name, content in notes.items():
+        path = root / name
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_text(content, encoding="utf-8")
+
+
+def test_orphaned_notes():
+    """Test that orphans are found in one pass with exact link resolution."""
+    with tempfile.TemporaryDirectory() as vault:
+        _write_vault(Path(vault))
+        rg = RipgrepWrapper(vault)
+        
+        print("=== ORPHANED NOTES TEST ===")
+        
+        orphaned = sorted(Path(note["file"]).as_posix() for note in rg.find_orphaned_notes())
+        print(f"Orphaned notes: {orphaned}")
+        
+        # Gamma only links to itself, which still counts as an outgoing link
+        assert orphaned == ["Archive/Forgotten.md", "Lonely.md"], orphaned
+        print("  ✅ Orphans found by set difference")
+        
+        in_folder = [Path(note["file"]).as_posix() for note in rg.find_orphaned_notes(folder="Archive")]
+        assert in_folder == ["Archive/Forgotten.md"], in_folder
+        print("  ✅ Folder filter limits candidates, not the link scan")
+
+
+def test_orphaned_notes_past_link_cap():
+    """Test that results stay correct with more links than the old 1000-link cap."""
+    with tempfile.TemporaryDirectory() as vault:
+        root = Path(vault)
+        links = "\n".join(f"- [[Target {i}]]" for i in range(1500))
+        (root / "Index.md").write_text(links, encoding="utf-8")
+        for i in range(1500):
+            (root / f"Target {i}.md").write_text("Body text\n", encoding="utf-8")
+        (root / "Stray.md").write_text("Body text\n", encoding="utf-8")
+        
+        rg = RipgrepWrapper(vault)
+        orphaned = [note["file"] for note in rg.find_orphaned_notes()]
+        print(f"Orphans with 1500 links: {orphaned}")
+        assert orphaned == ["Stray.md"], orphaned
+        print("  ✅ Links beyond the first 1000 are resolved")
+
+
+if __name__ == "__main__":
+    test_orphaned_notes()
+    test_orphaned_notes_past_link_cap()
\ No newline at end of file
@@ -0,0 +1,138 @@
+#!/usr/bin/env python3
+"""Test the frontmatter property index behind rg_query_properties."""
+
+import asyncio
+import json
+import sys
+import tempfile
+from pathlib import Path
+
+# Add src to path
+sys.path.insert(0, str(Path(__file__).parent / "src"))
+
+from rgrep_mcp import server
+from rgrep_mcp.properties import PropertyIndex, parse_properties
+from rgrep_mcp.ripgrep import RipgrepWrapper
+from rgrep_mcp.watcher import ChangeEvent
+
+
+def _write_vault(root: Path) -> None:
+    """Create notes with scalar, list, date and nested properties."""
+    notes = {
+        "Alpha.md": "---\nstatus: Active\npriority: 3\ndue: 2024-05-01\ntags: [work, urgent]\nproject:\n  owner: Ana\n---\n# Alpha\n",
+        "Beta.md": "---\nstatus: done\npriority: 1\ndue: 2024-03-15\ntags:\n  - home\n---\n# Beta\n",
+        "Work/Gamma.md": "---\nstatus: active\npriority: \"5\"\ndraft: true\n---\n# Gamma\n",
+        "Plain.md": "# Plain\n\nstatus: active in the body does not count\n",
+        "Broken.md": "---\nstatus: [unclosed\n---\n# Broken\n",
+    }
+    for name, content in notes.items():
+        path = root / name
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_text(content, encoding="utf-8")
+
+
+def test_index_predicates():
+    """Test equality, containment, range and existence on the index."""
+    print("=== PROPERTY PREDICATES TEST ===")
+    
+    assert parse_properties(b"---\ndue: 2024-05-01\nn: 2\n---\n") == {"due": "2024-05-01", "n": 2}
+    assert parse_properties(b"---\n- a list\n---\n") == {}
+    print("  ✅ Frontmatter parsed to JSON-friendly mappings")
+    
+    index = PropertyIndex()
+    index.set_properties("a", {"Status": "Active", "n": 3, "tags": ["x", "y"], "meta": {"owner": "Ana"}})
+    index.set_properties("b", {"status": "done", "n": "10", "tags": ["y"]})
+    index.set_properties("c", {"status": None, "n": 2.5, "flag": True})
+    
+    assert index.select("status", "eq", "active") == {"a"}
+    assert index.select("n", "eq", 10) == {"b"} and index.select("flag", "eq", "true") == {"c"}
+    assert index.select("meta.owner", "eq", "ana") == {"a"}
+    print("  ✅ Equality is case-insensitive, matches numbers and strings, and reaches nested keys")
+    
+    assert index.select("tags", "contains", "y") == {"a", "b"}
+    assert index.select("status", "contains", "on") == {"b"}
+    print("  ✅ Containment matches list items and substrings")
+    
+    assert index.select("n", "gt", 2.5) == {"a", "b"}
+    assert index.select("n", "gte", "2.5") == {"a", "b", "c"}
+    assert index.select("n", "lt", 3) == {"c"}
+    assert index.select("status", "lte", "b") == {"a"}
+    print("  ✅ Ranges bisect numbers, quoted numbers included, and text separately")
+    
+    odd = PropertyIndex()
+    for i, value in enumerate(["nan", 5, "Infinity", float("nan"), 1, "3", -2, "-inf"]):
+        odd.set_properties(f"n{i}", {"v": value})
+    assert odd.select("v", "gt", 2) == {"n1", "n5"} and odd.select("v", "lt", 2) == {"n4", "n6"}
+    assert odd.select("v", "gte", "nan") == {"n0"} and odd.select("v", "eq", "inf") == set()
+    print("  ✅ 'nan' and 'inf' stay text and NaN values are left out of numeric ranges")
+    
+    assert index.select("status", "exists") == {"a", "b", "c"} and index.select("flag", "exists") == {"c"}
+    index.set_properties("c", {"n": 1})
+    index.remove("a")
+    assert index.select("flag", "exists") == set() and index.select("n", "lt", 3) == {"c"}
+    print("  ✅ Replacing and removing notes keeps columns and sorted values current")
+    
+    try:
+        index.select("n", "between", 1)
+        assert False, "unknown operator accepted"
+    except ValueError:
+        print("  ✅ Unknown operators are rejected")
+
+
+def test_properties_in_vault():
+    """Test queries answered from the vault's frontmatter and kept current."""
+    with tempfile.TemporaryDirectory() as vault:
+        root = Path(vault)
+        _write_vault(root)
+        rg = RipgrepWrapper(vault)
+        
+        print("=== VAULT PROPERTY INDEX TEST ===")
+        
+        def files(conditions, **kwargs):
+            return sorted(note["file"] for note in rg.find_notes_by_properties(conditions, **kwargs))
+        
+        gamma = str(Path("Work/Gamma.md"))
+        assert files([{"property": "status", "value": "active"}]) == ["Alpha.md", gamma]
+        assert files([{"property": "status", "value": "active"}, {"property": "priority", "op": "gte", "value": 4}]) == [gamma]
+        assert files([{"property": "due", "op": "lt", "value": "2024-04-01"}]) == ["Beta.md"]
+        assert files([{"property": "tags", "op": "contains", "value": "URGENT"}]) == ["Alpha.md"]
+        assert files([{"property": "project.owner"}]) == ["Alpha.md"]
+        assert files([{"property": "status", "op": "missing"}]) == ["Broken.md", "Plain.md"]
+        assert files([{"property": "status", "value": "active"}], folder="Work") == [gamma]
+        print("  ✅ Conditions combine with AND; body text and invalid YAML are ignored")
+        
+        found = rg.find_notes_by_properties([{"property": "priority", "op": "gt", "value": 2}])
+        assert {note["file"]: note["properties"] for note in found}["Alpha.md"] == {"priority": 3}
+        print("  ✅ Results carry the values of the queried properties")
+        
+        index = rg.get_property_index()
+        (root / "Beta.md").write_text("---\nstatus: active\n---\n# Beta\n", encoding="utf-8")
+        (root / "Alpha.md").unlink()
+        rg.apply_changes([ChangeEvent("modified", "Beta.md"), ChangeEvent("deleted", "Alpha.md")])
+        assert rg.get_property_index() is index
+        assert files([{"property": "status", "value": "active"}]) == ["Beta.md", gamma]
+        print("  ✅ Changed and deleted notes are re-indexed in place")
+        
+        (root / "Plain.md").write_text("---\nstatus: new\n---\n", encoding="utf-8")
+        rg.mtime_index_ttl = 0
+        rg.get_property_index()
+        assert files([{"property": "status", "value": "new"}]) == ["Plain.md"]
+        print("  ✅ An expired index re-reads changed notes")
+        
+        original = server._rg
+        server._rg = rg
+        try:
+            listing = json.loads(asyncio.run(server.rg_query_properties()))
+            assert {"property": "status", "notes": 3} in listing["properties"], listing
+            result = json.loads(asyncio.run(server.rg_query_properties(where=[{"property": "draft", "value": True}])))
+            assert [note["file"] for note in result["notes"]] == [gamma], result
+            error = json.loads(asyncio.run(server.rg_query_properties(where=[{"op": "eq", "value": 1}])))
+            assert "error" in error
+        finally:
+            server._rg = original
+        print("  ✅ rg_query_properties lists properties, answers queries and reports bad conditions")
+
+
+if __name__ == "__main__":
+    test_index_predicates()
+    test_properties_in_vault()
\ No newline at end of file
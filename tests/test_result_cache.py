@@ -0,0 +1,80 @@
+#!/usr/bin/env python3
+"""Test the generation-aware result cache for repeated tool calls."""
+
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+# Add src to path
+sys.path.insert(0, str(Path(__file__).parent / "src"))
+
+from rgrep_mcp.cache import ResultCache
+from rgrep_mcp.ripgrep import RipgrepWrapper
+from rgrep_mcp.watcher import ChangeEvent
+
+
+def test_cache_eviction():
+    """Test LRU, memory, TTL and generation eviction."""
+    print("=== RESULT CACHE EVICTION TEST ===")
+    
+    cache = ResultCache(max_entries=2)
+    cache.put("a", "result a", generation=0)
+    cache.put("b", "result b", generation=0)
+    assert cache.get("a", 0) == "result a"
+    cache.put("c", "result c", generation=0)
+    assert cache.get("b", 0) is None and cache.get("a", 0) == "result a"
+    print("  ✅ Least recently used result evicted")
+    
+    assert cache.get("a", 1) is None and cache.get("a", 0) is None
+    print("  ✅ Results from an older vault generation are never served")
+    
+    cache = ResultCache(max_bytes=sys.getsizeof("x" * 1000) * 2)
+    for key in range(3):
+        cache.put(key, "x" * 1000, generation=0)
+    assert len(cache) == 2 and cache.size_bytes <= cache.max_bytes
+    cache.put("huge", "x" * 10_000, generation=0)
+    assert cache.get("huge", 0) is None
+    print("  ✅ Memory budget bounds the cache")
+    
+    cache = ResultCache(ttl=0.05)
+    cache.put("a", "result a", generation=0)
+    time.sleep(0.1)
+    assert cache.get("a", 0) is None
+    print("  ✅ Results expire after the TTL")
+    
+    stats = cache.stats()
+    assert stats["hits"] == 0 and stats["misses"] == 1, stats
+    print("  ✅ Hits and misses counted")
+
+
+def test_generation_advances_on_changes():
+    """Test that applied vault changes advance the generation."""
+    with tempfile.TemporaryDirectory() as vault:
+        (Path(vault) / "Note.md").write_text("# Note\n", encoding="utf-8")
+        rg = RipgrepWrapper(vault)
+        
+        print("=== VAULT GENERATION TEST ===")
+        
+        assert not rg.is_watching
+        generation = rg.generation
+        rg.result_cache.put(("rg_search_notes", "note"), "{}", generation)
+        
+        rg.apply_changes([ChangeEvent("modified", "Note.md")])
+        assert rg.generation == generation + 1
+        assert rg.result_cache.get(("rg_search_notes", "note"), rg.generation) is None
+        print("  ✅ An edit makes earlier results stale")
+        
+        start = time.perf_counter()
+        rg.result_cache.put("key", "{}", rg.generation)
+        for _ in range(10000):
+            rg.result_cache.get("key", rg.generation)
+        per_lookup = (time.perf_counter() - start) / 10000
+        print(f"  Cached lookup: {per_lookup * 1e6:.2f} µs")
+        assert per_lookup < 0.0001
+        print("  ✅ Repeated queries are answered in microseconds")
+
+
+if __name__ == "__main__":
+    test_cache_eviction()
+    test_generation_advances_on_changes()
\ No newline at end of file
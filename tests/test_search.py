@@ -1,6 +1,7 @@
 #!/usr/bin/env python3
 """Test script to debug search functionality with test vault."""
 
+import asyncio
 import sys
 import json
 import os
@@ -65,12 +66,12 @@ def test_with_server():
         from rgrep_mcp.server import rg_search_notes, rg_search_links
         
         print(f"\n1. Testing rg_search_notes('meeting')...")
-        result = rg_search_notes("meeting")
+        result = asyncio.run(rg_search_notes("meeting"))
         result_dict = json.loads(result)
         print(f"Total matches: {result_dict.get('total_matches', 0)}")
         
         print(f"\n2. Testing rg_search_links()...")
-        result = rg_search_links()
+        result = asyncio.run(rg_search_links())
         result_dict = json.loads(result)
         print(f"Total links: {result_dict.get('total_matches', 0)}")
         
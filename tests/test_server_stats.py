@@ -0,0 +1,106 @@
+#!/usr/bin/env python3
+"""Test per-stage latency instrumentation and the rg_server_stats tool."""
+
+import asyncio
+import json
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+# Add src to path
+sys.path.insert(0, str(Path(__file__).parent / "src"))
+
+from rgrep_mcp import server
+from rgrep_mcp.ripgrep import RipgrepWrapper
+from rgrep_mcp.stats import LatencyStats, measure, record_stage, stage
+
+
+def test_stage_timer():
+    """Test that nested stages are not counted twice."""
+    print("=== STAGE TIMER TEST ===")
+    
+    with measure() as call:
+        with stage("outer"):
+            time.sleep(0.02)
+            with stage("inner"):
+                time.sleep(0.03)
+            record_stage("streamed", 0.01)
+    stages = call.timer.stages
+    # 20ms in outer, of which 10ms were reported by the streamed stage
+    assert 0.005 < stages["outer"] < 0.02, stages
+    assert stages["inner"] >= 0.03 and stages["streamed"] == 0.01
+    assert sum(stages.values()) <= call.seconds + 0.011
+    print("  ✅ Inner stage time excluded from the stage around it")
+    
+    with stage("unmeasured"):
+        record_stage("unmeasured", 1.0)
+    print("  ✅ Stages outside a measured call are ignored")
+
+
+def test_slow_query_log():
+    """Test histograms and the bounded slow-query log."""
+    print("=== SLOW QUERY LOG TEST ===")
+    
+    stats = LatencyStats(slow_query_ms=100, slow_query_entries=2)
+    stats.record("rg_search_notes", 0.005, {"ripgrep": 0.004}, {"query": "fast"})
+    for i in range(3):
+        stats.record("rg_search_notes", 0.2, {"ripgrep": 0.05, "parse": 0.1}, {"query": f"slow {i}" + "x" * 500})
+    
+    snapshot = stats.snapshot()
+    tool = snapshot["tools"]["rg_search_notes"]
+    assert tool["count"] == 4 and tool["max_ms"] == 200.0
+    assert tool["buckets"] == {"<=5ms": 1, "<=250ms": 3}
+    assert set(tool["stages_mean_ms"]) == {"ripgrep", "parse", "other"}
+    print("  ✅ Latency histogram and stage breakdown per tool")
+    
+    slow = snapshot["slow_queries"]
+    assert [q["arguments"]["query"][:6] for q in slow] == ["slow 2", "slow 1"]
+    assert len(slow[0]["arguments"]["query"]) == LatencyStats.MAX_ARGUMENT_CHARS + 3
+    assert slow[0]["stages_ms"]["other"] == 50.0
+    print("  ✅ Slow-query log bounded, newest first, arguments clipped")
+
+
+def test_server_stats_tool():
+    """Test that tool calls are recorded and reported with cache counters."""
+    with tempfile.TemporaryDirectory() as vault:
+        for i in range(10):
+            (Path(vault) / f"Note {i}.md").write_text(
+                f"---\nstatus: active\n---\n# Note {i}\n\n## Plan\nmeeting about [[Note {i + 1}]]\n",
+                encoding="utf-8",
+            )
+        rg = RipgrepWrapper(vault, slow_query_ms=0)
+        server._rg = rg
+        
+        print("=== SERVER STATS TOOL TEST ===")
+        
+        try:
+            async def calls():
+                await server.rg_search_notes("meeting")
+                await server.rg_search_notes("meeting", search_scope="content_only")
+                await server.rg_search_links(link_type="wiki_links")
+                await server.rg_search_backlinks("Note 3")
+                return json.loads(await server.rg_server_stats())
+            
+            stats = asyncio.run(calls())
+        finally:
+            server._rg = None
+    
+    assert stats["tools"]["rg_search_notes"]["count"] == 2
+    assert {"rg_search_links", "rg_search_backlinks"} <= set(stats["tools"])
+    assert "rg_server_stats" not in stats["tools"]
+    assert {"ripgrep", "parse", "frontmatter", "order", "smart_context", "links", "index", "serialize"} <= set(stats["stages"])
+    print(f"  Stages: {', '.join(stats['stages'])}")
+    print("  ✅ Every pipeline stage timed, including work in worker threads")
+    
+    assert stats["slow_queries"][0]["tool"] == "rg_search_backlinks"
+    assert stats["slow_queries"][0]["arguments"] == {"target_note": "Note 3"}
+    assert stats["link_graph"]["notes"] == 10 and stats["mtime_index"]["notes"] == 10
+    assert stats["note_cache"]["entries"] > 0 and "hit_rate" in stats["result_cache"]
+    print("  ✅ Slow queries, cache and index counters reported")
+
+
+if __name__ == "__main__":
+    test_stage_timer()
+    test_slow_query_log()
+    test_server_stats_tool()
\ No newline at end of file
@@ -0,0 +1,152 @@
+#!/usr/bin/env python3
+"""Test the on-disk index snapshot and restarts from it."""
+
+import gc
+import marshal
+import os
+import sys
+import tempfile
+from pathlib import Path
+
+# Add src to path
+sys.path.insert(0, str(Path(__file__).parent / "src"))
+
+from rgrep_mcp import snapshot
+from rgrep_mcp.ripgrep import RipgrepWrapper
+from rgrep_mcp.snapshot import Snapshot, snapshot_path, write_snapshot
+
+
+def _write_vault(root: Path) -> None:
+    """Create a hub with aliases and 15 notes linking to it or to each other."""
+    (root / "Hub.md").write_text("---\naliases: [Center]\n---\n# Hub\n\n## Index\n\nStart here.\n", encoding="utf-8")
+    for number in range(15):
+        target = "Center" if number % 3 == 0 else "Hub"
+        content = f"# Note {number:02d}\n\n## Links\n\nSee [[{target}]] and [[Note {(number + 1) % 15:02d}]]\n"
+        (root / f"Note {number:02d}.md").write_text(content, encoding="utf-8")
+
+
+def _backlinks(rg: RipgrepWrapper) -> dict:
+    """Return every note's backlinks as comparable tuples."""
+    graph = rg.get_link_graph()
+    return {note: sorted(map(tuple, graph.backlinks(note))) for note in graph.notes}
+
+
+def _touch(path: Path, content: str) -> None:
+    """Rewrite a note and move its mtime forward, so the change shows on any filesystem."""
+    path.write_text(content, encoding="utf-8")
+    stat = os.stat(path)
+    os.utime(path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 5_000_000_000))
+
+
+def test_snapshot_file():
+    """Test the file format: sections, atomic replacement and rejected files."""
+    with tempfile.TemporaryDirectory() as directory:
+        vault = os.path.join(directory, "vault")
+        os.mkdir(vault)
+        path = snapshot_path(os.path.join(directory, "cache"), vault)
+        
+        print("=== SNAPSHOT FILE TEST ===")
+        
+        sections = {"numbers": marshal.dumps({"a": [1, 2], "b": {3}}), "names": marshal.dumps(("x", "y"))}
+        size = write_snapshot(path, vault, sections)
+        assert path.stat().st_size == size and os.listdir(path.parent) == [path.name]
+        opened = Snapshot.open(path, vault)
+        assert opened.section("numbers") == {"a": [1, 2], "b": {3}} and opened.section("names") == ("x", "y")
+        assert opened.section("missing") is None and "names" in opened
+        opened.close()
+        print("  ✅ Sections round-trip and no temporary file is left behind")
+        
+        frozen = gc.get_freeze_count()
+        Snapshot.open(path, vault).section("numbers")
+        assert gc.isenabled() and gc.get_freeze_count() == frozen
+        print("  ✅ Decoding leaves the garbage collector as it was, tracking every object")
+        
+        def fail(fd):
+            raise OSError("disk full")
+        
+        fsync = os.fsync
+        os.fsync = fail
+        try:
+            write_snapshot(path, vault, {"numbers": marshal.dumps("new")})
+        except OSError:
+            pass
+        finally:
+            os.fsync = fsync
+        assert Snapshot.open(path, vault).section("names") == ("x", "y") and os.listdir(path.parent) == [path.name]
+        print("  ✅ A failed write leaves the previous snapshot in place")
+        
+        assert Snapshot.open(path, directory) is None
+        original = snapshot.SCHEMA_VERSION
+        snapshot.SCHEMA_VERSION = original + 1
+        try:
+            assert Snapshot.open(path, vault) is None
+        finally:
+            snapshot.SCHEMA_VERSION = original
+        print("  ✅ Snapshots of another vault or schema are ignored")
+        
+        data = bytearray(path.read_bytes())
+        data[-1] ^= 0xFF
+        path.write_bytes(bytes(data))
+        corrupt = Snapshot.open(path, vault)
+        assert corrupt.section("names") is None and corrupt.section("numbers") is not None
+        corrupt.close()
+        path.write_bytes(b"not a snapshot")
+        assert Snapshot.open(path, vault) is None
+        path.write_bytes(data[:20])
+        assert Snapshot.open(path, vault) is None
+        print("  ✅ Corrupt sections and truncated or foreign files are rejected")
+
+
+def test_restart_from_snapshot():
+    """Test that a restarted wrapper restores its indexes and reparses only changed notes."""
+    with tempfile.TemporaryDirectory() as vault, tempfile.TemporaryDirectory() as cache:
+        root = Path(vault)
+        _write_vault(root)
+        
+        print("=== RESTART FROM SNAPSHOT TEST ===")
+        
+        assert not RipgrepWrapper(vault).save_snapshot()
+        rg = RipgrepWrapper(vault, snapshot_dir=cache)
+        assert not rg.save_snapshot()
+        rg.start_watching(poll_interval=3600, use_inotify=False)
+        try:
+            rg.search_content("Start here")
+            rg.search_content_only("See")
+            assert rg.save_snapshot() and rg.cache_stats()["snapshot"]["saves"] == 1
+        finally:
+            rg.stop_watching()
+        print("  ✅ Snapshots are saved only with a snapshot directory and while the vault is watched")
+        
+        restarted = RipgrepWrapper(vault, snapshot_dir=cache)
+        assert restarted.load_snapshot() and len(restarted.frontmatter) == 16
+        match = restarted.search_content("Start here")[0]
+        assert match.smart_context == "Index" and restarted.note_cache.misses == 0 and restarted.frontmatter.reads == 0
+        print("  ✅ Frontmatter entries and outlines are loaded and used without reading the notes")
+        
+        assert _backlinks(restarted) == _backlinks(rg)
+        assert restarted.cache_stats()["snapshot"]["reparsed_notes"] == 0
+        print("  ✅ An unchanged vault gets back the same link graph")
+        
+        _touch(root / "Note 01.md", "# Note 01\n\nNow see [[Note 05]] only\n")
+        (root / "Note 02.md").unlink()
+        _touch(root / "Extra.md", "# Extra\n\n[[Center]]\n")
+        rebuilt = RipgrepWrapper(vault)
+        again = RipgrepWrapper(vault, snapshot_dir=cache)
+        assert again.load_snapshot()
+        assert _backlinks(again) == _backlinks(rebuilt)
+        assert again.cache_stats()["snapshot"]["reparsed_notes"] == 3
+        assert "Extra.md" in {link.source for link in again.get_link_graph().backlinks("Hub.md")}
+        print("  ✅ Changed, deleted and new notes are reparsed; the graph matches a fresh build")
+        
+        for number in range(3, 9):
+            _touch(root / f"Note {number:02d}.md", f"# Note {number:02d}\n")
+        stale = RipgrepWrapper(vault, snapshot_dir=cache)
+        assert stale.load_snapshot()
+        assert _backlinks(stale) == _backlinks(RipgrepWrapper(vault))
+        assert stale.cache_stats()["snapshot"]["restored_notes"] == 0
+        print("  ✅ When much of the vault changed, the graph is built from scratch")
+
+
+if __name__ == "__main__":
+    test_snapshot_file()
+    test_restart_from_snapshot()
\ No newline at end of file
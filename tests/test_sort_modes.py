@@ -0,0 +1,68 @@
+#!/usr/bin/env python3
+"""Test result ordering done in Python after a parallel ripgrep search."""
+
+import os
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+# Add src to path
+sys.path.insert(0, str(Path(__file__).parent / "src"))
+
+from rgrep_mcp.ripgrep import RipgrepWrapper
+
+
+def _write_vault(root: Path) -> None:
+    """Create notes with known mtimes and match counts."""
+    now = time.time()
+    for i in range(30):
+        hits = "\n".join(f"keyword {n} in [[Note {n}]]" for n in range(i % 5 + 1))
+        path = root / f"Note {i:02d}.md"
+        path.write_text(f"# Note {i}\n\n{hits}\n", encoding="utf-8")
+        # Note 00 is the newest, Note 29 the oldest
+        os.utime(path, (now - i * 60, now - i * 60))
+
+
+def test_sort_modes():
+    """Test recency, path, relevance and unordered results."""
+    with tempfile.TemporaryDirectory() as vault:
+        _write_vault(Path(vault))
+        rg = RipgrepWrapper(vault)
+        
+        print("=== SORT MODES TEST ===")
+        
+        command = rg._build_rg_command("keyword")
+        assert "--sortr" not in command
+        print("  ✅ ripgrep runs without --sortr")
+        
+        recent = rg.search_content("keyword", max_results=4, smart_context=False)
+        assert [(r["file"], r["line_number"]) for r in recent] == [
+            ("Note 00.md", 3), ("Note 01.md", 3), ("Note 01.md", 4), ("Note 02.md", 3),
+        ], recent
+        print("  ✅ recency returns the global newest matches")
+        
+        by_path = rg.search_content("keyword", max_results=3, smart_context=False, sort="path")
+        assert [(r["file"], r["line_number"]) for r in by_path] == [
+            ("Note 00.md", 3), ("Note 01.md", 3), ("Note 01.md", 4),
+        ], by_path
+        print("  ✅ path orders by file and line")
+        
+        relevant = rg.search_content("keyword", max_results=7, smart_context=False, sort="relevance")
+        # Notes 04, 09, ... have five matches each; Note 04 is the newest of them
+        assert [r["file"] for r in relevant] == ["Note 04.md"] * 5 + ["Note 09.md"] * 2, relevant
+        print("  ✅ relevance ranks notes by match count, newest first")
+        
+        unordered = rg.search_content("keyword", max_results=10, smart_context=False, sort="none")
+        assert len(unordered) == 10
+        print("  ✅ none returns the first matches found")
+        
+        links = rg.find_links(link_type="wiki_links", max_results=3)
+        assert [l["file"] for l in links] == ["Note 00.md", "Note 01.md", "Note 01.md"], links
+        links = rg.find_links(link_type="wiki_links", max_results=5, sort="relevance")
+        assert [l["file"] for l in links] == ["Note 04.md"] * 5, links
+        print("  ✅ Link searches use the same orders")
+
+
+if __name__ == "__main__":
+    test_sort_modes()
\ No newline at end of file
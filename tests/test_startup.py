@@ -0,0 +1,106 @@
+#!/usr/bin/env python3
+"""Test that importing the server is fast and does no vault or ripgrep work."""
+
+import json
+import os
+import subprocess
+import sys
+import tempfile
+from pathlib import Path
+
+# Add src to path
+sys.path.insert(0, str(Path(__file__).parent / "src"))
+
+SRC = str(Path(__file__).resolve().parent.parent / "src")
+
+IMPORT_PROBE = """
+import json, sys, time
+start = time.perf_counter()
+import rgrep_mcp.server as server
+elapsed = time.perf_counter() - start
+print(json.dumps({
+    "seconds": elapsed,
+    "yaml_loaded": "yaml" in sys.modules,
+    "wrapper_created": server._rg is not None,
+}))
+"""
+
+FIRST_CALL_PROBE = """
+import asyncio, json
+import rgrep_mcp.server as server
+result = json.loads(asyncio.run(server.rg_search_notes("needle", sort="path")))
+print(json.dumps({"result": result, "wrapper_created": server._rg is not None}))
+"""
+
+
+def _run(probe: str, env: dict) -> dict:
+    """Run a probe in a fresh interpreter and return its JSON report."""
+    env = dict(env, PYTHONPATH=SRC + os.pathsep + env.get("PYTHONPATH", ""))
+    proc = subprocess.run(
+        [sys.executable, "-c", probe], capture_output=True, text=True, env=env, timeout=60
+    )
+    assert proc.returncode == 0, proc.stderr
+    return json.loads(proc.stdout.strip().splitlines()[-1])
+
+
+def test_import_is_cheap():
+    """Test that the import needs neither a vault nor ripgrep."""
+    print("=== SERVER IMPORT TEST ===")
+    
+    env = {k: v for k, v in os.environ.items() if not k.startswith(("OBSIDIAN_", "RGREP_MCP_"))}
+    with tempfile.TemporaryDirectory() as empty:
+        # No ripgrep on PATH and no vault configured: importing must still succeed
+        env["PATH"] = empty
+        env["HOME"] = empty
+        report = _run(IMPORT_PROBE, env)
+    
+    print(f"  Import time: {report['seconds'] * 1000:.0f} ms")
+    assert not report["wrapper_created"]
+    assert not report["yaml_loaded"]
+    assert report["seconds"] < 5.0
+    print("  ✅ Import runs no ripgrep, loads no YAML parser and builds no wrapper")
+
+
+def test_first_call_initializes():
+    """Test that the first tool call creates the wrapper and searches."""
+    print("=== LAZY INITIALIZATION TEST ===")
+    
+    with tempfile.TemporaryDirectory() as vault:
+        (Path(vault) / "Note.md").write_text("# Note\n\nA needle here.\n", encoding="utf-8")
+        env = dict(os.environ, OBSIDIAN_VAULT_PATH=vault, HOME=vault)
+        report = _run(FIRST_CALL_PROBE, env)
+    
+    assert report["wrapper_created"]
+    assert [r["file"] for r in report["result"]["results"]] == ["Note.md"], report
+    print("  ✅ Wrapper created on the first tool call")
+    
+    with tempfile.TemporaryDirectory() as empty:
+        env = dict(os.environ, OBSIDIAN_VAULT_PATH=os.path.join(empty, "missing"), HOME=empty)
+        report = _run(FIRST_CALL_PROBE, env)
+    
+    assert "does not exist" in report["result"]["error"], report
+    print("  ✅ Invalid vault reported as a tool error instead of exiting")
+
+
+def test_bad_config_values():
+    """Test that a bad value in the config file keeps its default instead of failing startup."""
+    from rgrep_mcp.config import Config
+    
+    print("=== BAD CONFIG VALUES TEST ===")
+    
+    with tempfile.TemporaryDirectory() as folder:
+        path = Path(folder) / "config.json"
+        path.write_text(json.dumps({
+            "note_cache_entries": "lots", "cursor_ttl": None, "result_cache_ttl": "12", "watch_vault": False,
+        }), encoding="utf-8")
+        config = Config(str(path))
+    
+    assert config.note_cache_entries == 2048 and config.cursor_ttl == 600.0
+    assert config.result_cache_ttl == 12.0 and config.watch_vault is False
+    print("  ✅ Unconvertible values fall back to defaults, the other settings still load")
+
+
+if __name__ == "__main__":
+    test_import_is_cheap()
+    test_first_call_initializes()
+    test_bad_config_values()
\ No newline at end of file
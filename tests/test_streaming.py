@@ -0,0 +1,100 @@
+#!/usr/bin/env python3
+"""Test streaming ripgrep consumption with early termination."""
+
+import subprocess
+import sys
+import tempfile
+from pathlib import Path
+
+# Add src to path
+sys.path.insert(0, str(Path(__file__).parent / "src"))
+
+from rgrep_mcp.ripgrep import RipgrepWrapper
+
+
+def _write_vault(root: Path) -> None:
+    """Create notes with many matches for a common word."""
+    for i in range(40):
+        body = "\n".join(f"common word on line {n}" for n in range(50))
+        (root / f"Note {i}.md").write_text(f"# Note {i}\n\n{body}\n", encoding="utf-8")
+    
+    # 60 frontmatter matches ahead of the only content match
+    tags = "\n".join(f"  - needle-{n}" for n in range(60))
+    (root / "Crowded.md").write_text(
+        f"---\ntags:\n{tags}\n---\n# Body\n\nThe needle in the content.\n", encoding="utf-8"
+    )
+
+
+def test_global_max_results():
+    """Test that searches stop at the global max_results."""
+    with tempfile.TemporaryDirectory() as vault:
+        _write_vault(Path(vault))
+        rg = RipgrepWrapper(vault)
+        
+        print("=== STREAMING MAX RESULTS TEST ===")
+        
+        for max_val in [1, 5, 30]:
+            results = rg.search_content("common", max_results=max_val, smart_context=False)
+            print(f"  Requested: {max_val}, Got: {len(results)}")
+            assert len(results) == max_val
+        
+        links = rg.find_links(max_results=3)
+        assert len(links) <= 3
+        print("  ✅ Results capped globally, not per file")
+        
+        content = rg.search_content_only("needle", max_results=5, smart_context=False)
+        assert [r["line_number"] for r in content] == [66], content
+        print("  ✅ content_only finds matches past many frontmatter matches")
+        
+        frontmatter = rg.search_frontmatter_only("needle", max_results=5, smart_context=False)
+        assert len(frontmatter) == 5 and all(r["line_number"] <= 63 for r in frontmatter)
+        print("  ✅ frontmatter_only returns exactly max_results")
+
+
+def test_stream_stops_ripgrep():
+    """Test that closing the stream stops ripgrep instead of draining its output."""
+    with tempfile.TemporaryDirectory() as vault:
+        _write_vault(Path(vault))
+        rg = RipgrepWrapper(vault)
+        
+        print("=== STREAM TERMINATION TEST ===")
+        
+        started = []
+        original_popen = subprocess.Popen
+        
+        def recording_popen(*args, **kwargs):
+            process = original_popen(*args, **kwargs)
+            started.append(process)
+            return process
+        
+        subprocess.Popen = recording_popen
+        try:
+            stream = rg._stream_rg_matches(rg._build_rg_command("common", max_count=None))
+            first = next(stream)
+            stream.close()
+        finally:
+            subprocess.Popen = original_popen
+        
+        assert first["text"].startswith("common")
+        assert len(started) == 1 and started[0].returncode is not None
+        print("  ✅ ripgrep is stopped and reaped when the stream is closed")
+
+
+def test_output_byte_ceiling():
+    """Test that the byte ceiling bounds how much output is read."""
+    with tempfile.TemporaryDirectory() as vault:
+        _write_vault(Path(vault))
+        rg = RipgrepWrapper(vault, max_output_bytes=4096)
+        
+        print("=== OUTPUT CEILING TEST ===")
+        
+        results = rg.search_content_only("common", max_results=100, smart_context=False)
+        print(f"  Results read under a 4 KiB ceiling: {len(results)}")
+        assert 0 < len(results) < 100
+        print("  ✅ Partial results returned once the ceiling is reached")
+
+
+if __name__ == "__main__":
+    test_global_max_results()
+    test_stream_stops_ripgrep()
+    test_output_byte_ceiling()
\ No newline at end of file
@@ -0,0 +1,122 @@
+#!/usr/bin/env python3
+"""Test the tag index behind rg_search_tags."""
+
+import asyncio
+import json
+import sys
+import tempfile
+from pathlib import Path
+
+# Add src to path
+sys.path.insert(0, str(Path(__file__).parent / "src"))
+
+from rgrep_mcp import server
+from rgrep_mcp.ripgrep import RipgrepWrapper
+from rgrep_mcp.tags import TagIndex, scan_tags
+from rgrep_mcp.watcher import ChangeEvent
+
+
+def _write_vault(root: Path) -> None:
+    """Create notes tagged inline and in frontmatter, with tag look-alikes."""
+    notes = {
+        "Alpha.md": "---\ntags: [project/alpha, Urgent]\nnote: see #notatag\n---\n# Alpha\n\nBody #review\n",
+        "Beta.md": "---\ntags:\n  - project/beta\n  - \"#done\"\n---\n# Beta\n",
+        "Work/Gamma.md": "# Gamma #heading-tag\n\nPlain #Project text, #2024 is a number.\n",
+        "Delta.md": (
+            "# Delta\n\n## Not a tag\n"
+            "See [[Alpha#Body]] and https://example.com/#anchor and a#b.\n"
+            "```\n#in-code\n```\n"
+            "tags: body-text\n"
+        ),
+    }
+    for name, content in notes.items():
+        path = root / name
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_text(content, encoding="utf-8")
+
+
+def test_scan_tags():
+    """Test which '#' words count as inline tags."""
+    print("=== TAG SCANNING TEST ===")
+    
+    lines = ["---", "title: #skipped", "---", "#one and #Two/Three/", "```", "#code", "```", "#4 x#y (#z"]
+    found = scan_tags(enumerate(lines, 1))
+    assert found.inline == {"one", "two/three"}, found
+    assert found.frontmatter_end == 3 and not found.has_tag_key
+    print("  ✅ Frontmatter, code blocks, numbers and mid-word '#' are skipped")
+    
+    unclosed = scan_tags(enumerate(["---", "#kept"], 1))
+    assert unclosed.inline == {"kept"} and unclosed.frontmatter_end is None
+    print("  ✅ Without a closing '---' the first lines are ordinary text")
+
+
+def test_index_queries():
+    """Test AND, OR, NOT and nested tag queries on the index."""
+    print("=== TAG QUERY TEST ===")
+    
+    index = TagIndex()
+    index.set_tags("a.md", {"project/alpha", "urgent"})
+    index.set_tags("b.md", {"project/beta"})
+    index.set_tags("c.md", {"urgent"})
+    
+    assert index.query(["project"]) == {"a.md", "b.md"}
+    assert index.query(["#Project/Alpha"]) == {"a.md"}
+    assert index.query(["proj"]) == set()
+    print("  ✅ A tag matches itself and the tags nested below it")
+    
+    assert index.query(["project", "urgent"]) == {"a.md"}
+    assert index.query(any_of=["project/beta", "urgent"]) == {"a.md", "b.md", "c.md"}
+    assert index.query(["project"], none_of=["urgent"]) == {"b.md"}
+    assert index.query(none_of=["project"], universe=["a.md", "c.md", "untagged.md"]) == {"c.md", "untagged.md"}
+    print("  ✅ AND, OR and NOT combine as set operations")
+    
+    assert index.counts("project") == [("project", 2), ("project/alpha", 1), ("project/beta", 1)]
+    index.set_tags("a.md", {"urgent"})
+    index.remove("b.md")
+    assert index.query(["project"]) == set() and index.counts("project") == []
+    print("  ✅ Replacing and removing tags updates every parent tag")
+
+
+def test_tags_in_vault():
+    """Test the index built from the vault and kept current by change events."""
+    with tempfile.TemporaryDirectory() as vault:
+        root = Path(vault)
+        _write_vault(root)
+        rg = RipgrepWrapper(vault)
+        
+        print("=== VAULT TAG INDEX TEST ===")
+        
+        index = rg.get_tag_index()
+        assert index.tags_of("Alpha.md") == {"project/alpha", "urgent", "review"}, index.tags_of("Alpha.md")
+        assert index.tags_of("Beta.md") == {"project/beta", "done"}
+        assert index.tags_of(str(Path("Work/Gamma.md"))) == {"heading-tag", "project"}
+        assert index.tags_of("Delta.md") == set()
+        print("  ✅ Inline and frontmatter tags indexed; headings, links, URLs and code skipped")
+        
+        found = rg.find_notes_by_tags(tags=["project"], exclude_tags=["done"])
+        assert sorted(note["file"] for note in found) == ["Alpha.md", str(Path("Work/Gamma.md"))], found
+        assert rg.find_notes_by_tags(tags=["project"], folder="Work")[0]["tags"] == ["heading-tag", "project"]
+        print("  ✅ find_notes_by_tags combines tags and filters by folder")
+        
+        (root / "Beta.md").write_text("# Beta\n\nNow #urgent\n", encoding="utf-8")
+        rg.apply_changes([ChangeEvent("modified", "Beta.md"), ChangeEvent("deleted", "Alpha.md")])
+        assert rg.get_tag_index() is index
+        assert index.query(["urgent"]) == {"Beta.md"} and index.query(["done"]) == set()
+        print("  ✅ Changed and deleted notes are re-indexed in place")
+        
+        original = server._rg
+        server._rg = rg
+        try:
+            listing = json.loads(asyncio.run(server.rg_search_tags()))
+            assert {"tag": "project", "notes": 1} in listing["tags"], listing
+            result = json.loads(asyncio.run(server.rg_search_tags(any_tags=["#urgent", "review"])))
+            assert [note["file"] for note in result["notes"]] == ["Beta.md"], result
+        finally:
+            server._rg = original
+        print("  ✅ rg_search_tags lists tags and answers queries")
+
+
+if __name__ == "__main__":
+    test_scan_tags()
+    test_index_queries()
+    test_tags_in_vault()
\ No newline at end of file
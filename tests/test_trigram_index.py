@@ -0,0 +1,139 @@
+#!/usr/bin/env python3
+"""Test the trigram index that narrows searches to candidate notes."""
+
+import sys
+import tempfile
+from pathlib import Path
+
+# Add src to path
+sys.path.insert(0, str(Path(__file__).parent / "src"))
+
+from rgrep_mcp.ripgrep import RipgrepWrapper
+from rgrep_mcp.trigrams import TrigramIndex, note_trigrams, query_trigrams
+from rgrep_mcp.watcher import ChangeEvent
+
+
+def _grams(text):
+    data = text.encode("ascii")
+    return set(zip(data, data[1:], data[2:]))
+
+
+def _write_vault(root: Path) -> None:
+    """Create notes with a rare word, a common word and mixed case."""
+    notes = {
+        "Alpha.md": "# Alpha\n\nThe Quetzal flies over the colour chart.\n",
+        "Beta.md": "# Beta\n\nthe QUETZAL again, and a color.\n",
+        "Work/Gamma.md": "---\nstatus: quetzal\n---\n# Gamma\n\nthe end\n",
+        "Delta.md": "# Delta\n\nthe plain note\n",
+    }
+    for number in range(4):
+        notes[f"Plain {number}.md"] = "the plain note\n"
+    for name, content in notes.items():
+        path = root / name
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_text(content, encoding="utf-8")
+
+
+def test_query_trigrams():
+    """Test which literals a regex requires."""
+    print("=== QUERY ANALYSIS TEST ===")
+    
+    assert query_trigrams(["Hello"]) == [_grams("hello")]
+    assert query_trigrams([r"\bfoo\.md\b"]) == [_grams("foo.md")]
+    assert query_trigrams([r"\x41bcd"]) == [_grams("bcd")]
+    assert query_trigrams(["caf\u00e9 noir"]) == [_grams("caf") | _grams(" noir")]
+    print("  ✅ Literals are lowercased; escaped punctuation is literal, escapes with arguments are skipped")
+    
+    assert query_trigrams(["colou?r"]) == [_grams("colo")]
+    assert query_trigrams(["ab{0,2}cde"]) == [_grams("cde")]
+    assert query_trigrams(["[abc]def(gh|ij)klm"]) == [_grams("def") | _grams("klm")]
+    print("  ✅ Optional characters, classes and groups break the literal around them")
+    
+    assert query_trigrams(["alpha|beta"]) == [_grams("alpha"), _grams("beta")]
+    assert query_trigrams(["alpha", "beta"]) == [_grams("alpha"), _grams("beta")]
+    assert query_trigrams(["alpha|be"]) is None
+    assert query_trigrams([r"\w+\s\d"]) is None and query_trigrams(["\u00e9t\u00e9s"]) is None
+    assert query_trigrams(["(?x) a b c d"]) is None and query_trigrams([r"\Qa.b\E"]) is None
+    print("  ✅ Alternatives without a three-character ASCII literal make every note a candidate")
+
+
+def test_index_candidates():
+    """Test lookups, updates and the bitmap form of common trigrams."""
+    print("=== TRIGRAM INDEX TEST ===")
+    
+    assert _grams("kel") <= note_trigrams("\u212ael".encode("utf-8"))
+    assert _grams("abc") <= note_trigrams("ABC".encode("utf-16"))
+    print("  ✅ Kelvin signs fold to 'k' and UTF-16 notes are indexed as text")
+    
+    index = TrigramIndex()
+    for number in range(600):
+        index.add(f"note{number}.md", f"common text {number:04d}".encode())
+    assert index._dense and len(index) == 600
+    assert index.candidates([_grams("0042")]) == {"note42.md"}
+    assert len(index.candidates([_grams("common text")])) == 600
+    print("  ✅ Common trigrams become bitmaps and intersect with sparse ones")
+    
+    index.add("note42.md", b"rewritten")
+    assert index.candidates([_grams("rewritten")]) == {"note42.md"}
+    assert index.candidates([_grams("0042")]) == {"note42.md"}
+    index.remove("note42.md")
+    assert index.candidates([_grams("rewritten")]) == set() and index.garbage == 2
+    print("  ✅ Edits add trigrams and keep stale ones; deleted notes are never candidates")
+
+
+def test_prefiltered_search():
+    """Test that watched searches read only candidates and return the same matches."""
+    with tempfile.TemporaryDirectory() as vault:
+        root = Path(vault)
+        _write_vault(root)
+        rg = RipgrepWrapper(vault)
+        
+        print("=== PREFILTERED SEARCH TEST ===")
+        
+        assert rg._candidate_notes(["quetzal"], None) is None
+        print("  ✅ Unwatched vaults are always searched in full")
+        
+        rg.start_watching(poll_interval=3600, use_inotify=False)
+        try:
+            rg.get_trigram_index()
+            gamma = str(Path("Work/Gamma.md"))
+            assert rg._candidate_notes(["quetzal"], None) == ["Alpha.md", "Beta.md", gamma]
+            assert rg._candidate_notes(["Quetzal"], "Work") == [gamma]
+            assert rg._candidate_notes(["the"], None) is None
+            assert rg._candidate_notes(["nowhere"], None) == []
+            print("  ✅ Candidates come from the index, filtered by folder; common words scan every note")
+            
+            def files(matches):
+                return sorted((m.file, m.line_number) for m in matches)
+            
+            full = RipgrepWrapper(vault)
+            for query, case_sensitive in (("quetzal", False), ("QUETZAL", True), ("colou?r", False), ("nowhere", False)):
+                assert files(rg.search_content(query, case_sensitive)) == files(full.search_content(query, case_sensitive))
+            assert files(rg.search_content_only("quetzal")) == [("Alpha.md", 3), ("Beta.md", 3)]
+            assert files(rg.search_batch(["quetzal", "colou?r"])[1]) == [("Alpha.md", 3), ("Beta.md", 3)]
+            print("  ✅ Prefiltered searches return what a full scan returns")
+            
+            (root / "Delta.md").write_text("# Delta\n\nA quetzal arrives\n", encoding="utf-8")
+            (root / "Beta.md").unlink()
+            rg.apply_changes([ChangeEvent("modified", "Delta.md"), ChangeEvent("deleted", "Beta.md")])
+            assert [m.file for m in rg.search_content("quetzal", sort="path")] == ["Alpha.md", "Delta.md", gamma]
+            print("  ✅ Changed and deleted notes are re-indexed in place")
+            
+            (root / ".trash").mkdir()
+            (root / "Alpha.md").rename(root / ".trash" / "Alpha.md")
+            trashed = str(Path(".trash/Alpha.md"))
+            rg.apply_changes([ChangeEvent("renamed", trashed, "Alpha.md")])
+            assert rg._candidate_notes(["quetzal"], None) == ["Delta.md", gamma]
+            assert files(rg.search_content("quetzal")) == files(full.search_content("quetzal"))
+            assert trashed not in {m.file for m in rg.search_content("quetzal")}
+            print("  ✅ Notes moved into a hidden folder leave the index, like a full scan skips them")
+        finally:
+            rg.stop_watching()
+        assert rg.cache_stats()["trigram_index"] is None
+        print("  ✅ Stopping the watcher drops the index")
+
+
+if __name__ == "__main__":
+    test_query_trigrams()
+    test_index_candidates()
+    test_prefiltered_search()
\ No newline at end of file
@@ -0,0 +1,234 @@
+#!/usr/bin/env python3
+"""Test the vault change feed and incremental cache updates."""
+
+import os
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+# Add src to path
+sys.path.insert(0, str(Path(__file__).parent / "src"))
+
+from rgrep_mcp.ripgrep import RipgrepWrapper
+from rgrep_mcp.watcher import ChangeEvent, InotifyWatcher, PollingWatcher
+
+
+def _write(path: Path, content: str, mtime_offset: float = 0.0) -> None:
+    """Write a note and move its mtime forward so changes are visible to polling."""
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_text(content, encoding="utf-8")
+    if mtime_offset:
+        ts = time.time() + mtime_offset
+        os.utime(path, (ts, ts))
+
+
+def test_polling_events():
+    """Test created, modified, deleted and renamed events from scandir snapshots."""
+    with tempfile.TemporaryDirectory() as vault:
+        root = Path(vault)
+        _write(root / "Keep.md", "# Keep\n")
+        _write(root / "Old.md", "# Old\n")
+        _write(root / "Gone.md", "# Gone\n")
+        
+        print("=== POLLING WATCHER TEST ===")
+        
+        watcher = PollingWatcher(vault)
+        batches = []
+        watcher.subscribe(batches.append)
+        assert watcher.poll() == []
+        
+        _write(root / "Keep.md", "# Keep\n\nEdited.\n", mtime_offset=10)
+        _write(root / "New.md", "# New\n")
+        (root / "Old.md").rename(root / "Renamed.md")
+        (root / "Gone.md").unlink()
+        _write(root / ".obsidian" / "workspace.md", "ignored")
+        _write(root / "image.png", "ignored")
+        
+        events = set(watcher.poll())
+        assert events == {
+            ChangeEvent("modified", "Keep.md"),
+            ChangeEvent("created", "New.md"),
+            ChangeEvent("renamed", "Renamed.md", "Old.md"),
+            ChangeEvent("deleted", "Gone.md"),
+        }, events
+        assert len(batches) == 1
+        assert watcher.poll() == []
+        print("  ✅ Changes to notes reported, .obsidian and attachments ignored")
+
+
+def test_incremental_updates():
+    """Test that watched changes update indexes without rebuilding them."""
+    with tempfile.TemporaryDirectory() as vault:
+        root = Path(vault)
+        _write(root / "Hub.md", "# Hub\n\nSee [[Topic]] and [[Later]].\n")
+        _write(root / "Topic.md", "# Topic\n")
+        _write(root / "Lonely.md", "# Lonely\n")
+        rg = RipgrepWrapper(vault)
+        watcher = PollingWatcher(vault)
+        watcher.subscribe(rg.apply_changes)
+        watcher.poll()
+        
+        print("=== INCREMENTAL UPDATE TEST ===")
+        
+        graph = rg.get_link_graph()
+        index = rg.get_mtime_index()
+        assert [b["file"] for b in rg.find_backlinks("Topic", smart_context=False)] == ["Hub.md"]
+        assert rg.find_backlinks("Later") == []
+        
+        _write(root / "Later.md", "# Later\n\nBack to [[Lonely]].\n", mtime_offset=10)
+        _write(root / "Hub.md", "# Hub\n\nSee [[Later]] only.\n", mtime_offset=10)
+        watcher.poll()
+        
+        assert rg.get_link_graph() is graph and rg.get_mtime_index() is index
+        assert rg.find_backlinks("Topic") == []
+        assert [b["file"] for b in rg.find_backlinks("Later", smart_context=False)] == ["Hub.md"]
+        assert [b["file"] for b in rg.find_backlinks("Lonely", smart_context=False)] == ["Later.md"]
+        assert "Later.md" in {f["file"] for f in rg.get_files_by_date_range(limit=2)}
+        print("  ✅ New note resolves existing links, edited links replace old ones")
+        
+        (root / "Later.md").rename(root / "Sooner.md")
+        watcher.poll()
+        assert rg.find_backlinks("Later") == []
+        assert [b["file"] for b in rg.find_backlinks("Lonely", smart_context=False)] == ["Sooner.md"]
+        assert "Later.md" not in index and "Sooner.md" in index
+        print("  ✅ Renamed note re-indexed under its new path")
+        
+        (root / "Topic.md").unlink()
+        watcher.poll()
+        assert "Topic.md" not in graph.notes and "Topic.md" not in index and len(index) == 3
+        assert rg.find_orphaned_notes() == []
+        print("  ✅ Deleted note dropped from the graph and the mtime index")
+
+
+def test_inotify_events():
+    """Test that inotify reports note changes as they happen."""
+    with tempfile.TemporaryDirectory() as vault:
+        root = Path(vault)
+        (root / "Daily").mkdir()
+        
+        print("=== INOTIFY WATCHER TEST ===")
+        
+        try:
+            watcher = InotifyWatcher(vault)
+        except OSError as e:
+            print(f"  inotify not available here ({e}), polling covers this platform")
+            return
+        
+        received = []
+        watcher.subscribe(received.extend)
+        watcher.start()
+        try:
+            _write(root / "Daily" / "Today.md", "# Today\n")
+            (root / "Daily" / "Today.md").rename(root / "Daily" / "Yesterday.md")
+            (root / "Projects").mkdir()
+            _write(root / "Projects" / "Plan.md", "# Plan\n")
+            (root / "Daily" / "Yesterday.md").unlink()
+            
+            expected = [
+                ChangeEvent("created", os.path.join("Daily", "Today.md")),
+                ChangeEvent("renamed", os.path.join("Daily", "Yesterday.md"), os.path.join("Daily", "Today.md")),
+                ChangeEvent("created", os.path.join("Projects", "Plan.md")),
+                ChangeEvent("deleted", os.path.join("Daily", "Yesterday.md")),
+            ]
+            deadline = time.time() + 5
+            while time.time() < deadline and not all(e in received for e in expected):
+                time.sleep(0.05)
+        finally:
+            watcher.stop()
+        
+        assert all(e in received for e in expected), received
+        print("  ✅ Created, renamed and deleted notes reported, new folders watched")
+
+
+def test_hidden_and_ignored_paths():
+    """Test that notes in folders ripgrep skips, hidden or matched by ignore files, are not reported."""
+    with tempfile.TemporaryDirectory() as vault:
+        root = Path(vault)
+        _write(root / "Target.md", "# Target\n")
+        _write(root / "Archive" / "Old.md", "# Old\n")
+        _write(root / ".ignore", "Archive/\n*.draft.md\n")
+        _write(root / "Plan.draft.md", "# Draft\n")
+        
+        print("=== HIDDEN AND IGNORED PATHS TEST ===")
+        
+        rg = RipgrepWrapper(vault)
+        watcher = PollingWatcher(vault, list_notes=rg._list_notes)
+        assert watcher.poll() == []
+        assert set(watcher._snapshot) == {"Target.md", "Plan.draft.md"}
+        
+        (root / ".trash").mkdir()
+        (root / "Target.md").rename(root / ".trash" / "Target.md")
+        _write(root / ".git" / "notes.md", "# Git\n")
+        _write(root / "Archive" / "New.md", "# New\n")
+        assert watcher.poll() == [ChangeEvent("deleted", "Target.md")]
+        assert set(watcher._snapshot) == set(rg._list_notes())
+        assert not watcher.covers(os.path.join("Archive", "New.md")) and watcher.covers("Plan.draft.md")
+        print("  ✅ Notes moved to .trash, under .git or in a folder .ignore lists are not reported")
+        print("  ✅ Notes matching a file pattern are, since searches' --glob '*.md' overrides it")
+        
+        (root / "Archive" / "New.md").unlink()
+        _write(root / ".ignore", "*.draft.md\n")
+        assert watcher.poll() == [ChangeEvent("created", os.path.join("Archive", "Old.md"))]
+        print("  ✅ Edited ignore files are read again")
+        
+        try:
+            watcher = InotifyWatcher(vault, list_notes=rg._list_notes)
+        except OSError as e:
+            print(f"  inotify not available here ({e}), polling covers this platform")
+            return
+        
+        received = []
+        watcher.subscribe(received.extend)
+        _write(root / "Archive" / "Keep.md", "# Keep\n")
+        watcher.start()
+        try:
+            assert not any(d.startswith(".") for d in watcher._dirs.values())
+            (root / "Archive" / "Old.md").rename(root / ".trash" / "Old.md")
+            _write(root / ".trash" / "Late.md", "# Late\n")
+            _write(root / "Late.md", "# Late\n")
+            _write(root / ".ignore", "Archive/\n")
+            _write(root / "Archive" / "Hidden.md", "# Hidden\n")
+            deadline = time.time() + 5
+            while time.time() < deadline and len({e.path for e in received}) < 3:
+                time.sleep(0.05)
+            time.sleep(0.2)
+        finally:
+            watcher.stop()
+        
+        archived = os.path.join("Archive", "Old.md"), os.path.join("Archive", "Keep.md")
+        assert {e.path for e in received} == {*archived, "Late.md"}, received
+        assert all(ChangeEvent("deleted", path) in received for path in archived)
+        assert watcher._notes == set(rg._list_notes())
+        print("  ✅ inotify skips hidden folders and re-lists notes when an ignore file changes")
+
+
+def test_skipped_folders_stay_out_of_indexes():
+    """Test that notes in folders searches skip never enter the mtime index or the link graph."""
+    with tempfile.TemporaryDirectory() as vault:
+        root = Path(vault)
+        _write(root / "Home.md", "# Home\n")
+        _write(root / ".trash" / "old.md", "# Old\n")
+        
+        print("=== SKIPPED FOLDERS TEST ===")
+        
+        rg = RipgrepWrapper(vault)
+        watcher = rg.start_watching(poll_interval=3600, use_inotify=False)
+        try:
+            assert [f["file"] for f in rg.get_files_by_date_range()] == ["Home.md"]
+            assert [f["file"] for f in rg.find_orphaned_notes()] == ["Home.md"]
+            (root / ".trash" / "old.md").unlink()
+            assert watcher.poll() == []
+            assert os.path.join(".trash", "old.md") not in rg.get_mtime_index()
+            assert [f["file"] for f in rg.find_orphaned_notes()] == ["Home.md"]
+        finally:
+            rg.stop_watching()
+        print("  ✅ A note deleted from .trash while watched was never listed")
+
+
+if __name__ == "__main__":
+    test_polling_events()
+    test_incremental_updates()
+    test_inotify_events()
+    test_hidden_and_ignored_paths()
+    test_skipped_folders_stay_out_of_indexes()
\ No newline at end of file